@@ -13,16 +13,16 @@ class BaseAgent(ABC):
         
     def build_message(self, 
                      content: str, 
-                     image_b64: Optional[str] = None, 
-                     pdf_b64: Optional[str] = None,
+                     image: Optional[Dict[str, Any]] = None, 
+                     pdf: Optional[Dict[str, Any]] = None,
                      metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Ortak mesaj yapısını oluşturur.
         
         Args:
             content: Ana içerik (soru, konu vb.)
-            image_b64: Base64 kodlanmış görsel
-            pdf_b64: Base64 kodlanmış PDF
+            image: Görsel eki (path, sha256, mime)
+            pdf: PDF eki (path, sha256, mime)
             metadata: Ek bilgiler
             
         Returns:
@@ -30,8 +30,8 @@ class BaseAgent(ABC):
         """
         message = {
             "text": self.prompt.format(content=content),
-            "image": image_b64 or "",
-            "pdf": pdf_b64 or "",
+            "image": image,
+            "pdf": pdf,
             "metadata": metadata or {}
         }
         
@@ -39,7 +39,7 @@ class BaseAgent(ABC):
         return message
     
     @abstractmethod
-    def process(self, *args, **kwargs) -> str:
+    async def process(self, *args, **kwargs) -> str:
         """Her agent'in implement etmesi gereken metod"""
         pass
     
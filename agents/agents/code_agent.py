@@ -1,14 +1,15 @@
 import os
 import sys
 import re
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Any, Tuple
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from prompts.code_prompt import get_manim_prompt
 from prompts.scene_prompt import scene_combination_prompt
-from services.gemini import generate
+from services.gemini import astream
 from agents.base_agent import BaseAgent
 from utils.validators import validate_manim_code
+from utils.code_stream import PythonBlockExtractor, IncrementalSyntaxChecker, CodeStreamError
 
 class CodeAgent(BaseAgent):
     """Manim kod üretimi için özelleşmiş agent"""
@@ -17,17 +18,19 @@ class CodeAgent(BaseAgent):
         super().__init__(get_manim_prompt(), "CodeAgent")
         self.scene_counter = 0
         
-    def process(self, 
+    async def process(self, 
                 question: str, 
-                image_b64: Optional[str] = None,
-                scene_type: str = "solution") -> str:
+                image: Optional[Dict[str, Any]] = None,
+                scene_type: str = "solution",
+                use_cache: bool = True) -> str:
         """
         Soru metni ve opsiyonel görsel ile Manim video çözüm kodu üretir.
         
         Args:
             question: Soru metni veya konu açıklaması
-            image_b64: Base64 kodlanmış görsel
+            image: Görsel eki (path, sha256, mime)
             scene_type: Sahne tipi (solution, topic, intro, outro)
+            use_cache: False ise önbellekteki yanıt yerine yeni kod üretilir
             
         Returns:
             Manim kodu
@@ -39,11 +42,11 @@ class CodeAgent(BaseAgent):
         
         message = self.build_message(
             question, 
-            image_b64=image_b64,
+            image=image,
             metadata={"scene_type": scene_type}
         )
         
-        code = generate(message)
+        code = await self._generate_code(message, use_cache)
         
         # Kodu temizle ve doğrula
         clean_code = self._extract_python_code(code)
@@ -55,12 +58,13 @@ class CodeAgent(BaseAgent):
             self.logger.error("Generated code validation failed")
             raise ValueError("Invalid Manim code generated")
     
-    def generate_combined_scenes(self, scenes: List[Tuple[str, str]]) -> str:
+    async def generate_combined_scenes(self, scenes: List[Tuple[str, str]], use_cache: bool = True) -> str:
         """
         Birden fazla sahneyi birleştiren kod üretir.
         
         Args:
             scenes: (sahne_tipi, sahne_kodu) tuple listesi
+            use_cache: False ise önbellekteki yanıt yerine yeni kod üretilir
             
         Returns:
             Birleştirilmiş Manim kodu
@@ -76,10 +80,32 @@ class CodeAgent(BaseAgent):
         )
         
         message = {"text": combined_prompt, "image": "", "pdf": ""}
-        combined_code = generate(message)
+        combined_code = await self._generate_code(message, use_cache)
         
         return self._extract_python_code(combined_code)
     
+    async def _generate_code(self, message: Dict[str, Any], use_cache: bool) -> str:
+        """
+        Yanıtı akış halinde alır; ```python bloğu geldikçe sözdizimi kontrol
+        edilir ve kesin bir hata görülürse üretim beklemeden kesilir.
+        
+        Raises:
+            CodeStreamError: Kod akış sırasında bozuk çıktıysa
+        """
+        extractor = PythonBlockExtractor()
+        checker = IncrementalSyntaxChecker()
+        stream = astream(message, use_cache=use_cache)
+        try:
+            async for chunk in stream:
+                checker.feed(extractor.feed(chunk))
+        except CodeStreamError as e:
+            self.logger.error(f"Code generation aborted early: {e}")
+            raise
+        finally:
+            await stream.aclose()
+        
+        return extractor.text
+    
     def _extract_python_code(self, response: str) -> str:
         """Yanıttan Python kodunu çıkarır"""
         code_match = re.search(r'```python\n(.*?)```', response, re.DOTALL)
@@ -1,4 +1,5 @@
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Callable, Awaitable, Any
+import asyncio
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -6,6 +7,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from agents.code_agent import CodeAgent
 from services.logger import get_logger
 
+# Birleştirmede sahnelerin sırası (listede olmayan içerik sahneleri ortada kalır)
+SCENE_ORDER = {"intro": 0, "outro": 2}
+
+# Düğüm adı -> (bağımlılıklar, bağımlılık sonuçlarını alıp kod üreten fonksiyon)
+SceneGraph = Dict[str, Tuple[List[str], Callable[[Dict[str, str]], Awaitable[str]]]]
+
 class SceneManager:
     """Video sahnelerini yöneten sınıf"""
     
@@ -15,7 +22,10 @@ class SceneManager:
         self.scenes = []
         self.scene_order = []
         
-    def create_intro_scene(self, title: str, subtitle: Optional[str] = None) -> str:
+    async def create_intro_scene(self,
+                           title: str,
+                           subtitle: Optional[str] = None,
+                           use_cache: bool = True) -> str:
         """Giriş sahnesi oluşturur"""
         self.logger.info(f"Creating intro scene for: {title}")
         
@@ -26,22 +36,23 @@ class SceneManager:
         yumuşak geçişler kullan.
         """
         
-        code = self.code_agent.process(intro_content, scene_type="intro")
+        code = await self.code_agent.process(intro_content, scene_type="intro", use_cache=use_cache)
         self.scenes.append(("intro", code))
         return code
     
-    def create_content_scene(self, 
+    async def create_content_scene(self, 
                            content: str, 
                            scene_type: str = "solution",
-                           image_b64: Optional[str] = None) -> str:
+                           image: Optional[Dict[str, Any]] = None,
+                           use_cache: bool = True) -> str:
         """İçerik sahnesi oluşturur (çözüm veya konu)"""
         self.logger.info(f"Creating {scene_type} scene")
         
-        code = self.code_agent.process(content, image_b64, scene_type)
+        code = await self.code_agent.process(content, image, scene_type, use_cache=use_cache)
         self.scenes.append((scene_type, code))
         return code
     
-    def create_transition_scene(self, 
+    async def create_transition_scene(self, 
                               from_scene: str, 
                               to_scene: str,
                               transition_text: Optional[str] = None) -> str:
@@ -54,13 +65,14 @@ class SceneManager:
         Yumuşak animasyonlar kullan.
         """
         
-        code = self.code_agent.process(transition_content, scene_type="transition")
+        code = await self.code_agent.process(transition_content, scene_type="transition")
         self.scenes.append(("transition", code))
         return code
     
-    def create_outro_scene(self, 
+    async def create_outro_scene(self, 
                          summary: Optional[str] = None,
-                         call_to_action: Optional[str] = None) -> str:
+                         call_to_action: Optional[str] = None,
+                         use_cache: bool = True) -> str:
         """Çıkış sahnesi oluşturur"""
         self.logger.info("Creating outro scene")
         
@@ -70,11 +82,11 @@ class SceneManager:
         Teşekkür mesajı ve logo ile bitir.
         """
         
-        code = self.code_agent.process(outro_content, scene_type="outro")
+        code = await self.code_agent.process(outro_content, scene_type="outro", use_cache=use_cache)
         self.scenes.append(("outro", code))
         return code
     
-    def combine_all_scenes(self) -> str:
+    async def combine_all_scenes(self, use_cache: bool = True) -> str:
         """Tüm sahneleri birleştirir"""
         if not self.scenes:
             raise ValueError("No scenes to combine")
@@ -85,17 +97,104 @@ class SceneManager:
         self._optimize_scene_order()
         
         # Sahneleri birleştir
-        combined_code = self.code_agent.generate_combined_scenes(self.scenes)
+        combined_code = await self.code_agent.generate_combined_scenes(self.scenes, use_cache=use_cache)
         
         return self._add_scene_management(combined_code)
     
+    async def run_graph(self, graph: SceneGraph) -> Dict[str, str]:
+        """
+        Sahne üretimlerini bağımlılık grafiğine göre çalıştırır.
+        
+        Bağımlılıkları tamamlanan düğümler eşzamanlı başlatılır. Bir düğüm
+        hata verirse (veya çağıran iptal edilirse) aynı anda biten görevlerin
+        hataları da toplanıp loglanır, çalışan tüm görevler iptal edilir ve
+        ilk hata yukarı iletilir.
+        
+        Returns:
+            Düğüm adı -> üretilen sonuç
+        """
+        results: Dict[str, str] = {}
+        waiting = dict(graph)
+        running: Dict[asyncio.Task, str] = {}
+        
+        try:
+            while waiting or running:
+                for name, (deps, factory) in list(waiting.items()):
+                    if all(dep in results for dep in deps):
+                        del waiting[name]
+                        running[asyncio.ensure_future(factory(results))] = name
+                
+                if not running:
+                    raise ValueError(f"Unresolvable scene dependencies: {sorted(waiting)}")
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                errors = []
+                # Başlatılma sırasıyla; biten her görevin hatası alınır
+                for task in [task for task in running if task in done]:
+                    name = running.pop(task)
+                    try:
+                        results[name] = task.result()
+                    except Exception as e:
+                        self.logger.error(f"Scene graph node failed: {name}: {e}")
+                        errors.append(e)
+                        continue
+                    self.logger.info(f"Scene graph node finished: {name}")
+                
+                if errors:
+                    raise errors[0]
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        
+        return results
+    
+    async def create_full_video_scenes(self,
+                                       content: str,
+                                       solve: Callable[[], Awaitable[str]],
+                                       image: Optional[Dict[str, Any]] = None,
+                                       use_cache: bool = True) -> List[Tuple[str, str]]:
+        """
+        Giriş, çözüm ve çıkış sahnelerini üretir.
+        
+        Giriş ve çıkış sahneleri çözümden bağımsız olduğu için çözümle
+        eşzamanlı üretilir; toplam süre en uzun zincir kadardır. Her sahne
+        ayrı renderlanacağı için birleştirme için LLM çağrısı yapılmaz.
+        
+        Returns:
+            Oynatma sırasına göre (sahne tipi, kod) listesi
+        """
+        graph: SceneGraph = {
+            "solution": ([], lambda _: solve()),
+            "intro": ([], lambda _: self.create_intro_scene(
+                title="Matematik Çözümü",
+                subtitle=content[:50] + "...",
+                use_cache=use_cache
+            )),
+            "outro": ([], lambda _: self.create_outro_scene(
+                summary="Bu videoda " + content[:100] + " problemini çözdük",
+                call_to_action="Daha fazla çözüm için kanalımıza abone olun!",
+                use_cache=use_cache
+            )),
+            "content": (["solution"], lambda results: self.create_content_scene(
+                results["solution"],
+                scene_type="solution",
+                image=image,
+                use_cache=use_cache
+            )),
+        }
+        
+        await self.run_graph(graph)
+        self._optimize_scene_order()
+        return list(self.scenes)
+    
     def _optimize_scene_order(self):
         """Sahne sırasını optimize eder"""
-        # Intro her zaman başta
-        # Outro her zaman sonda
-        # Transition'lar uygun yerlerde
-        # Content sahneleri mantıklı sırada
-        pass
+        # Sahneler eşzamanlı üretildiği için tamamlanma sırası rastgeledir;
+        # intro her zaman başta, outro her zaman sonda, içerik sahneleri
+        # eklenme sıralarını korur
+        self.scenes.sort(key=lambda scene: SCENE_ORDER.get(scene[0], 1))
     
     def _add_scene_management(self, code: str) -> str:
         """Sahne yönetimi kodunu ekler"""
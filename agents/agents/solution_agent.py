@@ -1,10 +1,10 @@
 import os
 import sys
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Any
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from prompts.solution_prompt import get_solution_prompt
-from services.gemini import generate
+from services.gemini import agenerate
 from agents.base_agent import BaseAgent
 from utils.validators import validate_solution_format
 
@@ -13,21 +13,22 @@ class SolutionAgent(BaseAgent):
     
     def __init__(self):
         super().__init__(get_solution_prompt(), "SolutionAgent")
-        self.solution_cache = {}
         
-    def process(self, 
+    async def process(self, 
                 question: str, 
-                image_b64: Optional[str] = None, 
-                pdf_b64: Optional[str] = None,
-                difficulty_level: str = "medium") -> str:
+                image: Optional[Dict[str, Any]] = None, 
+                pdf: Optional[Dict[str, Any]] = None,
+                difficulty_level: str = "medium",
+                use_cache: bool = True) -> str:
         """
         Soru metni ve opsiyonel görsel/pdf ile detaylı çözüm üretir.
         
         Args:
             question: Soru metni
-            image_b64: Base64 kodlanmış görsel
-            pdf_b64: Base64 kodlanmış PDF
+            image: Görsel eki (path, sha256, mime)
+            pdf: PDF eki (path, sha256, mime)
             difficulty_level: Zorluk seviyesi (easy, medium, hard)
+            use_cache: False ise önbellekteki yanıt yerine yeni çözüm üretilir
             
         Returns:
             Yapılandırılmış çözüm metni
@@ -35,28 +36,21 @@ class SolutionAgent(BaseAgent):
         if not self.validate_input(question):
             raise ValueError("Invalid question provided")
             
-        # Cache kontrolü
-        cache_key = self._generate_cache_key(question, image_b64, pdf_b64)
-        if cache_key in self.solution_cache:
-            self.logger.info("Returning cached solution")
-            return self.solution_cache[cache_key]
-            
         self.logger.info(f"Solving question with difficulty: {difficulty_level}")
         
         message = self.build_message(
             question, 
-            image_b64=image_b64, 
-            pdf_b64=pdf_b64,
+            image=image, 
+            pdf=pdf,
             metadata={"difficulty": difficulty_level}
         )
         
-        solution = generate(message)
+        solution = await agenerate(message, use_cache=use_cache)
         
         # Çözümü yapılandır ve doğrula
         structured_solution = self._structure_solution(solution)
         
         if validate_solution_format(structured_solution):
-            self.solution_cache[cache_key] = structured_solution
             return structured_solution
         else:
             self.logger.error("Solution format validation failed")
@@ -69,12 +63,6 @@ class SolutionAgent(BaseAgent):
         # Her adım için başlık, açıklama, formül vb. bilgileri çıkar
         return steps
     
-    def _generate_cache_key(self, question: str, image: Optional[str], pdf: Optional[str]) -> str:
-        """Cache için unique key üretir"""
-        import hashlib
-        content = f"{question}_{bool(image)}_{bool(pdf)}"
-        return hashlib.md5(content.encode()).hexdigest()
-    
     def _structure_solution(self, raw_solution: str) -> str:
         """Ham çözümü yapılandırır"""
         # Başlıklar, adımlar, formüller vb. düzenle
@@ -4,7 +4,7 @@ from typing import Optional, Dict, List
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from prompts.topic_prompt import get_topic_prompt
-from services.gemini import generate
+from services.gemini import agenerate
 from agents.base_agent import BaseAgent
 from utils.validators import validate_topic_content
 
@@ -15,10 +15,11 @@ class TopicAgent(BaseAgent):
         super().__init__(get_topic_prompt(), "TopicAgent")
         self.topic_hierarchy = {}
         
-    def process(self, 
+    async def process(self, 
                 topic: str, 
                 depth_level: str = "detailed",
-                include_examples: bool = True) -> str:
+                include_examples: bool = True,
+                use_cache: bool = True) -> str:
         """
         Konu başlığı alır, detaylı açıklama üretir.
         
@@ -26,6 +27,7 @@ class TopicAgent(BaseAgent):
             topic: Konu başlığı veya açıklaması
             depth_level: Detay seviyesi (basic, detailed, comprehensive)
             include_examples: Örnekler eklensin mi?
+            use_cache: False ise önbellekteki yanıt yerine yeni anlatım üretilir
             
         Returns:
             Yapılandırılmış konu anlatımı
@@ -43,7 +45,7 @@ class TopicAgent(BaseAgent):
             }
         )
         
-        explanation = generate(message)
+        explanation = await agenerate(message, use_cache=use_cache)
         
         # İçeriği yapılandır ve doğrula
         structured_content = self._structure_content(explanation, topic)
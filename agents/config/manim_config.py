@@ -1,6 +1,20 @@
 from manim import config, WHITE, BLACK, RED, GREEN, BLUE, YELLOW
 from pathlib import Path
 
+# Render kalite ön ayarları (taslak: kodun uçtan uca çalıştığını hızlıca doğrular)
+QUALITY_PRESETS = {
+    "draft": {
+        "pixel_width": 854,
+        "pixel_height": 480,
+        "frame_rate": 15
+    },
+    "final": {
+        "pixel_width": 1920,
+        "pixel_height": 1080,
+        "frame_rate": 60
+    }
+}
+
 class ManimConfig:
     """Manim yapılandırma ayarları"""
     
@@ -45,6 +59,30 @@ class ManimConfig:
             "fade_time": 0.5,
             "wait_time": 1.0
         }
+        
+        # Seslendirme ayarları (TTS önbelleği ile aynı değerler)
+        from config import settings
+        self.tts_config = {
+            "service": settings.tts_engine,
+            "lang": settings.tts_voice,
+            "speed": settings.tts_speed
+        }
+    
+    def quality_overrides(self, quality: str = "final") -> dict:
+        """Kalite ön ayarına ait tempconfig değerlerini döndürür"""
+        if quality not in QUALITY_PRESETS:
+            raise ValueError(f"Unknown render quality: {quality}")
+        return dict(QUALITY_PRESETS[quality])
+    
+    def render_signature(self) -> dict:
+        """Render çıktısını etkileyen ayarları döndürür (önbellek anahtarı için)"""
+        return {
+            "pixel_width": config.pixel_width,
+            "pixel_height": config.pixel_height,
+            "frame_rate": config.frame_rate,
+            "background_color": str(config.background_color),
+            "tts": dict(self.tts_config)
+        }
     
     def get_scene_config(self, scene_type: str) -> dict:
         """Sahne tipine göre özel yapılandırma döndürür"""
@@ -19,6 +19,7 @@ class Settings(BaseSettings):
     static_dir: Path = base_dir / "static"
     video_output_dir: Path = static_dir / "videomedia"
     temp_dir: Path = base_dir / "temp"
+    data_dir: Path = base_dir / "data"
     
     # Server Settings
     host: str = "0.0.0.0"
@@ -29,6 +30,18 @@ class Settings(BaseSettings):
     default_video_quality: str = "1080p60"
     default_video_format: str = "mp4"
     max_video_duration: int = 600  # seconds
+    render_workers: int = 0  # 0 = CPU çekirdek sayısı kadar render işçisi
+    enable_render_cache: bool = True
+    render_cache_dir: Path = static_dir / "render_cache"
+    render_cache_max_bytes: int = 5 * 1024 * 1024 * 1024  # 5GB
+    enable_draft_render: bool = True  # final render öncesi 480p15 taslak render ve önizleme
+    
+    # TTS Settings
+    tts_engine: str = Field("gtts", env="TTS_ENGINE")  # gtts (ağ gerekir), espeak (çevrimdışı)
+    tts_voice: str = "tr"
+    tts_speed: float = 1.0
+    tts_cache_dir: Path = static_dir / "tts_cache"
+    tts_presynth_workers: int = 8  # render öncesi paralel sentez
     
     # AI Settings
     llm_provider: str = Field("gemini", env="LLM_PROVIDER") 
@@ -36,10 +49,40 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4o-mini" #
     max_retries: int = 3
     timeout: int = 130
+    llm_max_concurrency: int = 16  # sağlayıcı başına eşzamanlı LLM isteği
+    llm_secondary_provider: Optional[str] = Field("openai", env="LLM_SECONDARY_PROVIDER")  # hedging/failover
+    llm_hedging_enabled: bool = True
+    llm_hedge_min_samples: int = 20  # p95 güvenilir olana kadar hedging yapılmaz
+    llm_hedge_min_delay: float = 5.0  # seconds
+    llm_stats_window: int = 200
+    llm_breaker_threshold: int = 3
+    llm_breaker_reset_timeout: int = 60  # seconds
+    llm_inline_attachment_max_bytes: int = 15 * 1024 * 1024  # üstündeki ekler Files API ile gönderilir
     
     # Cache Settings
     enable_cache: bool = True
     cache_ttl: int = 3600  # seconds
+    llm_cache_path: Path = data_dir / "llm_cache.sqlite3"
+    llm_cache_max_entries: int = 10000
+    
+    # Video Catalog
+    video_catalog_path: Path = data_dir / "video_catalog.sqlite3"
+    
+    # Job Store Settings
+    job_store_backend: str = Field("sqlite", env="JOB_STORE_BACKEND")  # sqlite, redis
+    job_store_path: Path = data_dir / "jobs.sqlite3"
+    job_store_url: str = Field("redis://localhost:6379/0", env="JOB_STORE_URL")
+    job_ttl: int = 7 * 24 * 3600  # seconds
+    
+    # Status Events
+    webhook_secret: str = Field("", env="VIDEO_WEBHOOK_SECRET")  # Django ile paylaşılan HMAC anahtarı
+    webhook_timeout: float = 10.0
+    webhook_max_attempts: int = 3
+    sse_keepalive_interval: int = 15  # seconds
+    # SSE olaylarının API işçilerine dağıtımı: auto (redis deposunda pub/sub, sqlite'ta depo yoklama),
+    # redis, store veya local (yalnızca aynı işçi; API tek işçiyle çalışmalı)
+    sse_fanout: str = Field("auto", env="SSE_FANOUT")
+    sse_poll_interval: float = 1.0  # seconds
     
     # Logging
     log_level: str = "INFO"
@@ -55,5 +98,6 @@ class Settings(BaseSettings):
         self.upload_dir.mkdir(exist_ok=True)
         self.video_output_dir.mkdir(parents=True, exist_ok=True)
         self.temp_dir.mkdir(exist_ok=True)
+        self.data_dir.mkdir(exist_ok=True)
         if self.log_file:
             self.log_file.parent.mkdir(exist_ok=True)
\ No newline at end of file
@@ -1,19 +1,26 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks, Request
 from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional, List
 import shutil
+import asyncio
 import os
 import uuid
+import json
 from pathlib import Path
 import mimetypes
 
 from config import settings
 from services.create_video import VideoCreator
+from services.render_pool import shutdown_render_pool
+from services.llm_cache import get_llm_cache
+from services.llm_router import get_llm_router
+from services.video_catalog import get_video_catalog
 from services.logger import get_logger
-from utils.file_handler import FileHandler
+from utils.file_handler import FileHandler, FileTooLargeError
 from utils.validators import validate_file_type
+from utils.range_response import RangeFileResponse
 
 app = FastAPI(title="Eğitim Video Oluşturucu", version="2.2")
 logger = get_logger("API")
@@ -37,13 +44,36 @@ app.mount("/videos", StaticFiles(directory=str(final_videos_dir)), name="videos"
 
 # Global değişkenler
 file_handler = FileHandler()
+video_catalog = get_video_catalog()
 video_creator = VideoCreator()
 
+@app.on_event("startup")
+async def startup_event():
+    """Süresi dolmuş iş kayıtlarını temizle"""
+    purged = await asyncio.to_thread(video_creator.job_store.purge_expired)
+    if purged:
+        logger.info(f"Purged {purged} expired job records")
+    
+    # Katalog boşsa mevcut videoları bir kez arka planda indeksle
+    if (await video_catalog.astats())["total_videos"] == 0:
+        asyncio.create_task(video_catalog.reindex({
+            "final": final_videos_dir,
+            "old": settings.video_output_dir
+        }))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Uygulama kapanırken render işçilerini durdur"""
+    shutdown_render_pool()
+    await video_creator.status_broker.close()
+
 @app.post("/api/create_video")
 async def create_video(
     background_tasks: BackgroundTasks,
     text: str = Form(...),
     video_type: str = Form("solution"),  # solution, topic, full
+    callback_url: Optional[str] = Form(None),
+    request_id: Optional[str] = Form(None),
     files: Optional[List[UploadFile]] = File(None)
 ):
     """
@@ -52,9 +82,20 @@ async def create_video(
     Args:
         text: Soru veya konu metni
         video_type: Video tipi (solution, topic, full)
+        callback_url: Durum geçişlerinin imzalı olarak POST edileceği webhook adresi
+        request_id: İstemcinin önceden kaydettiği iş kimliği (UUID); verilmezse üretilir.
+            Böylece istemci, ilk webhook gelmeden önce işi kendi tarafında kaydedebilir.
         files: Yüklenen dosyalar (görsel, PDF)
     """
-    request_id = str(uuid.uuid4())
+    if request_id:
+        try:
+            request_id = str(uuid.UUID(request_id))
+        except ValueError:
+            raise HTTPException(400, "Geçersiz request_id")
+        if await asyncio.to_thread(video_creator.get_status, request_id):
+            raise HTTPException(409, f"request_id zaten kullanımda: {request_id}")
+    else:
+        request_id = str(uuid.uuid4())
     logger.info(f"New video request: {request_id}, type: {video_type}")
     
     try:
@@ -65,8 +106,8 @@ async def create_video(
                 if not validate_file_type(file.filename):
                     raise HTTPException(400, f"Desteklenmeyen dosya tipi: {file.filename}")
                 
-                file_path = await file_handler.save_upload(file, request_id)
-                file_data = await file_handler.process_file(file_path)
+                upload = await file_handler.save_upload(file, request_id)
+                file_data = await file_handler.process_file(upload)
                 processed_files.append(file_data)
         
         # Video oluşturmayı arka planda başlat
@@ -75,7 +116,8 @@ async def create_video(
             request_id,
             text,
             video_type,
-            processed_files
+            processed_files,
+            callback_url
         )
         
         return JSONResponse({
@@ -83,10 +125,15 @@ async def create_video(
             "status": "processing",
             "message": "Video oluşturma işlemi başlatıldı",
             "check_status_url": f"/api/status/{request_id}",
+            "events_url": f"/api/events?request_id={request_id}",
             "video_url": f"/api/video/{request_id}",
             "direct_video_url": f"/videos/{request_id}.mp4"
         })
         
+    except HTTPException:
+        raise
+    except FileTooLargeError as e:
+        raise HTTPException(413, str(e))
     except Exception as e:
         logger.error(f"Error creating video: {str(e)}")
         raise HTTPException(500, f"Video oluşturma hatası: {str(e)}")
@@ -94,23 +141,66 @@ async def create_video(
 @app.get("/api/status/{request_id}")
 async def check_status(request_id: str):
     """Video oluşturma durumunu kontrol et"""
-    status = video_creator.get_status(request_id)
+    status = await asyncio.to_thread(video_creator.get_status, request_id)
     
     if not status:
         raise HTTPException(404, "İstek bulunamadı")
     
-    # Video hazırsa URL'leri ekle
-    if status["status"] == "completed":
-        status["video_urls"] = {
-            "api": f"/api/video/{request_id}",
-            "direct": f"/videos/{request_id}.mp4",
-            "static": f"/static/final_videos/{request_id}.mp4"
-        }
+    # Video URL'leri ve taslak önizleme, yayınlanan olaylarla aynı biçimde eklenir
+    status.update(video_creator.status_event(status))
     
     return JSONResponse(status)
 
+@app.get("/api/events")
+async def status_events(request: Request, request_id: Optional[str] = None):
+    """
+    İş durum geçişlerini Server-Sent Events olarak yayınla
+    
+    Args:
+        request_id: Verilirse yalnızca bu işin olayları gönderilir
+    """
+    broker = video_creator.status_broker
+    queue = broker.subscribe()
+    
+    async def event_stream():
+        try:
+            # Bağlanan istemci mevcut durumu beklemeden alsın
+            if request_id:
+                record = await asyncio.to_thread(video_creator.get_status, request_id)
+                if record:
+                    yield f"event: status\ndata: {json.dumps(video_creator.status_event(record))}\n\n"
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.sse_keepalive_interval)
+                except asyncio.TimeoutError:
+                    # Proxy'lerin bağlantıyı kapatmaması için yorum satırı
+                    yield ": keepalive\n\n"
+                    continue
+                if request_id and event["request_id"] != request_id:
+                    continue
+                yield f"event: status\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/jobs")
+async def list_jobs(status: str = "processing", limit: int = 100):
+    """Belirli durumdaki işleri listele"""
+    jobs = await asyncio.to_thread(video_creator.job_store.list_by_status, status, min(limit, 500))
+    return JSONResponse({
+        "status": status,
+        "jobs": jobs,
+        "count": len(jobs)
+    })
+
 @app.get("/api/video/{request_id}")
-async def get_video(request_id: str):
+async def get_video(request_id: str, request: Request):
     """Oluşturulan videoyu indir - Geliştirilmiş erişim"""
     
     # Önce final_videos dizininde ara
@@ -151,21 +241,18 @@ async def get_video(request_id: str):
     media_type = mimetypes.guess_type(str(video_path))[0] or "video/mp4"
     
     try:
-        return FileResponse(
-            path=str(video_path),
+        return RangeFileResponse(
+            video_path,
+            request.headers,
             media_type=media_type,
-            filename=f"egitim_video_{request_id}.mp4",
-            headers={
-                "Content-Length": str(video_path.stat().st_size),
-                "Accept-Ranges": "bytes"
-            }
+            filename=f"egitim_video_{request_id}.mp4"
         )
     except Exception as e:
         logger.error(f"Error serving video {request_id}: {str(e)}")
         raise HTTPException(500, f"Video servis hatası: {str(e)}")
 
 @app.get("/api/stream/{request_id}")
-async def stream_video(request_id: str):
+async def stream_video(request_id: str, request: Request):
     """Video streaming endpoint'i - büyük dosyalar için"""
     
     # Video dosyasını bul
@@ -178,112 +265,61 @@ async def stream_video(request_id: str):
             raise HTTPException(404, "Video bulunamadı")
         final_video_path = video_path
     
-    def generate():
-        with open(final_video_path, "rb") as video_file:
-            while True:
-                chunk = video_file.read(8192)  # 8KB chunks
-                if not chunk:
-                    break
-                yield chunk
-    
-    return StreamingResponse(
-        generate(),
-        media_type="video/mp4",
-        headers={
-            "Content-Length": str(final_video_path.stat().st_size),
-            "Accept-Ranges": "bytes"
-        }
-    )
+    # Range isteklerinde sadece istenen bölüm gönderilir (206), oynatıcı ileri sarabilir
+    return RangeFileResponse(final_video_path, request.headers, media_type="video/mp4")
 
 @app.get("/api/videos")
-async def list_videos():
-    """Oluşturulan videoları listele - Geliştirilmiş"""
-    videos = []
-    
-    # Final videos dizinindeki videoları listele
-    if final_videos_dir.exists():
-        for video_file in final_videos_dir.glob("*.mp4"):
-            try:
-                stat = video_file.stat()
-                videos.append({
-                    "id": video_file.stem,
-                    "filename": video_file.name,
-                    "size": stat.st_size,
-                    "size_mb": round(stat.st_size / 1024 / 1024, 2),
-                    "created": stat.st_ctime,
-                    "modified": stat.st_mtime,
-                    "urls": {
-                        "api": f"/api/video/{video_file.stem}",
-                        "direct": f"/videos/{video_file.stem}.mp4",
-                        "stream": f"/api/stream/{video_file.stem}",
-                        "static": f"/static/final_videos/{video_file.stem}.mp4"
-                    },
-                    "location": "final",
-                    "has_audio": await _check_video_has_audio(video_file),
-                    "related_files": _get_related_files(video_file)
-                })
-            except Exception as e:
-                logger.warning(f"Error processing video {video_file}: {e}")
-    
-    # Eski konumdaki videoları da listele (backward compatibility)
-    for video_file in settings.video_output_dir.glob("*.mp4"):
-        # Final videos'da yoksa ekle
-        if not any(v["id"] == video_file.stem for v in videos):
-            try:
-                stat = video_file.stat()
-                videos.append({
-                    "id": video_file.stem,
-                    "filename": video_file.name,
-                    "size": stat.st_size,
-                    "size_mb": round(stat.st_size / 1024 / 1024, 2),
-                    "created": stat.st_ctime,
-                    "modified": stat.st_mtime,
-                    "urls": {
-                        "api": f"/api/video/{video_file.stem}",
-                        "stream": f"/api/stream/{video_file.stem}"
-                    },
-                    "location": "old",
-                    "has_audio": await _check_video_has_audio(video_file),
-                    "related_files": _get_related_files(video_file)
-                })
-            except Exception as e:
-                logger.warning(f"Error processing old video {video_file}: {e}")
-    
-    # Oluşturma tarihine göre sırala (en yeni önce)
-    videos.sort(key=lambda x: x["created"], reverse=True)
+async def list_videos(limit: int = 50,
+                      offset: int = 0,
+                      location: Optional[str] = None,
+                      has_audio: Optional[bool] = None,
+                      sort: str = "created",
+                      order: str = "desc"):
+    """Oluşturulan videoları katalogdan sayfalı listele"""
+    limit = max(1, min(limit, 500))
+    videos, total = await video_catalog.alist(
+        limit=limit,
+        offset=max(offset, 0),
+        location=location,
+        has_audio=has_audio,
+        sort=sort,
+        descending=order.lower() != "asc"
+    )
     
     return JSONResponse({
-        "videos": videos,
+        "videos": [_video_entry(video) for video in videos],
         "count": len(videos),
+        "total": total,
+        "limit": limit,
+        "offset": offset,
         "total_size_mb": round(sum(v["size"] for v in videos) / 1024 / 1024, 2)
     })
 
-async def _check_video_has_audio(video_path: Path) -> bool:
-    """Video'da ses olup olmadığını kontrol et"""
-    try:
-        import subprocess
-        result = subprocess.run([
-            'ffprobe', '-v', 'quiet', '-select_streams', 'a:0', 
-            '-show_entries', 'stream=codec_name', '-of', 'csv=p=0', 
-            str(video_path)
-        ], capture_output=True, text=True, timeout=10)
-        
-        return result.returncode == 0 and result.stdout.strip()
-    except Exception:
-        return False
+@app.post("/api/videos/reindex")
+async def reindex_videos():
+    """Video dizinlerini tarayıp kataloğu yeniden oluştur"""
+    result = await video_catalog.reindex({
+        "final": final_videos_dir,
+        "old": settings.video_output_dir
+    })
+    return JSONResponse(result)
 
-def _get_related_files(video_path: Path) -> List[str]:
-    """Video ile ilgili dosyaları bul"""
-    related = []
-    base_name = video_path.stem
-    parent_dir = video_path.parent
-    
-    for ext in ['.srt', '.wav', '.mp3', '.txt', '.json']:
-        related_file = parent_dir / f"{base_name}{ext}"
-        if related_file.exists():
-            related.append(ext[1:])  # Nokta olmadan uzantı
+def _video_entry(video: dict) -> dict:
+    """Katalog kaydını API yanıtına dönüştür"""
+    video_id = video["id"]
+    urls = {
+        "api": f"/api/video/{video_id}",
+        "stream": f"/api/stream/{video_id}"
+    }
+    if video["location"] == "final":
+        urls["direct"] = f"/videos/{video_id}.mp4"
+        urls["static"] = f"/static/final_videos/{video_id}.mp4"
     
-    return related
+    entry = dict(video)
+    entry.pop("path", None)
+    entry["size_mb"] = round(video["size"] / 1024 / 1024, 2)
+    entry["urls"] = urls
+    return entry
 
 @app.delete("/api/video/{request_id}")
 async def delete_video(request_id: str):
@@ -292,7 +328,7 @@ async def delete_video(request_id: str):
     
     try:
         # Final videos dizininden sil
-        for ext in [".mp4", ".srt", ".wav", ".mp3", ".txt", ".json"]:
+        for ext in [".mp4", "_preview.mp4", ".srt", ".wav", ".mp3", ".txt", ".json"]:
             file_path = final_videos_dir / f"{request_id}{ext}"
             if file_path.exists():
                 file_path.unlink()
@@ -307,8 +343,9 @@ async def delete_video(request_id: str):
         if not deleted_files:
             raise HTTPException(404, "Video bulunamadı")
         
-        # Status'u temizle
-        video_creator.clear_status(request_id)
+        # Status'u ve katalog kaydını temizle
+        await asyncio.to_thread(video_creator.clear_status, request_id)
+        await video_catalog.aremove(request_id)
         
         return JSONResponse({
             "message": "Video başarıyla silindi",
@@ -329,7 +366,8 @@ async def cleanup_old_videos(days: int = 7):
         # Cleanup öncesi istatistikler
         old_count = len(list(final_videos_dir.glob("*.mp4"))) if final_videos_dir.exists() else 0
         
-        video_creator.cleanup_old_videos(days)
+        # Dosya silme, katalog ve iş deposu temizliği olay döngüsü dışında
+        await asyncio.to_thread(video_creator.cleanup_old_videos, days)
         
         # Cleanup sonrası istatistikler
         new_count = len(list(final_videos_dir.glob("*.mp4"))) if final_videos_dir.exists() else 0
@@ -350,16 +388,11 @@ async def system_status():
     try:
         old_videos_dir = settings.video_output_dir
         
-        final_count = len(list(final_videos_dir.glob("*.mp4"))) if final_videos_dir.exists() else 0
-        old_count = len(list(old_videos_dir.glob("*.mp4"))) if old_videos_dir.exists() else 0
+        catalog_stats = await video_catalog.astats()
+        final_count = catalog_stats["by_location"].get("final", 0)
+        old_count = catalog_stats["by_location"].get("old", 0)
         temp_count = len(list(settings.temp_dir.glob("*.py"))) if settings.temp_dir.exists() else 0
-        
-        # Disk kullanımı
-        total_size = 0
-        if final_videos_dir.exists():
-            for f in final_videos_dir.rglob("*"):
-                if f.is_file():
-                    total_size += f.stat().st_size
+        total_size = catalog_stats["total_size_bytes"]
         
         return JSONResponse({
             "status": "healthy",
@@ -367,13 +400,20 @@ async def system_status():
                 "final_videos": final_count,
                 "old_videos": old_count, 
                 "temp_files": temp_count,
-                "total_videos": final_count + old_count
+                "total_videos": catalog_stats["total_videos"]
             },
             "storage": {
                 "total_size_bytes": total_size,
                 "total_size_mb": round(total_size / 1024 / 1024, 2),
-                "total_size_gb": round(total_size / 1024 / 1024 / 1024, 2)
+                "total_size_gb": round(total_size / 1024 / 1024 / 1024, 2),
+                "total_duration_seconds": catalog_stats["total_duration_seconds"]
             },
+            "render_pool": video_creator.render_pool.stats(),
+            "render_cache": video_creator.render_cache.stats() if video_creator.render_cache else None,
+            "llm_cache": get_llm_cache().stats() if get_llm_cache() else None,
+            "llm_router": get_llm_router().snapshot(),
+            "autofix": video_creator.autofixer.stats(),
+            "tts_cache": video_creator.tts_cache.stats(),
             "directories": {
                 "final_videos": str(final_videos_dir),
                 "video_output": str(old_videos_dir),
@@ -394,54 +434,41 @@ async def system_status():
 async def get_video_info(request_id: str):
     """Video detay bilgilerini al"""
     try:
-        # Video dosyasını bul
-        final_video_path = final_videos_dir / f"{request_id}.mp4"
-        
-        if not final_video_path.exists():
-            video_path = settings.video_output_dir / f"{request_id}.mp4"
-            if not video_path.exists():
-                raise HTTPException(404, "Video bulunamadı")
-            final_video_path = video_path
+        video = await video_catalog.aget(request_id)
         
-        # Video bilgilerini al
-        stat = final_video_path.stat()
-        
-        # FFprobe ile video metadata'sını al
-        import subprocess
-        import json
+        # Katalogda yoksa (ör. elle kopyalanmış) bulup bir kez indeksle
+        if not video:
+            for location, directory in (("final", final_videos_dir), ("old", settings.video_output_dir)):
+                video_path = directory / f"{request_id}.mp4"
+                if video_path.exists():
+                    video = await video_catalog.index_video(video_path, location)
+                    break
         
-        try:
-            result = subprocess.run([
-                'ffprobe', '-v', 'quiet', '-print_format', 'json',
-                '-show_format', '-show_streams', str(final_video_path)
-            ], capture_output=True, text=True, timeout=10)
-            
-            metadata = json.loads(result.stdout) if result.returncode == 0 else {}
-        except Exception:
-            metadata = {}
+        if not video:
+            raise HTTPException(404, "Video bulunamadı")
         
         return JSONResponse({
             "id": request_id,
-            "filename": final_video_path.name,
-            "path": str(final_video_path),
+            "filename": video["filename"],
+            "path": video["path"],
             "size": {
-                "bytes": stat.st_size,
-                "mb": round(stat.st_size / 1024 / 1024, 2),
-                "human": f"{stat.st_size / 1024 / 1024:.1f} MB"
+                "bytes": video["size"],
+                "mb": round(video["size"] / 1024 / 1024, 2),
+                "human": f"{video['size'] / 1024 / 1024:.1f} MB"
             },
             "timestamps": {
-                "created": stat.st_ctime,
-                "modified": stat.st_mtime,
-                "accessed": stat.st_atime
+                "created": video["created"],
+                "modified": video["modified"]
             },
             "urls": {
                 "download": f"/api/video/{request_id}",
                 "stream": f"/api/stream/{request_id}",
                 "direct": f"/videos/{request_id}.mp4"
             },
-            "related_files": _get_related_files(final_video_path),
-            "has_audio": await _check_video_has_audio(final_video_path),
-            "metadata": metadata
+            "duration": video["duration"],
+            "related_files": video["related_files"],
+            "has_audio": video["has_audio"],
+            "metadata": video["metadata"]
         })
         
     except HTTPException:
@@ -460,10 +487,12 @@ async def root():
         "endpoints": {
             "create_video": "/api/create_video",
             "check_status": "/api/status/{request_id}",
+            "list_jobs": "/api/jobs",
             "get_video": "/api/video/{request_id}",
             "stream_video": "/api/stream/{request_id}",
             "video_info": "/api/video/{request_id}/info",
             "list_videos": "/api/videos",
+            "reindex_videos": "/api/videos/reindex",
             "delete_video": "/api/video/{request_id}",
             "cleanup": "/api/cleanup",
             "system_status": "/api/system/status"
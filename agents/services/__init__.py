@@ -1,6 +1,6 @@
 # services/__init__.py DOSYASINDAKİ DEĞİŞİKLİKLER
 
-from .gemini import generate, GeminiService
+from .gemini import generate, agenerate, astream, GeminiService
 from .openai import OpenAIService, get_openai_service # YENİ EKLENDİ
 from .create_video import VideoCreator
 from .video_merger import VideoMerger
@@ -8,6 +8,8 @@ from .logger import get_logger, setup_logging
 
 __all__ = [
     "generate", 
+    "agenerate",
+    "astream",
     "GeminiService",
     "OpenAIService",          # YENİ EKLENDİ
     "get_openai_service",     # YENİ EKLENDİ
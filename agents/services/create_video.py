@@ -1,10 +1,8 @@
 import os
 import sys
 import asyncio
-import importlib.util
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
 import traceback
 import shutil
 import glob
@@ -12,16 +10,26 @@ import subprocess
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from manim import *
 from agents.code_agent import CodeAgent
 from agents.topic_agent import TopicAgent
 from agents.solution_agent import SolutionAgent
 from agents.scene_manager import SceneManager
 from services.logger import get_logger
 from services.video_merger import VideoMerger
-from services.gemini import generate
+from services.render_pool import get_render_pool
+from services.job_store import get_job_store
+from services.render_cache import get_render_cache, SIDECAR_EXTENSIONS
+from services.video_catalog import get_video_catalog
+from services.status_broker import get_status_broker, status_event
+from services.tts_cache import get_tts_cache, extract_narrations, read_manifest
+from services.gemini import agenerate
 from prompts.error_prompt import get_error_fix_prompt
-from config import settings, manim_config
+from utils.manim_preflight import ensure_renderable, format_issues, PreflightError
+from utils.manim_autofix import get_autofixer
+from config import settings
+
+# Sessiz render çıktısına eklenebilecek yan ses dosyaları
+AUDIO_EXTENSIONS = [".wav", ".mp3", ".aac", ".m4a"]
 
 class VideoCreator:
     """Video oluşturma ve yönetim sınıfı - Ses ve erişim düzeltmeleri ile"""
@@ -31,9 +39,14 @@ class VideoCreator:
         self.topic_agent = TopicAgent()
         self.solution_agent = SolutionAgent()
         self.code_agent = CodeAgent()
-        self.scene_manager = SceneManager()
         self.video_merger = VideoMerger()
-        self.status_db = {}
+        self.render_pool = get_render_pool()
+        self.job_store = get_job_store()
+        self.video_catalog = get_video_catalog()
+        self.status_broker = get_status_broker()
+        self.render_cache = get_render_cache() if settings.enable_render_cache else None
+        self.autofixer = get_autofixer()
+        self.tts_cache = get_tts_cache()
         
         # Retry ayarları
         self.max_fix_attempts = 3
@@ -54,25 +67,28 @@ class VideoCreator:
                           request_id: str,
                           content: str,
                           video_type: str,
-                          files: List[Dict[str, Any]] = None) -> str:
+                          files: List[Dict[str, Any]] = None,
+                          callback_url: Optional[str] = None) -> str:
         """Ana video oluşturma metodu"""
         try:
-            self.update_status(request_id, "processing", "Video oluşturma başladı")
+            await self.aupdate_status(
+                request_id, "processing", "Video oluşturma başladı", callback_url=callback_url
+            )
             
-            # Dosyaları işle
-            image_b64 = None
-            pdf_b64 = None
+            # Ekler diskteki dosya yolu olarak taşınır, LLM katmanı gerektiğinde okur
+            image = None
+            pdf = None
             if files:
                 for file in files:
                     if file["type"] == "image":
-                        image_b64 = file["data"]
+                        image = file
                     elif file["type"] == "pdf":
-                        pdf_b64 = file["data"]
+                        pdf = file
             
             # Video tipine göre işlem yap
             if video_type == "full":
                 video_path = await self._create_full_video_with_retry(
-                    request_id, content, image_b64, pdf_b64
+                    request_id, content, image, pdf
                 )
             elif video_type == "topic":
                 video_path = await self._create_topic_video_with_retry(
@@ -80,42 +96,51 @@ class VideoCreator:
                 )
             else:  # solution
                 video_path = await self._create_solution_video_with_retry(
-                    request_id, content, image_b64, pdf_b64
+                    request_id, content, image, pdf
                 )
             
-            self.update_status(request_id, "completed", "Video hazır", video_path)
+            # Katalog kaydı listeleme ve bilgi uçlarının tek kaynağıdır
+            try:
+                await self.video_catalog.index_video(Path(video_path))
+            except Exception as catalog_error:
+                self.logger.warning(f"Video catalog update failed: {catalog_error}")
+            
+            await self.aupdate_status(request_id, "completed", "Video hazır", video_path)
             return video_path
             
         except Exception as e:
             self.logger.error(f"Video creation error: {str(e)}\n{traceback.format_exc()}")
-            self.update_status(request_id, "failed", f"Video oluşturulamadı: {str(e)}")
+            await self.aupdate_status(request_id, "failed", f"Video oluşturulamadı: {str(e)}")
             raise
     
     async def _create_solution_video_with_retry(self,
                                               request_id: str,
                                               content: str,
-                                              image_b64: Optional[str],
-                                              pdf_b64: Optional[str]) -> str:
+                                              image: Optional[Dict[str, Any]],
+                                              pdf: Optional[Dict[str, Any]]) -> str:
         """Çözüm videosu oluştur - Retry ile"""
         self.logger.info(f"Creating solution video with retry for request: {request_id}")
         
         for regenerate_attempt in range(self.max_regenerate_attempts):
             try:
-                self.update_status(
+                await self.aupdate_status(
                     request_id, 
                     "processing", 
                     f"Kod oluşturuluyor (Deneme {regenerate_attempt + 1}/{self.max_regenerate_attempts})"
                 )
                 
+                # İlk denemeden sonra önbellekteki aynı yanıtı tekrar kullanma
+                use_cache = regenerate_attempt == 0
+                
                 # Çözümü al
-                solution = self.solution_agent.process(content, image_b64, pdf_b64)
+                solution = await self.solution_agent.process(content, image, pdf, use_cache=use_cache)
                 
                 # Manim kodunu oluştur
-                manim_code = self.code_agent.process(solution, image_b64, "solution")
+                manim_code = await self.code_agent.process(solution, image, "solution", use_cache=use_cache)
                 
                 # Retry mekanizması ile renderla
                 video_path = await self._render_video_with_retry(
-                    request_id, manim_code, content, image_b64, "solution"
+                    request_id, manim_code, content, image, "solution"
                 )
                 
                 return video_path
@@ -137,17 +162,18 @@ class VideoCreator:
         
         for regenerate_attempt in range(self.max_regenerate_attempts):
             try:
-                self.update_status(
+                await self.aupdate_status(
                     request_id, 
                     "processing", 
                     f"Konu anlatımı oluşturuluyor (Deneme {regenerate_attempt + 1}/{self.max_regenerate_attempts})"
                 )
                 
                 # Konu anlatımını al
-                explanation = self.topic_agent.process(content)
+                use_cache = regenerate_attempt == 0
+                explanation = await self.topic_agent.process(content, use_cache=use_cache)
                 
                 # Manim kodunu oluştur
-                manim_code = self.code_agent.process(explanation, scene_type="topic")
+                manim_code = await self.code_agent.process(explanation, scene_type="topic", use_cache=use_cache)
                 
                 # Retry mekanizması ile renderla
                 video_path = await self._render_video_with_retry(
@@ -168,44 +194,37 @@ class VideoCreator:
     async def _create_full_video_with_retry(self, 
                                           request_id: str,
                                           content: str,
-                                          image_b64: Optional[str],
-                                          pdf_b64: Optional[str]) -> str:
+                                          image: Optional[Dict[str, Any]],
+                                          pdf: Optional[Dict[str, Any]]) -> str:
         """Tam video oluştur - Retry ile"""
         self.logger.info(f"Creating full video with retry for request: {request_id}")
         
         for regenerate_attempt in range(self.max_regenerate_attempts):
             try:
-                self.update_status(
+                await self.aupdate_status(
                     request_id, 
                     "processing", 
                     f"Tam video oluşturuluyor (Deneme {regenerate_attempt + 1}/{self.max_regenerate_attempts})"
                 )
                 
-                # Çözümü al
-                solution = self.solution_agent.process(content, image_b64, pdf_b64)
+                use_cache = regenerate_attempt == 0
                 
-                # Sahneleri oluştur
-                self.scene_manager.create_intro_scene(
-                    title="Matematik Çözümü",
-                    subtitle=content[:50] + "..."
-                )
+                # Her deneme kendi sahne listesiyle başlar
+                scene_manager = SceneManager()
                 
-                self.scene_manager.create_content_scene(
-                    solution,
-                    scene_type="solution",
-                    image_b64=image_b64
+                # Çözüm, giriş ve çıkış sahneleri eşzamanlı üretilir
+                scenes = await scene_manager.create_full_video_scenes(
+                    content,
+                    solve=lambda: self.solution_agent.process(
+                        content, image, pdf, use_cache=use_cache
+                    ),
+                    image=image,
+                    use_cache=use_cache
                 )
                 
-                self.scene_manager.create_outro_scene(
-                    summary="Bu videoda " + content[:100] + " problemini çözdük",
-                    call_to_action="Daha fazla çözüm için kanalımıza abone olun!"
-                )
-                
-                # Sahneleri birleştir ve renderla
-                combined_code = self.scene_manager.combine_all_scenes()
-                
-                video_path = await self._render_video_with_retry(
-                    request_id, combined_code, content, image_b64, "full"
+                # Sahneleri paralel renderla ve birleştir
+                video_path = await self._render_scenes_and_merge(
+                    request_id, scene_manager, scenes, content, image
                 )
                 
                 return video_path
@@ -219,27 +238,110 @@ class VideoCreator:
         
         raise Exception("Video oluşturulamadı: Beklenmeyen hata")
     
+    async def _render_scenes_and_merge(self,
+                                       request_id: str,
+                                       scene_manager: SceneManager,
+                                       scenes: List[Tuple[str, str]],
+                                       original_content: str,
+                                       image: Optional[Dict[str, Any]]) -> str:
+        """Her sahneyi ayrı render işi olarak paralel renderla, stream copy ile birleştir"""
+        output_ids = [f"{request_id}_{index}_{scene_type}" for index, (scene_type, _) in enumerate(scenes)]
+        
+        # Sahneler aynı render ayarlarıyla renderlanır; biri başarısız olursa diğerleri iptal edilir
+        graph = {
+            output_id: ([], lambda _, code=code, scene_type=scene_type, output_id=output_id:
+                        self._render_video_with_retry(
+                            request_id, code, original_content, image, scene_type,
+                            output_id=output_id
+                        ))
+            for output_id, (scene_type, code) in zip(output_ids, scenes)
+        }
+        rendered = await scene_manager.run_graph(graph)
+        scene_paths = [Path(rendered[output_id]) for output_id in output_ids]
+        
+        await self.aupdate_status(request_id, "rendering", f"{len(scene_paths)} sahne birleştiriliyor...")
+        output_path = self.final_video_dir / f"{request_id}.mp4"
+        
+        try:
+            await asyncio.to_thread(self.video_merger.merge_videos, scene_paths, output_path)
+        finally:
+            # Sahne parçalarını ve yan dosyalarını temizle
+            for scene_path in scene_paths:
+                self._remove_with_sidecars(scene_path)
+        
+        return str(output_path)
+    
     async def _render_video_with_retry(self, 
                                      request_id: str, 
                                      initial_code: str,
                                      original_content: str,
-                                     image_b64: Optional[str],
-                                     scene_type: str) -> str:
-        """Retry mekanizması ile video render et"""
+                                     image: Optional[Dict[str, Any]],
+                                     scene_type: str,
+                                     output_id: Optional[str] = None) -> str:
+        """
+        Retry mekanizması ile video render et
+        
+        Args:
+            output_id: Çıktı dosyasının adı (varsayılan request_id, sahne renderlarında farklı)
+        """
         current_code = initial_code
+        output_id = output_id or request_id
+        
+        # Aynı (veya sadece biçimi farklı) kod daha önce render edildiyse tekrar renderlama
+        cache_key = None
+        if self.render_cache:
+            cache_key = self.render_cache.make_key(initial_code)
+            # Önbellek indeksi SQLite işlemi, isabet ise dosya kopyası içerebilir; olay döngüsü bloklanmasın
+            cached_video = await asyncio.to_thread(
+                self.render_cache.lookup, cache_key, output_id, self.final_video_dir
+            )
+            if cached_video:
+                await self.aupdate_status(request_id, "processing", "Video önbellekten alındı")
+                return str(cached_video)
+        
+        # Tek başına videolarda ve ana içerik sahnesinde taslak önizleme olarak yayınlanır
+        publish_preview = output_id == request_id or scene_type in ("solution", "topic")
+        # Başarı/başarısızlık istatistiği için bu render'da uygulanan autofix kuralları
+        applied_rules: List[str] = []
         
         for fix_attempt in range(self.max_fix_attempts):
             try:
-                self.update_status(
+                # Statik ön kontrol: bilinen hatalar render beklemeden düzeltme döngüsüne girer
+                current_code = await self._preflight(output_id, current_code, applied_rules)
+                
+                if settings.enable_draft_render:
+                    # Hatalar düşük çözünürlükte, saniyeler içinde yakalanır
+                    await self.aupdate_status(
+                        request_id,
+                        "rendering",
+                        f"Taslak renderleniyor (Düzeltme denemesi {fix_attempt + 1}/{self.max_fix_attempts})"
+                    )
+                    draft_path = await self._render_video(
+                        request_id, current_code, f"{output_id}_draft", quality="draft"
+                    )
+                    if publish_preview:
+                        await self._publish_preview(request_id, Path(draft_path))
+                    else:
+                        self._remove_with_sidecars(Path(draft_path))
+                
+                await self.aupdate_status(
                     request_id, 
                     "rendering", 
                     f"Video renderleniyor (Düzeltme denemesi {fix_attempt + 1}/{self.max_fix_attempts})"
                 )
                 
-                video_path = await self._render_video(request_id, current_code)
+                video_path = await self._render_video(request_id, current_code, output_id)
                 
                 # Başarılı, video dosyasını döndür
                 self.logger.info(f"Video successfully rendered on attempt {fix_attempt + 1}")
+                self.autofixer.record_outcome(applied_rules, True)
+                if self.render_cache:
+                    await asyncio.to_thread(self.render_cache.store, cache_key, Path(video_path))
+                    # Düzeltilmiş kod da ileride aynı videoya ulaşsın
+                    if current_code != initial_code:
+                        await asyncio.to_thread(
+                            self.render_cache.store, self.render_cache.make_key(current_code), Path(video_path)
+                        )
                 return video_path
                 
             except Exception as e:
@@ -248,24 +350,62 @@ class VideoCreator:
                 
                 if fix_attempt < self.max_fix_attempts - 1:
                     # Kodu düzelt ve tekrar dene
-                    self.update_status(
+                    await self.aupdate_status(
                         request_id, 
                         "processing", 
                         f"Kod düzeltiliyor... (Hata: {error_message[:100]})"
                     )
                     
+                    # Önce yerel kurallar; preflight hatalarında kurallar zaten denendi
+                    fixed = None
+                    if not isinstance(e, PreflightError):
+                        fixed = await asyncio.to_thread(self.autofixer.fix, current_code, error_message)
+                    if fixed:
+                        current_code, rules = fixed
+                        applied_rules.extend(rules)
+                        self.logger.info(f"Code fixed locally for attempt {fix_attempt + 2}: {', '.join(rules)}")
+                        continue
+                    
                     try:
+                        self.autofixer.record_llm_fallback()
                         current_code = await self._fix_manim_code(current_code, error_message)
                         self.logger.info(f"Code fixed for attempt {fix_attempt + 2}")
                     except Exception as fix_error:
                         self.logger.error(f"Code fix failed: {str(fix_error)}")
+                        self.autofixer.record_outcome(applied_rules, False)
+                        self._cleanup_render_dir(output_id)
+                        self._cleanup_render_dir(f"{output_id}_draft")
                         raise e
                 else:
                     self.logger.error(f"All fix attempts failed. Final error: {error_message}")
+                    self.autofixer.record_outcome(applied_rules, False)
+                    # Denemeler arasında Manim önbelleği olarak kalan ara dosyaları temizle
+                    self._cleanup_render_dir(output_id)
+                    self._cleanup_render_dir(f"{output_id}_draft")
                     raise e
         
         raise Exception("Video oluşturulamadı: Tüm düzeltme denemeleri başarısız")
     
+    async def _preflight(self, output_id: str, code: str, applied_rules: List[str]) -> str:
+        """
+        Statik ön kontrol. Hata bulunursa LLM'e gitmeden önce autofix
+        kuralları denenir; düzeltilen kod döner, düzelmezse PreflightError.
+        """
+        try:
+            warnings = await asyncio.to_thread(ensure_renderable, code)
+        except PreflightError as e:
+            fixed = await asyncio.to_thread(self.autofixer.fix, code, str(e), e.issues)
+            if not fixed:
+                raise
+            code, rules = fixed
+            applied_rules.extend(rules)
+            self.logger.info(f"Preflight issues fixed locally for {output_id}: {', '.join(rules)}")
+            warnings = await asyncio.to_thread(ensure_renderable, code)
+        
+        if warnings:
+            self.logger.info(f"Preflight warnings for {output_id}:\n{format_issues(warnings)}")
+        return code
+    
     async def _fix_manim_code(self, broken_code: str, error_message: str) -> str:
         """Hatalı Manim kodunu düzelt"""
         self.logger.info("Attempting to fix Manim code...")
@@ -281,7 +421,7 @@ class VideoCreator:
         
         try:
             # AI'dan düzeltilmiş kod al
-            fixed_response = generate({"text": fix_prompt})
+            fixed_response = await agenerate({"text": fix_prompt})
             
             # Kod bloğunu çıkar
             fixed_code = self._extract_python_code(fixed_response)
@@ -297,60 +437,64 @@ class VideoCreator:
             self.logger.error(f"Error during code fix: {str(e)}")
             raise Exception(f"Kod düzeltme başarısız: {str(e)}")
     
-    async def _render_video(self, request_id: str, manim_code: str) -> str:
-        """Manim kodunu renderla - Ses düzeltmeleri ile"""
+    async def _publish_preview(self, request_id: str, draft_path: Path):
+        """Taslak videoyu önizleme olarak yayınla"""
+        preview_path = self.final_video_dir / f"{request_id}_preview.mp4"
+        os.replace(draft_path, preview_path)
+        self._remove_with_sidecars(draft_path)
+        await self.aupdate_status(
+            request_id, "rendering", "Önizleme hazır, final video renderleniyor...",
+            preview_path=str(preview_path)
+        )
+    
+    def _remove_with_sidecars(self, video_path: Path):
+        """Video dosyasını ve aynı isimli yan dosyalarını sil"""
+        for related_file in video_path.parent.glob(f"{video_path.stem}.*"):
+            related_file.unlink(missing_ok=True)
+    
+    async def _render_video(self,
+                            request_id: str,
+                            manim_code: str,
+                            output_id: Optional[str] = None,
+                            quality: str = "final") -> str:
+        """Manim kodunu render havuzunda renderla - Ses düzeltmeleri ile"""
+        output_id = output_id or request_id
+        
         # Geçici dosya oluştur
-        temp_file = Path(settings.temp_dir) / f"{request_id}_manim.py"
+        temp_file = Path(settings.temp_dir) / f"{output_id}_manim.py"
         temp_file.write_text(manim_code, encoding="utf-8")
         
-        # Manim config ayarla - Ses desteği ile
-        config.media_dir = str(settings.video_output_dir)
-        config.output_file = request_id
-        
-        # Ses ayarları - Önemli!
-        config.enable_gui = False
-        config.write_to_movie = True
-        config.save_last_frame = False
+        # İşin ses dosyaları ve manifesti yalnızca bu dizinde tutulur
+        audio_dir = self.tts_cache.job_dir(output_id)
+        shutil.rmtree(audio_dir, ignore_errors=True)
         
-        manim_config.setup_defaults()
+        job = {
+            "request_id": output_id,
+            "code_path": str(temp_file),
+            "media_dir": str(settings.video_output_dir),
+            "output_file": output_id,
+            "scene_class": "Solution",
+            "quality": quality,
+            "audio_dir": str(audio_dir),
+        }
         
-        # Modülü yükle ve çalıştır
         try:
-            # Mevcut modülü temizle
-            module_name = f"temp_manim_{request_id}"
-            if module_name in sys.modules:
-                del sys.modules[module_name]
-            
-            # Yeni modülü yükle
-            spec = importlib.util.spec_from_file_location(module_name, temp_file)
-            if spec is None or spec.loader is None:
-                raise ImportError("Module spec veya loader bulunamadı")
-            
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
-            
-            # Solution class'ını bul ve çalıştır
-            if hasattr(module, 'Solution'):
-                scene = module.Solution()
-                
-                # Render işlemi - Ses ile birlikte
-                self.update_status(request_id, "rendering", "Video ses ile birlikte render ediliyor...")
-                scene.render()
-                
-                # Video dosyasını bul ve taşı
-                video_path = await self._find_and_move_video(request_id)
-                
-                if video_path and video_path.exists():
-                    # Ses kontrolü ve düzeltmesi
-                    video_with_audio = await self._ensure_audio_in_video(video_path)
-                    
-                    self.logger.info(f"Video successfully created with audio: {video_with_audio}")
-                    return str(video_with_audio)
-                else:
-                    raise FileNotFoundError("Video dosyası bulunamadı veya taşınamadı")
-            else:
-                raise AttributeError("Solution class bulunamadı")
+            # Seslendirmeler render başlamadan paralel sentezlenir, işçi önbellekten alır
+            voice, narrations = extract_narrations(manim_code)
+            if narrations:
+                await self.aupdate_status(request_id, "rendering", f"Seslendirme hazırlanıyor ({len(narrations)} cümle)...")
+                await asyncio.to_thread(self.tts_cache.presynthesize, narrations, voice)
+            
+            # Render ayrı bir süreçte çalışır, olay döngüsü bloklanmaz
+            await self.aupdate_status(request_id, "rendering", "Video ses ile birlikte render ediliyor...")
+            result = await self.render_pool.render(job)
+            
+            # Render çıktısı tek adımda son konumuna yazılır
+            rendered_path = Path(result["video_path"]) if result.get("video_path") else None
+            video_path = await self._finalize_video(output_id, rendered_path, audio_dir)
+            
+            self.logger.info(f"Video successfully created: {video_path}")
+            return str(video_path)
                 
         except Exception as e:
             self.logger.error(f"Render error: {str(e)}")
@@ -359,166 +503,151 @@ class VideoCreator:
             # Geçici dosyayı temizle
             if temp_file.exists():
                 temp_file.unlink()
+            shutil.rmtree(audio_dir, ignore_errors=True)
     
-    async def _ensure_audio_in_video(self, video_path: Path) -> Path:
-        """Video'da ses olduğundan emin ol, yoksa ekle"""
+    async def _finalize_video(self,
+                              output_id: str,
+                              rendered_path: Optional[Path] = None,
+                              audio_dir: Optional[Path] = None) -> Path:
+        """
+        Render çıktısını tek adımda son konumuna yazar.
+        
+        Gerekirse ses ekleme ve faststart tek bir ffmpeg (stream copy)
+        geçişinde yapılır; sonuç geçici dosyadan os.replace ile yerine
+        konur. Render dizinindeki kopya, ara dosyalar ve yan dosyalar
+        taşınır/silinir, diskte videonun tek kopyası kalır.
+        """
+        source = self._find_rendered_video(output_id, rendered_path)
+        if source is None:
+            raise FileNotFoundError("Video dosyası bulunamadı")
+        
+        final_path = self.final_video_dir / f"{output_id}.mp4"
+        extra_audio = await asyncio.to_thread(self._select_audio, source, audio_dir)
+        
         try:
-            self.logger.info(f"Checking audio in video: {video_path}")
-            
-            # Video'da ses var mı kontrol et
-            check_cmd = [
-                'ffprobe', '-v', 'quiet', '-select_streams', 'a:0', 
-                '-show_entries', 'stream=codec_name', '-of', 'csv=p=0', 
-                str(video_path)
-            ]
-            
-            result = subprocess.run(check_cmd, capture_output=True, text=True)
-            has_audio = result.returncode == 0 and result.stdout.strip()
-            
-            if has_audio:
-                self.logger.info("Video already has audio")
-                return video_path
-            
-            self.logger.warning("Video has no audio, looking for separate audio files...")
-            
-            # Aynı isimli ses dosyalarını ara
-            video_base = video_path.with_suffix('')
-            audio_files = []
-            
-            # Muhtemel ses dosyası uzantıları
-            audio_extensions = ['.wav', '.mp3', '.aac', '.m4a']
-            
-            for ext in audio_extensions:
-                audio_file = video_base.with_suffix(ext)
-                if audio_file.exists():
-                    audio_files.append(audio_file)
-                    self.logger.info(f"Found audio file: {audio_file}")
-            
-            # Voiceover cache dizininde de ara
-            voiceover_dir = settings.static_dir / "videomedia" / "voiceovers"
-            if voiceover_dir.exists():
-                for audio_file in voiceover_dir.glob("*.mp3"):
-                    audio_files.append(audio_file)
-                    self.logger.info(f"Found voiceover audio: {audio_file}")
-            
-            if not audio_files:
-                self.logger.warning("No audio files found, returning video without audio")
-                return video_path
-            
-            # En uygun ses dosyasını seç (en büyük boyutlu genellikle ana ses)
-            main_audio = max(audio_files, key=lambda f: f.stat().st_size)
-            self.logger.info(f"Using main audio file: {main_audio}")
-            
-            # Ses ve video'yu birleştir
-            output_with_audio = video_path.with_name(f"{video_path.stem}_with_audio.mp4")
-            
-            merge_cmd = [
-                'ffmpeg', '-y',
-                '-i', str(video_path),
-                '-i', str(main_audio),
-                '-c:v', 'copy',
-                '-c:a', 'aac',
-                '-b:a', '128k',
-                '-shortest',
-                str(output_with_audio)
+            await asyncio.to_thread(self._mux_faststart, source, extra_audio, final_path)
+            source.unlink(missing_ok=True)
+        except (subprocess.CalledProcessError, OSError) as e:
+            # Mux başarısızsa render çıktısı olduğu gibi taşınır (aynı dosya sisteminde rename)
+            error = getattr(e, "stderr", None) or str(e)
+            self.logger.warning(f"Faststart mux failed, moving render output as is: {error[-500:]}")
+            shutil.move(str(source), str(final_path))
+        
+        self._move_sidecars(source, final_path, skip=extra_audio)
+        self._cleanup_render_dir(output_id)
+        
+        self.logger.info(f"Video finalized: {source} -> {final_path}")
+        return final_path
+    
+    def _mux_faststart(self, video_path: Path, audio_path: Optional[Path], output_path: Path):
+        """Tek geçiş: video kopyalanır, gerekirse ses eklenir, moov atomu başa alınır"""
+        temp_path = output_path.with_name(f".{output_path.stem}.tmp.mp4")
+        cmd = ['ffmpeg', '-y', '-i', str(video_path)]
+        if audio_path:
+            cmd += [
+                '-i', str(audio_path),
+                '-map', '0:v:0', '-map', '1:a:0',
+                '-c:v', 'copy', '-c:a', 'aac', '-b:a', '128k',
+                '-shortest'
             ]
-            
-            self.logger.info(f"Merging video with audio: {' '.join(merge_cmd)}")
-            
-            result = subprocess.run(merge_cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0 and output_with_audio.exists():
-                # Eski dosyayı sil ve yenisini ana isimle değiştir
-                video_path.unlink()
-                output_with_audio.rename(video_path)
-                self.logger.info("Successfully merged video with audio")
-                return video_path
-            else:
-                self.logger.error(f"Audio merge failed: {result.stderr}")
-                return video_path
-                
-        except Exception as e:
-            self.logger.warning(f"Audio processing failed: {str(e)}, returning original video")
-            return video_path
+        else:
+            cmd += ['-c', 'copy']
+        cmd += ['-movflags', '+faststart', str(temp_path)]
+        
+        try:
+            subprocess.run(cmd, check=True, capture_output=True, text=True)
+            os.replace(temp_path, output_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
     
-    async def _find_and_move_video(self, request_id: str) -> Optional[Path]:
-        """Oluşturulan video dosyasını bul ve güvenli yere taşı"""
+    def _select_audio(self, video_path: Path, audio_dir: Optional[Path] = None) -> Optional[Path]:
+        """Videoda ses yoksa eklenecek ses dosyası (aynı isimli yan dosya veya işin manifesti)"""
+        check_cmd = [
+            'ffprobe', '-v', 'quiet', '-select_streams', 'a:0',
+            '-show_entries', 'stream=codec_name', '-of', 'csv=p=0',
+            str(video_path)
+        ]
         try:
-            # Manim'in video çıktı dizininde ara
-            video_output_base = settings.video_output_dir / "videos"
-            
-            # Muhtemel video dosyası yolları
-            possible_paths = [
-                video_output_base / "1080p60" / f"{request_id}.mp4",
-                video_output_base / "720p30" / f"{request_id}.mp4",
-                video_output_base / "480p15" / f"{request_id}.mp4",
-                settings.video_output_dir / f"{request_id}.mp4",
-            ]
-            
-            # Glob ile de ara
-            glob_patterns = [
-                str(video_output_base / "*" / f"{request_id}.mp4"),
-                str(video_output_base / "*" / "*" / f"{request_id}.mp4"),
-                str(settings.video_output_dir / f"*{request_id}*.mp4"),
-            ]
-            
-            found_video = None
-            
-            # Önce doğrudan yollarda ara
-            for path in possible_paths:
-                if path.exists():
-                    found_video = path
-                    self.logger.info(f"Found video at: {path}")
-                    break
-            
-            # Bulamazsa glob ile ara
-            if not found_video:
-                for pattern in glob_patterns:
-                    matches = glob.glob(pattern)
-                    if matches:
-                        found_video = Path(matches[0])  # İlk eşleşeni al
-                        self.logger.info(f"Found video via glob: {found_video}")
-                        break
-            
-            if not found_video:
-                self.logger.error(f"Video file not found for request_id: {request_id}")
-                # Debug için tüm video dosyalarını listele
-                all_videos = list(video_output_base.rglob("*.mp4"))
-                self.logger.info(f"Available video files: {[str(v) for v in all_videos[-10:]]}")
-                return None
-            
-            # Güvenli yere taşı
-            final_path = self.final_video_dir / f"{request_id}.mp4"
-            shutil.copy2(found_video, final_path)
-            
-            # İlgili dosyaları da taşı (srt, wav vs.)
-            self._move_related_files(found_video, final_path)
-            
-            self.logger.info(f"Video moved from {found_video} to {final_path}")
-            return final_path
-            
-        except Exception as e:
-            self.logger.error(f"Error finding/moving video: {str(e)}")
+            result = subprocess.run(check_cmd, capture_output=True, text=True)
+        except OSError as e:
+            self.logger.warning(f"Audio check skipped: {str(e)}")
+            return None
+        if result.returncode == 0 and result.stdout.strip():
+            return None
+        
+        self.logger.warning("Video has no audio, looking for separate audio files...")
+        
+        # Aynı isimli ses dosyaları
+        for ext in AUDIO_EXTENSIONS:
+            audio_file = video_path.with_suffix(ext)
+            if audio_file.exists():
+                self.logger.info(f"Using audio file: {audio_file}")
+                return audio_file
+        
+        # Yoksa işin manifestindeki seslendirmeler (başka işlerin sesleri karışmaz)
+        voiceovers = read_manifest(audio_dir) if audio_dir else []
+        if not voiceovers:
+            self.logger.warning("No audio files found, finalizing video without audio")
             return None
+        if len(voiceovers) == 1:
+            return voiceovers[0]
+        return self._concat_voiceovers(voiceovers, audio_dir)
     
-    def _move_related_files(self, source_video: Path, target_video: Path):
-        """Video ile ilgili diğer dosyaları da taşı (srt, wav vb.)"""
-        try:
-            source_base = source_video.with_suffix("")
-            target_base = target_video.with_suffix("")
-            
-            # İlgili dosya uzantıları
-            related_extensions = [".srt", ".wav", ".txt", ".json", ".mp3", ".aac"]
-            
-            for ext in related_extensions:
-                source_file = source_base.with_suffix(ext)
-                if source_file.exists():
-                    target_file = target_base.with_suffix(ext)
-                    shutil.copy2(source_file, target_file)
-                    self.logger.info(f"Related file moved: {source_file} -> {target_file}")
-                    
-        except Exception as e:
-            self.logger.warning(f"Error moving related files: {str(e)}")
+    def _concat_voiceovers(self, voiceovers: List[Path], audio_dir: Path) -> Optional[Path]:
+        """Manifestteki seslendirmeleri sırasıyla tek ses dosyasında birleştir"""
+        list_file = audio_dir / "concat.txt"
+        list_file.write_text("".join(f"file '{path.resolve()}'\n" for path in voiceovers), encoding="utf-8")
+        output = audio_dir / f"narration{voiceovers[0].suffix}"
+        
+        result = subprocess.run(
+            ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', str(list_file), '-c', 'copy', str(output)],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0 or not output.exists():
+            self.logger.error(f"Voiceover concat failed: {result.stderr[-500:]}")
+            return None
+        return output
+    
+    def _find_rendered_video(self, output_id: str, rendered_path: Optional[Path] = None) -> Optional[Path]:
+        """Manim'in oluşturduğu video dosyasını bul"""
+        # Render işçisinin bildirdiği yol en güvenilir kaynak
+        if rendered_path and rendered_path.exists():
+            return rendered_path
+        
+        video_output_base = settings.video_output_dir / "videos"
+        glob_patterns = [
+            str(video_output_base / "*" / "*" / f"{output_id}.mp4"),
+            str(video_output_base / "*" / f"{output_id}.mp4"),
+            str(settings.video_output_dir / f"{output_id}.mp4"),
+        ]
+        for pattern in glob_patterns:
+            matches = glob.glob(pattern)
+            if matches:
+                self.logger.info(f"Found video via glob: {matches[0]}")
+                return Path(matches[0])
+        
+        self.logger.error(f"Video file not found for request_id: {output_id}")
+        return None
+    
+    def _move_sidecars(self, source_video: Path, target_video: Path, skip: Optional[Path] = None):
+        """Yan dosyaları (srt vb.) kopyalamadan taşı; videoya eklenen ses dosyası silinir"""
+        for ext in SIDECAR_EXTENSIONS:
+            source_file = source_video.with_suffix(ext)
+            if not source_file.exists():
+                continue
+            if skip and source_file == skip:
+                source_file.unlink()
+                continue
+            try:
+                shutil.move(str(source_file), str(target_video.with_suffix(ext)))
+            except OSError as e:
+                self.logger.warning(f"Error moving related file {source_file}: {str(e)}")
+    
+    def _cleanup_render_dir(self, output_id: str):
+        """Manim'in iş başına render dizinini (partial_movie_files dahil) sil"""
+        # input_file olarak {output_id}_manim.py verildiği için Manim bu dizini kullanır
+        render_dir = settings.video_output_dir / "videos" / f"{output_id}_manim"
+        shutil.rmtree(render_dir, ignore_errors=True)
     
     def _extract_python_code(self, response: str) -> str:
         """Yanıttan Python kodunu çıkarır"""
@@ -534,28 +663,55 @@ class VideoCreator:
         
         return response.strip()
     
+    def _transition(self,
+                    request_id: str,
+                    status: str,
+                    message: str,
+                    video_path: Optional[str] = None,
+                    **meta) -> Optional[Dict[str, Any]]:
+        """Durumu depoda güncelle; geçiş uygulandıysa güncel kaydı döndür (bloklayan çağrı)"""
+        if not self.job_store.transition(request_id, status, message, video_path, **meta):
+            return None
+        self.logger.info(f"Status updated for {request_id}: {status} - {message}")
+        return self.job_store.get(request_id)
+    
+    def _publish_record(self, record: Optional[Dict[str, Any]]):
+        if record:
+            self.status_broker.publish(
+                self.status_event(record), record["meta"].get("callback_url")
+            )
+    
     def update_status(self, 
                      request_id: str, 
                      status: str, 
                      message: str,
-                     video_path: Optional[str] = None):
-        """İstek durumunu güncelle"""
-        self.status_db[request_id] = {
-            "status": status,
-            "message": message,
-            "video_path": video_path,
-            "updated_at": datetime.now().isoformat()
-        }
-        self.logger.info(f"Status updated for {request_id}: {status} - {message}")
+                     video_path: Optional[str] = None,
+                     **meta):
+        """İstek durumunu güncelle (olay döngüsü dışından çağrılar için)"""
+        self._publish_record(self._transition(request_id, status, message, video_path, **meta))
+    
+    async def aupdate_status(self,
+                             request_id: str,
+                             status: str,
+                             message: str,
+                             video_path: Optional[str] = None,
+                             **meta):
+        """İstek durumunu güncelle; depo yazması olay döngüsünü bloklamasın diye thread'de yapılır"""
+        record = await asyncio.to_thread(self._transition, request_id, status, message, video_path, **meta)
+        self._publish_record(record)
+    
+    @staticmethod
+    def status_event(record: Dict[str, Any]) -> Dict[str, Any]:
+        """İş kaydını /api/status yanıtıyla aynı biçimde olaya çevir"""
+        return status_event(record)
     
     def get_status(self, request_id: str) -> Optional[Dict[str, Any]]:
         """İstek durumunu getir"""
-        return self.status_db.get(request_id)
+        return self.job_store.get(request_id)
     
     def clear_status(self, request_id: str):
         """İstek durumunu temizle"""
-        if request_id in self.status_db:
-            del self.status_db[request_id]
+        self.job_store.delete(request_id)
     
     def cleanup_old_videos(self, days: int = 7):
         """Eski video dosyalarını temizle"""
@@ -569,4 +725,10 @@ class VideoCreator:
                 base_name = video_file.stem
                 for related_file in self.final_video_dir.glob(f"{base_name}.*"):
                     related_file.unlink()
-                    self.logger.info(f"Deleted old file: {related_file}")
\ No newline at end of file
+                    self.logger.info(f"Deleted old file: {related_file}")
+                self.video_catalog.remove(base_name)
+        
+        # Süresi dolmuş iş kayıtlarını da temizle
+        purged = self.job_store.purge_expired()
+        if purged:
+            self.logger.info(f"Purged {purged} expired job records")
\ No newline at end of file
@@ -1,15 +1,15 @@
 import base64
 import os
-from typing import Dict, Any, Optional, List
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 import asyncio
 from google import genai
 from google.genai import types
-import backoff
 
 from config import settings
 from services.logger import get_logger
-from services.openai import get_openai_service 
-from services.openai import OpenAIService
+from services.llm_cache import get_llm_cache
+from services.llm_router import get_llm_router
 
 class GeminiService:
     """Gemini API servis sınıfı"""
@@ -19,50 +19,49 @@ class GeminiService:
         self.client = genai.Client(api_key=settings.gemini_api_key)
         self.model = settings.gemini_model
         
-    @backoff.on_exception(
-        backoff.expo,
-        Exception,
-        max_tries=settings.max_retries
-    )
+    async def astream(self, message: Dict[str, Any]) -> AsyncIterator[str]:
+        """Asenkron istemci ile metin parçalarını geldikçe üretir"""
+        # Ek dosyalar diskten okunur/yüklenir, olay döngüsünü bloklamasın
+        contents = await asyncio.to_thread(self._build_contents, message)
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=contents,
+            config=self._build_config(),
+        )
+        
+        try:
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            self.logger.error(f"Generation error: {str(e)}")
+            raise
+        finally:
+            # İptal edildiğinde de akışı kapat ve bağlantıyı serbest bırak
+            aclose = getattr(stream, "aclose", None)
+            if aclose:
+                await aclose()
+    
     async def generate_async(self, message: Dict[str, Any]) -> str:
-        """Asenkron içerik üretimi"""
-        return await asyncio.to_thread(self.generate, message)
+        """Asenkron istemci ile akışlı içerik üretimi"""
+        chunks = [chunk async for chunk in self.astream(message)]
+        result = "".join(chunks)
+        self.logger.info(f"Generated content length: {len(result)}")
+        return result
     
     def generate(self, message: Dict[str, Any]) -> str:
         """İçerik üretimi"""
         try:
-            parts = self._build_parts(message)
-            contents = [
-                types.Content(
-                    role="user",
-                    parts=parts,
-                ),
-            ]
-            
-            tools = [
-                types.Tool(googleSearch=types.GoogleSearch()),
-            ]
-            
-            generate_content_config = types.GenerateContentConfig(
-                thinking_config=types.ThinkingConfig(
-                    thinking_budget=-1,
-                ),
-                tools=tools,
-                temperature=0.3,
-                top_p=0.95,
-                top_k=40,
-                max_output_tokens=63000,
-            )
-            
-            result = ""
+            chunks = []
             for chunk in self.client.models.generate_content_stream(
                 model=self.model,
-                contents=contents,
-                config=generate_content_config,
+                contents=self._build_contents(message),
+                config=self._build_config(),
             ):
                 if chunk.text:
-                    result += chunk.text
+                    chunks.append(chunk.text)
             
+            result = "".join(chunks)
             self.logger.info(f"Generated content length: {len(result)}")
             return result
             
@@ -70,6 +69,32 @@ class GeminiService:
             self.logger.error(f"Generation error: {str(e)}")
             raise
     
+    def _build_contents(self, message: Dict[str, Any]) -> List[types.Content]:
+        """İstek içeriğini oluştur"""
+        return [
+            types.Content(
+                role="user",
+                parts=self._build_parts(message),
+            ),
+        ]
+    
+    def _build_config(self) -> types.GenerateContentConfig:
+        """Üretim ayarlarını oluştur"""
+        tools = [
+            types.Tool(googleSearch=types.GoogleSearch()),
+        ]
+        
+        return types.GenerateContentConfig(
+            thinking_config=types.ThinkingConfig(
+                thinking_budget=-1,
+            ),
+            tools=tools,
+            temperature=0.3,
+            top_p=0.95,
+            top_k=40,
+            max_output_tokens=63000,
+        )
+    
     def _build_parts(self, message: Dict[str, Any]) -> List[types.Part]:
         """Mesaj parçalarını oluştur"""
         parts = []
@@ -81,23 +106,41 @@ class GeminiService:
             
             # Görsel varsa ekle
             if 'image' in message and message['image']:
-                parts.append(types.Part.from_bytes(
-                    mime_type="image/jpeg",
-                    data=base64.b64decode(message['image'])
-                ))
+                parts.append(self._attachment_part(message['image'], "image/jpeg"))
             
             # PDF varsa ekle
             if 'pdf' in message and message['pdf']:
-                parts.append(types.Part.from_bytes(
-                    mime_type="application/pdf",
-                    data=base64.b64decode(message['pdf'])
-                ))
+                parts.append(self._attachment_part(message['pdf'], "application/pdf"))
         else:
             # String ise doğrudan text olarak ekle
             parts.append(types.Part.from_text(text=str(message)))
         
         return parts
 
+    def _attachment_part(self, attachment: Any, default_mime: str) -> types.Part:
+        """
+        Ek dosyayı Part'a dönüştürür.
+        
+        Ekler dosya yolu olarak gelir; küçük dosyalar istek içinde, büyük
+        dosyalar Files API ile yüklenip URI olarak gönderilir.
+        """
+        if not isinstance(attachment, dict):
+            # Base64 string (eski çağıranlar)
+            return types.Part.from_bytes(mime_type=default_mime, data=base64.b64decode(attachment))
+        
+        path = Path(attachment["path"])
+        mime_type = attachment.get("mime", default_mime)
+        
+        if path.stat().st_size > settings.llm_inline_attachment_max_bytes:
+            uploaded = self.client.files.upload(
+                file=str(path),
+                config=types.UploadFileConfig(mime_type=mime_type)
+            )
+            self.logger.info(f"Attachment uploaded via Files API: {path.name}")
+            return types.Part.from_uri(file_uri=uploaded.uri, mime_type=mime_type)
+        
+        return types.Part.from_bytes(mime_type=mime_type, data=path.read_bytes())
+
 # Global instance
 _gemini_service = None
 
@@ -108,24 +151,85 @@ def get_gemini_service() -> GeminiService:
         _gemini_service = GeminiService()
     return _gemini_service
 
-def generate(message: Dict[str, Any]) -> str:
+def generate(message: Dict[str, Any], use_cache: bool = True) -> str:
     """
-    Yapılandırmaya göre uygun LLM servisini seçer ve içerik üretir.
+    LLM yönlendiricisi üzerinden içerik üretir; birincil sağlayıcı hata
+    verirse veya devresi açıksa ikincil sağlayıcıya geçilir.
     Bu fonksiyon projenin geri kalanı için tek giriş noktasıdır.
+    
+    Args:
+        message: Prompt ve ek dosyaları içeren mesaj
+        use_cache: False ise önbellek okunmaz, yeni yanıt önbelleğe yazılır
     """
-    print(message)
-    provider = settings.llm_provider.lower()
     logger = get_logger("LLM_Dispatcher")
+    router = get_llm_router()
+    
+    # Anahtar birincil sağlayıcıya göre üretilir; yedekten gelen yanıt da aynı anahtara yazılır
+    cache = get_llm_cache()
+    cache_key = cache.make_key(router.primary, router.model(router.primary), message) if cache else None
+    
+    if cache and use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"LLM cache hit for provider: {router.primary}")
+            return cached
+    
+    result, provider = router.generate(message)
+    
+    if cache and result:
+        cache.set(cache_key, provider, router.model(provider), result)
     
-    logger.info(f"Routing request to LLM provider: {provider}")
-    
-    if provider == "openai":
-        service = get_openai_service()
-        return service.generate(message)
-    elif provider == "gemini":
-        service = get_gemini_service()
-        return service.generate(message)
-    else:
-        error_msg = f"Unsupported LLM provider: '{settings.llm_provider}'. Supported providers are 'gemini' and 'openai'."
-        logger.error(error_msg)
-        raise ValueError(error_msg)
\ No newline at end of file
+    return result
+
+async def astream(message: Dict[str, Any], use_cache: bool = True) -> AsyncIterator[str]:
+    """
+    Yanıtı geldikçe parça parça üretir.
+    
+    SDK'ların asenkron istemcilerini kullanır; sağlayıcı başına eşzamanlı
+    istek sayısı ``llm_max_concurrency`` ile sınırlanır. Birincil sağlayıcı
+    ilk parçayı p95 gecikmesi içinde göndermezse istek ikincile de gönderilir
+    (bkz. ``LLMRouter``). Tüketici akışı erken bırakırsa (``aclose``) veya
+    görev iptal edilirse sağlayıcı akışı kapatılır ve semafor serbest bırakılır;
+    yalnızca sonuna kadar okunan yanıtlar önbelleğe yazılır.
+    
+    Args:
+        message: Prompt ve ek dosyaları içeren mesaj
+        use_cache: False ise önbellek okunmaz, yeni yanıt önbelleğe yazılır
+    """
+    logger = get_logger("LLM_Dispatcher")
+    router = get_llm_router()
+    
+    cache = get_llm_cache()
+    cache_key = cache.make_key(router.primary, router.model(router.primary), message) if cache else None
+    
+    if cache and use_cache:
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            logger.info(f"LLM cache hit for provider: {router.primary}")
+            yield cached
+            return
+    
+    parts = []
+    provider = router.primary
+    stream = router.astream(message)
+    try:
+        async for provider, chunk in stream:
+            parts.append(chunk)
+            yield chunk
+    finally:
+        await stream.aclose()
+    
+    result = "".join(parts)
+    logger.info(f"Generated content length: {len(result)} ({provider})")
+    if cache and result:
+        await asyncio.to_thread(cache.set, cache_key, provider, router.model(provider), result)
+
+async def agenerate(message: Dict[str, Any], use_cache: bool = True) -> str:
+    """
+    ``generate`` fonksiyonunun event loop'u bloklamayan karşılığı.
+    
+    Args:
+        message: Prompt ve ek dosyaları içeren mesaj
+        use_cache: False ise önbellek okunmaz, yeni yanıt önbelleğe yazılır
+    """
+    return "".join([chunk async for chunk in astream(message, use_cache=use_cache)])
@@ -0,0 +1,325 @@
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+
+from config import settings
+from services.logger import get_logger
+from utils.db import connect_sqlite, transaction
+
+# İzin verilen durum geçişleri (None = henüz kayıt yok)
+ALLOWED_TRANSITIONS = {
+    None: {"processing"},
+    "processing": {"processing", "rendering", "completed", "failed"},
+    "rendering": {"rendering", "processing", "completed", "failed"},
+    "completed": set(),
+    "failed": set(),
+}
+
+
+class JobStore(ABC):
+    """İş durumu deposu için temel sınıf"""
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = ttl or settings.job_ttl
+        self.logger = get_logger(self.__class__.__name__)
+
+    @staticmethod
+    def can_transition(current: Optional[str], new: str) -> bool:
+        """Durum geçişinin geçerli olup olmadığını kontrol eder"""
+        return new in ALLOWED_TRANSITIONS.get(current, set())
+
+    @abstractmethod
+    def transition(self,
+                   request_id: str,
+                   status: str,
+                   message: str,
+                   video_path: Optional[str] = None,
+                   **meta) -> bool:
+        """
+        Durumu atomik olarak günceller.
+
+        Returns:
+            Geçiş uygulandıysa True, geçersiz geçişte False
+        """
+        pass
+
+    @abstractmethod
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """İş kaydını getirir (süresi dolmuşsa None)"""
+        pass
+
+    @abstractmethod
+    def delete(self, request_id: str):
+        """İş kaydını siler"""
+        pass
+
+    @abstractmethod
+    def list_by_status(self, status: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Belirli durumdaki işleri en yeni önce listeler"""
+        pass
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        """Süresi dolmuş kayıtları temizler, silinen kayıt sayısını döndürür"""
+        pass
+
+
+class SQLiteJobStore(JobStore):
+    """WAL modunda SQLite üzerinde çalışan iş deposu"""
+
+    def __init__(self, path=None, ttl: Optional[int] = None):
+        super().__init__(ttl)
+        self.path = path or settings.job_store_path
+        self._lock = threading.Lock()
+        self.conn = connect_sqlite(self.path)
+        self._create_schema()
+
+    def _create_schema(self):
+        with transaction(self.conn, self._lock):
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    request_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    message TEXT,
+                    video_path TEXT,
+                    meta TEXT NOT NULL DEFAULT '{}',
+                    stages TEXT NOT NULL DEFAULT '{}',
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, updated_at)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_expires ON jobs(expires_at)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs(updated_at)"
+            )
+
+    def transition(self, request_id, status, message, video_path=None, **meta) -> bool:
+        now = datetime.now().isoformat()
+
+        with transaction(self.conn, self._lock):
+            row = self.conn.execute(
+                "SELECT status, video_path, meta, stages, created_at, expires_at "
+                "FROM jobs WHERE request_id = ?",
+                (request_id,)
+            ).fetchone()
+
+            # Süresi dolmuş kayıt yok sayılır
+            if row and row["expires_at"] < time.time():
+                row = None
+
+            current = row["status"] if row else None
+            if not self.can_transition(current, status):
+                self.logger.warning(
+                    f"Rejected status transition for {request_id}: {current} -> {status}"
+                )
+                return False
+
+            stages = json.loads(row["stages"]) if row else {}
+            stages.setdefault(status, now)
+            merged_meta = json.loads(row["meta"]) if row else {}
+            merged_meta.update(meta)
+
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO jobs
+                    (request_id, status, message, video_path, meta, stages,
+                     created_at, updated_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    request_id,
+                    status,
+                    message,
+                    video_path or (row["video_path"] if row else None),
+                    json.dumps(merged_meta),
+                    json.dumps(stages),
+                    row["created_at"] if row else now,
+                    now,
+                    time.time() + self.ttl,
+                )
+            )
+        return True
+
+    def get(self, request_id):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE request_id = ? AND expires_at >= ?",
+                (request_id, time.time())
+            ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def delete(self, request_id):
+        with transaction(self.conn, self._lock):
+            self.conn.execute("DELETE FROM jobs WHERE request_id = ?", (request_id,))
+
+    def list_by_status(self, status, limit=100):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND expires_at >= ? "
+                "ORDER BY updated_at DESC LIMIT ?",
+                (status, time.time(), limit)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def list_updated_since(self, since: str, limit: int = 500) -> List[Dict[str, Any]]:
+        """``since`` (ISO zaman) sonrasında güncellenen kayıtlar, eskiden yeniye"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM jobs WHERE updated_at > ? AND expires_at >= ? "
+                "ORDER BY updated_at LIMIT ?",
+                (since, time.time(), limit)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def purge_expired(self):
+        with transaction(self.conn, self._lock):
+            cursor = self.conn.execute(
+                "DELETE FROM jobs WHERE expires_at < ?", (time.time(),)
+            )
+        return cursor.rowcount
+
+    def _row_to_dict(self, row) -> Dict[str, Any]:
+        return {
+            "request_id": row["request_id"],
+            "status": row["status"],
+            "message": row["message"],
+            "video_path": row["video_path"],
+            "meta": json.loads(row["meta"]),
+            "stages": json.loads(row["stages"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+
+class RedisJobStore(JobStore):
+    """Redis protokolünü konuşan herhangi bir sunucu üzerinde iş deposu"""
+
+    def __init__(self, url: Optional[str] = None, ttl: Optional[int] = None, prefix: str = "job:"):
+        super().__init__(ttl)
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("Redis job store için 'redis' paketi gerekli: pip install redis")
+
+        self._watch_error = redis.WatchError
+        self.client = redis.Redis.from_url(url or settings.job_store_url, decode_responses=True)
+        self.prefix = prefix
+
+    def _key(self, request_id: str) -> str:
+        return f"{self.prefix}{request_id}"
+
+    def _index_key(self, status: str) -> str:
+        return f"{self.prefix}status:{status}"
+
+    def transition(self, request_id, status, message, video_path=None, **meta) -> bool:
+        key = self._key(request_id)
+        now = datetime.now().isoformat()
+
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    # Optimistik kilit: kayıt araya giren bir yazmayla değişirse tekrar dene
+                    pipe.watch(key)
+                    current = pipe.hgetall(key)
+                    current_status = current.get("status")
+
+                    if not self.can_transition(current_status, status):
+                        pipe.unwatch()
+                        self.logger.warning(
+                            f"Rejected status transition for {request_id}: {current_status} -> {status}"
+                        )
+                        return False
+
+                    stages = json.loads(current.get("stages", "{}"))
+                    stages.setdefault(status, now)
+                    merged_meta = json.loads(current.get("meta", "{}"))
+                    merged_meta.update(meta)
+
+                    pipe.multi()
+                    pipe.hset(key, mapping={
+                        "request_id": request_id,
+                        "status": status,
+                        "message": message,
+                        "video_path": video_path or current.get("video_path", ""),
+                        "meta": json.dumps(merged_meta),
+                        "stages": json.dumps(stages),
+                        "created_at": current.get("created_at", now),
+                        "updated_at": now,
+                    })
+                    pipe.expire(key, self.ttl)
+                    if current_status and current_status != status:
+                        pipe.zrem(self._index_key(current_status), request_id)
+                    pipe.zadd(self._index_key(status), {request_id: time.time()})
+                    pipe.execute()
+                    return True
+                except self._watch_error:
+                    continue
+
+    def get(self, request_id):
+        data = self.client.hgetall(self._key(request_id))
+        return self._hash_to_dict(data) if data else None
+
+    def delete(self, request_id):
+        data = self.client.hgetall(self._key(request_id))
+        with self.client.pipeline() as pipe:
+            pipe.delete(self._key(request_id))
+            if data.get("status"):
+                pipe.zrem(self._index_key(data["status"]), request_id)
+            pipe.execute()
+
+    def list_by_status(self, status, limit=100):
+        request_ids = self.client.zrevrange(self._index_key(status), 0, limit - 1)
+        with self.client.pipeline() as pipe:
+            for request_id in request_ids:
+                pipe.hgetall(self._key(request_id))
+            results = pipe.execute()
+        return [self._hash_to_dict(data) for data in results if data]
+
+    def purge_expired(self):
+        # Hash kayıtları EXPIRE ile kendiliğinden silinir, sadece indeksleri temizle
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for status in ALLOWED_TRANSITIONS:
+            if status:
+                removed += self.client.zremrangebyscore(self._index_key(status), 0, cutoff)
+        return removed
+
+    def _hash_to_dict(self, data: Dict[str, str]) -> Dict[str, Any]:
+        return {
+            "request_id": data.get("request_id"),
+            "status": data.get("status"),
+            "message": data.get("message"),
+            "video_path": data.get("video_path") or None,
+            "meta": json.loads(data.get("meta", "{}")),
+            "stages": json.loads(data.get("stages", "{}")),
+            "created_at": data.get("created_at"),
+            "updated_at": data.get("updated_at"),
+        }
+
+# Global instance
+_job_store = None
+
+def get_job_store() -> JobStore:
+    """Yapılandırmaya göre singleton iş deposu döndürür"""
+    global _job_store
+    if _job_store is None:
+        backend = settings.job_store_backend.lower()
+        if backend == "redis":
+            _job_store = RedisJobStore()
+        elif backend == "sqlite":
+            _job_store = SQLiteJobStore()
+        else:
+            raise ValueError(
+                f"Unsupported job store backend: '{settings.job_store_backend}'. "
+                f"Supported backends are 'sqlite' and 'redis'."
+            )
+    return _job_store
@@ -0,0 +1,146 @@
+import json
+import time
+import base64
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from config import settings
+from services.logger import get_logger
+from utils.db import connect_sqlite, transaction
+
+
+def attachment_digest(data: Any) -> Optional[str]:
+    """Ek dosyanın ham baytlarının SHA-256 özetini döndürür"""
+    if not data:
+        return None
+    # Yükleme sırasında hesaplanmış özet varsa dosyayı tekrar okuma
+    if isinstance(data, dict):
+        return data.get("sha256") or data.get("path")
+    try:
+        raw = base64.b64decode(data)
+    except (ValueError, TypeError):
+        raw = str(data).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+class LLMCache:
+    """Tüm agentlerin paylaştığı, disk tabanlı ve boyut sınırlı LLM yanıt önbelleği"""
+
+    def __init__(self,
+                 path: Optional[Path] = None,
+                 ttl: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        self.logger = get_logger("LLMCache")
+        self.ttl = ttl or settings.cache_ttl
+        self.max_entries = max_entries or settings.llm_cache_max_entries
+        self._lock = threading.Lock()
+        self.conn = connect_sqlite(path or settings.llm_cache_path)
+        self._create_schema()
+        self.hits = 0
+        self.misses = 0
+
+    def _create_schema(self):
+        with transaction(self.conn, self._lock):
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses(expires_at)"
+            )
+
+    def make_key(self, provider: str, model: str, message: Dict[str, Any]) -> str:
+        """Sağlayıcı, model, tam prompt ve ek dosya özetlerinden anahtar üretir"""
+        if isinstance(message, dict):
+            text = message.get("text", "")
+            image = attachment_digest(message.get("image"))
+            pdf = attachment_digest(message.get("pdf"))
+        else:
+            text, image, pdf = str(message), None, None
+
+        payload = json.dumps({
+            "provider": provider,
+            "model": model,
+            "text": text,
+            "image": image,
+            "pdf": pdf
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Geçerli bir yanıt varsa döndürür ve son erişim zamanını günceller"""
+        now = time.time()
+        with transaction(self.conn, self._lock):
+            row = self.conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND expires_at >= ?",
+                (key, now)
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+                )
+
+        if row:
+            self.hits += 1
+            return row["response"]
+        self.misses += 1
+        return None
+
+    def set(self, key: str, provider: str, model: str, response: str):
+        """Yanıtı kaydeder ve gerekirse en eski kayıtları siler"""
+        now = time.time()
+        with transaction(self.conn, self._lock):
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, provider, model, response, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, response, now, now + self.ttl, now)
+            )
+            self.conn.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+
+            count = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self.conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """Önbellek istatistiklerini döndürür"""
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+# Global instance
+_llm_cache = None
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Önbellek açıksa singleton LLM cache instance döndürür"""
+    global _llm_cache
+    if not settings.enable_cache:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMCache()
+    return _llm_cache
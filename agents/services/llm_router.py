@@ -0,0 +1,349 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
+
+from config import settings
+from services.logger import get_logger
+
+# Desteklenen sağlayıcılar ve model ayarı
+PROVIDER_MODELS = {
+    "gemini": lambda: settings.gemini_model,
+    "openai": lambda: settings.openai_model,
+}
+
+
+def _load_service(provider: str):
+    """Sağlayıcı servisini tembel yükler (gemini modülüyle döngüsel import olmasın)"""
+    if provider == "gemini":
+        from services.gemini import get_gemini_service
+        return get_gemini_service()
+    from services.openai import get_openai_service
+    return get_openai_service()
+
+
+class ProviderStats:
+    """
+    Sağlayıcı başına gecikme/hata penceresi ve devre kesici.
+
+    Art arda ``failure_threshold`` hatada devre açılır, ``reset_timeout``
+    sonra tek bir deneme isteğine izin verilir.
+    """
+
+    def __init__(self, name: str, window: int, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latencies = deque(maxlen=window)
+        self.first_chunk_latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # True: hata
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_first_chunk(self, latency: float):
+        with self._lock:
+            self.first_chunk_latencies.append(latency)
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.latencies.append(latency)
+            self.outcomes.append(False)
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.outcomes.append(True)
+            self.last_error = str(error)
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            if self._state() == "half_open" or self._consecutive_failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def record_cancelled(self, elapsed: float, received: bool):
+        """
+        İptal edilen istek (yarışı kaybeden veya tüketicinin bıraktığı akış).
+
+        İlk parça gelmeden iptal edildiyse süre, ilk parça gecikmesinin alt
+        sınırı olarak sayılır; böylece sürekli kaybeden yavaş sağlayıcının
+        p95 değeri güncel kalır.
+        """
+        with self._lock:
+            if not received:
+                self.first_chunk_latencies.append(elapsed)
+            self._trial_in_flight = False
+
+    def percentile(self, p: float, first_chunk: bool = False) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(self.first_chunk_latencies if first_chunk else self.latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.50), self.percentile(0.95)
+        first_chunk_p95 = self.percentile(0.95, first_chunk=True)
+        with self._lock:
+            outcomes = list(self.outcomes)
+            state = self._state()
+        return {
+            "state": state,
+            "samples": len(self.latencies),
+            "error_rate": round(sum(outcomes) / len(outcomes), 3) if outcomes else 0.0,
+            "p50_seconds": round(p50, 2) if p50 is not None else None,
+            "p95_seconds": round(p95, 2) if p95 is not None else None,
+            "first_chunk_p95_seconds": round(first_chunk_p95, 2) if first_chunk_p95 is not None else None,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "last_error": self.last_error,
+        }
+
+
+class LLMRouter:
+    """
+    Birincil ve ikincil LLM sağlayıcısı arasında yönlendirme.
+
+    Birincil sağlayıcı ilk parçayı kendi p95 gecikmesi içinde göndermezse
+    aynı istek ikincil sağlayıcıya da gönderilir (hedging); ilk parçayı
+    önce gönderen akış kazanır, diğeri iptal edilir. Birincil ilk parçadan
+    önce hata verirse veya devresi açıksa istek ikincile devredilir.
+    """
+
+    def __init__(self):
+        self.logger = get_logger("LLM_Router")
+        self.primary = settings.llm_provider.lower()
+        if self.primary not in PROVIDER_MODELS:
+            error_msg = f"Unsupported LLM provider: '{settings.llm_provider}'. Supported providers are 'gemini' and 'openai'."
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        secondary = (settings.llm_secondary_provider or "").lower() or None
+        self.secondary = secondary if secondary in PROVIDER_MODELS and secondary != self.primary else None
+
+        self.stats = {
+            name: ProviderStats(
+                name,
+                settings.llm_stats_window,
+                settings.llm_breaker_threshold,
+                settings.llm_breaker_reset_timeout,
+            )
+            for name in PROVIDER_MODELS
+        }
+        self._services: Dict[str, Any] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def model(self, provider: str) -> str:
+        return PROVIDER_MODELS[provider]()
+
+    def _service(self, provider: str):
+        if provider not in self._services:
+            self._services[provider] = _load_service(provider)
+        return self._services[provider]
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        """Sağlayıcıya ait eşzamanlılık semaforu (event loop içinde tembel oluşturulur)"""
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+            self._semaphores[provider] = semaphore
+        return semaphore
+
+    def _secondary_ready(self) -> bool:
+        """İkincil sağlayıcı yapılandırılmış ve devresi izin veriyorsa True"""
+        if not self.secondary:
+            return False
+        try:
+            self._service(self.secondary)
+        except Exception as e:
+            # Ör. API anahtarı tanımlı değil; ikincil sağlayıcıyı devre dışı bırak
+            self.logger.warning(f"Secondary LLM provider '{self.secondary}' disabled: {e}")
+            self.secondary = None
+            return False
+        return self.stats[self.secondary].allow_request()
+
+    def _plan(self) -> Tuple[str, Optional[str]]:
+        """İlk gönderilecek sağlayıcı ve (varsa) yedek sağlayıcı"""
+        if self.stats[self.primary].allow_request():
+            return self.primary, self.secondary
+        if self._secondary_ready():
+            self.logger.warning(f"LLM provider '{self.primary}' circuit open, failing over to '{self.secondary}'")
+            return self.secondary, None
+        # Alternatif yoksa devre açık olsa da birincil denenir
+        return self.primary, None
+
+    def _hedge_delay(self, provider: str) -> Optional[float]:
+        if not settings.llm_hedging_enabled:
+            return None
+        stats = self.stats[provider]
+        if len(stats.first_chunk_latencies) < settings.llm_hedge_min_samples:
+            return None
+        return max(stats.percentile(0.95, first_chunk=True), settings.llm_hedge_min_delay)
+
+    async def _provider_stream(self, provider: str, message: Dict[str, Any]) -> AsyncIterator[str]:
+        """Tek sağlayıcının akışı; gecikme, hata ve iptalleri istatistiğe yazar"""
+        stats = self.stats[provider]
+        async with self._semaphore(provider):
+            started = time.monotonic()
+            received = False
+            stream = self._service(provider).astream(message)
+            try:
+                async for chunk in stream:
+                    if not received:
+                        received = True
+                        stats.record_first_chunk(time.monotonic() - started)
+                    yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                stats.record_cancelled(time.monotonic() - started, received)
+                raise
+            except Exception as e:
+                stats.record_failure(e)
+                raise
+            finally:
+                await stream.aclose()
+        stats.record_success(time.monotonic() - started)
+
+    async def astream(self, message: Dict[str, Any]) -> AsyncIterator[Tuple[str, str]]:
+        """
+        İsteği yönlendirir ve yanıtı parça parça üretir.
+
+        Yields:
+            (sağlayıcı, metin parçası)
+        """
+        first, backup = self._plan()
+        self.logger.info(f"Routing async request to LLM provider: {first}")
+
+        streams: Dict[str, AsyncIterator[str]] = {}
+        pending: Dict[asyncio.Future, str] = {}
+
+        def launch(provider: str):
+            streams[provider] = self._provider_stream(provider, message)
+            pending[asyncio.ensure_future(streams[provider].__anext__())] = provider
+
+        launch(first)
+        hedge_delay = self._hedge_delay(first) if backup else None
+        backup_launched = False
+        hedged = False
+        winner, first_chunk = None, None
+        errors: List[BaseException] = []
+
+        try:
+            while pending and winner is None:
+                timeout = hedge_delay if backup and not backup_launched else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Birincil ilk parça için p95'i aştı: yedeğe de gönder
+                    backup_launched = True
+                    if self._secondary_ready():
+                        hedged = True
+                        self.stats[first].hedged += 1
+                        self.logger.info(f"Hedging LLM request to '{backup}' after {hedge_delay:.1f}s")
+                        launch(backup)
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    error = task.exception()
+                    if error is None or isinstance(error, StopAsyncIteration):
+                        winner = provider
+                        first_chunk = None if error else task.result()
+                        break
+                    errors.append(error)
+                    self.logger.error(f"LLM provider '{provider}' failed: {error}")
+
+                if winner is None and not pending and backup and not backup_launched:
+                    backup_launched = True
+                    if self._secondary_ready():
+                        self.logger.warning(f"Failing over LLM request to '{backup}'")
+                        launch(backup)
+        finally:
+            # Kaybeden veya yarım kalan akışları iptal et
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            for provider, stream in streams.items():
+                if provider != winner:
+                    await stream.aclose()
+
+        if winner is None:
+            raise errors[-1]
+        if hedged and winner != first:
+            self.stats[first].hedge_wins += 1
+
+        stream = streams[winner]
+        try:
+            if first_chunk is not None:
+                yield winner, first_chunk
+                async for chunk in stream:
+                    yield winner, chunk
+        finally:
+            await stream.aclose()
+
+    def generate(self, message: Dict[str, Any]) -> Tuple[str, str]:
+        """Senkron yönlendirme: hedging yapılmaz, yalnızca hata/devre durumunda yedeğe geçilir"""
+        first, backup = self._plan()
+        providers = [first] + ([backup] if backup else [])
+
+        for index, provider in enumerate(providers):
+            if index > 0:
+                if not self._secondary_ready():
+                    break
+                self.logger.warning(f"Failing over LLM request to '{provider}'")
+
+            self.logger.info(f"Routing request to LLM provider: {provider}")
+            started = time.monotonic()
+            try:
+                result = self._service(provider).generate(message)
+            except Exception as e:
+                self.stats[provider].record_failure(e)
+                error = e
+                continue
+            self.stats[provider].record_success(time.monotonic() - started)
+            return result, provider
+
+        raise error
+
+    def snapshot(self) -> Dict[str, Any]:
+        """İzleme için sağlayıcı bazında gecikme, hata oranı ve devre durumu"""
+        providers = [self.primary] + ([self.secondary] if self.secondary else [])
+        return {
+            "primary": self.primary,
+            "secondary": self.secondary,
+            "hedging_enabled": settings.llm_hedging_enabled,
+            "providers": {name: self.stats[name].snapshot() for name in providers},
+        }
+
+# Global instance
+_llm_router = None
+
+def get_llm_router() -> LLMRouter:
+    """Singleton LLM router instance"""
+    global _llm_router
+    if _llm_router is None:
+        _llm_router = LLMRouter()
+    return _llm_router
@@ -0,0 +1,112 @@
+import base64
+import asyncio
+from pathlib import Path
+from typing import Dict, Any, List, AsyncIterator
+from openai import OpenAI, AsyncOpenAI
+
+from config import settings
+from services.logger import get_logger
+
+class OpenAIService:
+    """OpenAI API servis sınıfı"""
+
+    def __init__(self):
+        self.logger = get_logger("OpenAIService")
+        if not settings.openai_api_key:
+            raise ValueError("OPENAI_API_KEY tanımlı değil")
+        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.async_client = AsyncOpenAI(api_key=settings.openai_api_key)
+        self.model = settings.openai_model
+
+    def generate(self, message: Dict[str, Any]) -> str:
+        """İçerik üretimi"""
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(message),
+                temperature=0.3,
+                top_p=0.95,
+            )
+            result = response.choices[0].message.content or ""
+            self.logger.info(f"Generated content length: {len(result)}")
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Generation error: {str(e)}")
+            raise
+
+    async def astream(self, message: Dict[str, Any]) -> AsyncIterator[str]:
+        """Asenkron istemci ile metin parçalarını geldikçe üretir"""
+        # Ek dosyalar diskten okunur, olay döngüsünü bloklamasın
+        messages = await asyncio.to_thread(self._build_messages, message)
+        stream = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.3,
+            top_p=0.95,
+            stream=True,
+        )
+
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            self.logger.error(f"Generation error: {str(e)}")
+            raise
+        finally:
+            # İptal edildiğinde de HTTP bağlantısını serbest bırak
+            await stream.close()
+
+    async def generate_async(self, message: Dict[str, Any]) -> str:
+        """Asenkron istemci ile akışlı içerik üretimi"""
+        parts = [chunk async for chunk in self.astream(message)]
+        result = "".join(parts)
+        self.logger.info(f"Generated content length: {len(result)}")
+        return result
+
+    def _build_messages(self, message: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Mesaj parçalarını OpenAI formatına dönüştür"""
+        if not isinstance(message, dict):
+            return [{"role": "user", "content": str(message)}]
+
+        content = []
+
+        # Text varsa ekle
+        if message.get("text"):
+            content.append({"type": "text", "text": message["text"]})
+
+        # Görsel varsa ekle
+        if message.get("image"):
+            content.append({
+                "type": "image_url",
+                "image_url": {"url": f"data:image/jpeg;base64,{self._encode_attachment(message['image'])}"}
+            })
+
+        # PDF varsa ekle
+        if message.get("pdf"):
+            content.append({
+                "type": "file",
+                "file": {
+                    "filename": "document.pdf",
+                    "file_data": f"data:application/pdf;base64,{self._encode_attachment(message['pdf'])}"
+                }
+            })
+
+        return [{"role": "user", "content": content}]
+
+    def _encode_attachment(self, attachment: Any) -> str:
+        """Ek dosyayı gönderim anında base64'e çevir (API sadece bu formatı kabul eder)"""
+        if isinstance(attachment, dict):
+            return base64.b64encode(Path(attachment["path"]).read_bytes()).decode("ascii")
+        return attachment
+
+# Global instance
+_openai_service = None
+
+def get_openai_service() -> OpenAIService:
+    """Singleton OpenAI service instance"""
+    global _openai_service
+    if _openai_service is None:
+        _openai_service = OpenAIService()
+    return _openai_service
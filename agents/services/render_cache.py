@@ -0,0 +1,208 @@
+import os
+import ast
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from config import settings, manim_config
+from services.logger import get_logger
+from utils.db import connect_sqlite, transaction
+
+# Video ile birlikte önbelleğe alınan yan dosyalar
+SIDECAR_EXTENSIONS = [".srt", ".wav", ".txt", ".json", ".mp3", ".aac"]
+
+
+def normalize_code(code: str) -> str:
+    """
+    Manim kodunu biçimden bağımsız bir forma indirger.
+
+    Yorumlar, boşluklar ve satır düzeni AST dökümünde yer almaz; kod
+    ayrıştırılamazsa boşluklar sadeleştirilmiş metin kullanılır.
+    """
+    try:
+        return ast.dump(ast.parse(code), annotate_fields=False)
+    except SyntaxError:
+        return re.sub(r"\s+", " ", code).strip()
+
+
+def _link_or_copy(source: Path, target: Path):
+    """Aynı dosya sisteminde hard link, değilse kopya oluşturur"""
+    if target.exists():
+        target.unlink()
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+class RenderCache:
+    """Normalize edilmiş Manim kodu ile adreslenen, boyut sınırlı video önbelleği"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.logger = get_logger("RenderCache")
+        self.cache_dir = Path(cache_dir or settings.render_cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes or settings.render_cache_max_bytes
+        self._lock = threading.Lock()
+        self.conn = connect_sqlite(self.cache_dir / "index.sqlite3")
+        self._create_schema()
+
+    def _create_schema(self):
+        with transaction(self.conn, self._lock):
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    sidecars TEXT NOT NULL DEFAULT '[]',
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)"
+            )
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+
+    def make_key(self, code: str) -> str:
+        """Kod, render ayarları ve TTS ayarlarından önbellek anahtarı üretir"""
+        payload = json.dumps({
+            "code": normalize_code(code),
+            "render": manim_config.render_signature()
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str, ext: str = ".mp4") -> Path:
+        return self.cache_dir / f"{key}{ext}"
+
+    def _count(self, name: str):
+        self.conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    def lookup(self, key: str, request_id: str, target_dir: Path) -> Optional[Path]:
+        """
+        Önbellekte varsa videoyu ve yan dosyalarını hedef dizine bağlar.
+
+        Returns:
+            Hedefteki video yolu veya önbellekte yoksa None
+        """
+        with transaction(self.conn, self._lock):
+            row = self.conn.execute(
+                "SELECT sidecars FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            cached_video = self._entry_path(key)
+
+            if not row or not cached_video.exists():
+                if row:
+                    self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count("misses")
+                return None
+
+            self.conn.execute(
+                "UPDATE entries SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), key)
+            )
+            self._count("hits")
+            sidecars = json.loads(row["sidecars"])
+
+        target_video = Path(target_dir) / f"{request_id}.mp4"
+        _link_or_copy(cached_video, target_video)
+        for ext in sidecars:
+            source = self._entry_path(key, ext)
+            if source.exists():
+                _link_or_copy(source, target_video.with_suffix(ext))
+
+        self.logger.info(f"Render cache hit {key[:12]} -> {target_video}")
+        return target_video
+
+    def store(self, key: str, video_path: Path):
+        """Render edilmiş videoyu ve yan dosyalarını önbelleğe ekler"""
+        video_path = Path(video_path)
+        if not video_path.exists():
+            return
+
+        _link_or_copy(video_path, self._entry_path(key))
+        size = video_path.stat().st_size
+
+        sidecars = []
+        for ext in SIDECAR_EXTENSIONS:
+            source = video_path.with_suffix(ext)
+            if source.exists():
+                _link_or_copy(source, self._entry_path(key, ext))
+                size += source.stat().st_size
+                sidecars.append(ext)
+
+        now = time.time()
+        with transaction(self.conn, self._lock):
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (key, size, sidecars, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (key, size, json.dumps(sidecars), now, now)
+            )
+
+        self.logger.info(f"Render cached {key[:12]} ({size / 1024 / 1024:.1f} MB)")
+        self._evict()
+
+    def _evict(self):
+        """Toplam boyut sınırı aşılırsa en uzun süre kullanılmayan kayıtları siler"""
+        with transaction(self.conn, self._lock):
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            evicted = []
+            for row in self.conn.execute(
+                "SELECT key, size, sidecars FROM entries ORDER BY last_access ASC"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (row["key"],))
+                total -= row["size"]
+                evicted.append((row["key"], json.loads(row["sidecars"])))
+
+        for key, sidecars in evicted:
+            for ext in [".mp4"] + sidecars:
+                self._entry_path(key, ext).unlink(missing_ok=True)
+        self.logger.info(f"Render cache evicted {len(evicted)} entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """Önbellek istatistiklerini döndürür"""
+        with self._lock:
+            counters = dict(self.conn.execute("SELECT name, value FROM counters").fetchall())
+            entries, total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "total_size_mb": round(total / 1024 / 1024, 2),
+            "max_size_mb": round(self.max_bytes / 1024 / 1024, 2),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0
+        }
+
+# Global instance
+_render_cache = None
+
+def get_render_cache() -> RenderCache:
+    """Singleton render cache instance"""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache()
+    return _render_cache
@@ -0,0 +1,166 @@
+import os
+import sys
+import asyncio
+import importlib.util
+import multiprocessing
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from config import settings
+from services.logger import get_logger
+
+
+class RenderError(Exception):
+    """Render işçisinde oluşan, ana sürece taşınabilir hata"""
+    pass
+
+
+def _init_worker():
+    """Her işçi sürecinde Manim varsayılanlarını bir kez yükler"""
+    from config import manim_config
+    manim_config.setup_defaults()
+
+
+def render_scene(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Tek bir Manim sahnesini işçi sürecinde render eder.
+
+    Global ``manim.config`` sadece bu sürece aittir; her iş ayrıca
+    ``tempconfig`` ile kendi ayarlarını alır ve bitince geri yüklenir.
+
+    Args:
+        job: request_id, code_path, media_dir, output_file, scene_class ve
+            isteğe bağlı quality ("draft" / "final") ve audio_dir alanları
+
+    Returns:
+        Render edilen video yolunu içeren sözlük
+    """
+    from manim import tempconfig
+    from config import manim_config
+
+    code_path = Path(job["code_path"])
+    module_name = f"temp_manim_{job['request_id']}"
+    overrides = {
+        "media_dir": job["media_dir"],
+        "output_file": job["output_file"],
+        # Kısmi video dizinleri modül adına göre ayrılsın diye input_file veriyoruz
+        "input_file": str(code_path),
+        "write_to_movie": True,
+        "save_last_frame": False,
+        "disable_caching": job.get("disable_caching", False),
+    }
+    overrides.update(manim_config.quality_overrides(job.get("quality", "final")))
+
+    restore_speech_service = None
+    try:
+        # Seslendirme işin kendi dizinine, içerik adresli TTS önbelleğinden gelir
+        if job.get("audio_dir"):
+            from services.tts_cache import install_speech_service
+            restore_speech_service = install_speech_service(Path(job["audio_dir"]))
+
+        with tempconfig(overrides):
+            spec = importlib.util.spec_from_file_location(module_name, code_path)
+            if spec is None or spec.loader is None:
+                raise ImportError("Module spec veya loader bulunamadı")
+
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+
+            scene_class = job.get("scene_class", "Solution")
+            if not hasattr(module, scene_class):
+                raise AttributeError(f"{scene_class} class bulunamadı")
+
+            scene = getattr(module, scene_class)()
+            scene.render()
+
+            movie_path = scene.renderer.file_writer.movie_file_path
+            return {"video_path": str(movie_path) if movie_path else None}
+    except Exception as e:
+        # Manim/Cairo hataları her zaman pickle edilemez, metin olarak taşı
+        tb_tail = "".join(traceback.format_exception(type(e), e, e.__traceback__)[-3:])
+        raise RenderError(f"{type(e).__name__}: {e}\n{tb_tail}") from None
+    finally:
+        sys.modules.pop(module_name, None)
+        if restore_speech_service:
+            restore_speech_service()
+
+
+class RenderPool:
+    """Manim render işlerini ayrı süreçlerde çalıştıran işçi havuzu"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.logger = get_logger("RenderPool")
+        self.max_workers = max_workers or settings.render_workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending_jobs = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Havuzu ilk kullanımda başlatır"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                self.logger.info(f"Render pool started with {self.max_workers} workers")
+            return self._executor
+
+    def _reset_executor(self):
+        """Çöken havuzu kapatıp bir sonraki iş için yeniden kurulmasını sağlar"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    async def render(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """İşi kuyruğa ekler ve olay döngüsünü bloklamadan sonucunu bekler"""
+        loop = asyncio.get_running_loop()
+        self.pending_jobs += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), render_scene, job)
+        except BrokenProcessPool as e:
+            self.logger.error(f"Render worker crashed: {str(e)}")
+            self._reset_executor()
+            raise RenderError(f"Render işçisi beklenmedik şekilde sonlandı: {str(e)}")
+        finally:
+            self.pending_jobs -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Havuz durumunu döndürür"""
+        return {
+            "max_workers": self.max_workers,
+            "pending_jobs": self.pending_jobs,
+            "started": self._executor is not None
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Havuzu kapatır"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+                self.logger.info("Render pool stopped")
+
+# Global instance
+_render_pool = None
+
+def get_render_pool() -> RenderPool:
+    """Singleton render pool instance"""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = RenderPool()
+    return _render_pool
+
+def shutdown_render_pool():
+    """Uygulama kapanırken havuzu kapatır"""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown()
+        _render_pool = None
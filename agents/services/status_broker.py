@@ -0,0 +1,272 @@
+import hmac
+import json
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional, Set, AsyncIterator
+
+import httpx
+
+from config import settings
+from services.logger import get_logger
+
+
+def sign_payload(body: bytes, secret: str) -> str:
+    """Webhook gövdesi için HMAC-SHA256 imzası"""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def status_event(record: Dict[str, Any]) -> Dict[str, Any]:
+    """İş kaydını /api/status yanıtıyla aynı biçimde olaya çevir"""
+    request_id = record["request_id"]
+    event = {
+        "request_id": request_id,
+        "status": record["status"],
+        "message": record["message"],
+        "updated_at": record["updated_at"],
+    }
+    if record["status"] == "completed":
+        event["video_urls"] = {
+            "api": f"/api/video/{request_id}",
+            "direct": f"/videos/{request_id}.mp4",
+            "static": f"/static/final_videos/{request_id}.mp4"
+        }
+    
+    preview_path = record["meta"].get("preview_path")
+    if preview_path and Path(preview_path).exists():
+        event["preview_url"] = f"/videos/{Path(preview_path).name}"
+    return event
+
+
+class EventFanout:
+    """
+    Olayları tüm API işçilerine dağıtan paylaşımlı kanal.
+
+    ``publish`` olayı kanala yazar (bloklamaz), ``listen`` bu işçideki
+    abonelere iletilecek olayları (kendi yayınladıkları dahil) üretir.
+    """
+
+    name = "local"
+
+    def publish(self, event: Dict[str, Any]):
+        raise NotImplementedError
+
+    def listen(self) -> AsyncIterator[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class RedisFanout(EventFanout):
+    """Redis pub/sub kanalı (RedisJobStore ile aynı sunucu)"""
+
+    name = "redis"
+
+    def __init__(self, url: Optional[str] = None, channel: str = "job:events"):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            raise ImportError("Redis olay dağıtımı için 'redis' paketi gerekli: pip install redis")
+
+        self.client = redis_asyncio.Redis.from_url(url or settings.job_store_url, decode_responses=True)
+        self.channel = channel
+        self._publishes: Set[asyncio.Task] = set()
+
+    def publish(self, event: Dict[str, Any]):
+        task = asyncio.get_running_loop().create_task(self.client.publish(self.channel, json.dumps(event)))
+        self._publishes.add(task)
+        task.add_done_callback(self._publishes.discard)
+
+    async def listen(self):
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    yield json.loads(message["data"])
+        finally:
+            await pubsub.unsubscribe(self.channel)
+            await pubsub.close()
+
+    async def close(self):
+        if self._publishes:
+            await asyncio.gather(*self._publishes, return_exceptions=True)
+        await self.client.close()
+
+
+class JobStoreFanout(EventFanout):
+    """
+    Paylaşılan SQLite iş deposunu yoklayarak olay üretir.
+
+    Depoya yazılan her geçiş zaten yayındır; işçiler ``updated_at`` üzerinden
+    değişen kayıtları alır. Kilit beklerken daha eski zaman damgasıyla
+    yazılan kayıtlar kaçmasın diye pencere geriye doğru örtüşür; aynı
+    (iş, updated_at) bir kez iletilir. Aynı iş bir yoklama aralığında
+    birkaç kez geçiş yaptıysa yalnızca son durumu iletilir.
+    """
+
+    name = "store"
+    overlap = 5.0  # seconds
+
+    def __init__(self, job_store, interval: Optional[float] = None):
+        self.job_store = job_store
+        self.interval = interval or settings.sse_poll_interval
+
+    def publish(self, event: Dict[str, Any]):
+        pass
+
+    async def listen(self):
+        cursor = datetime.now()
+        delivered: Dict[str, str] = {}
+        while True:
+            await asyncio.sleep(self.interval)
+            since = (cursor - timedelta(seconds=self.overlap)).isoformat()
+            records = await asyncio.to_thread(self.job_store.list_updated_since, since)
+            for record in records:
+                if delivered.get(record["request_id"]) == record["updated_at"]:
+                    continue
+                delivered[record["request_id"]] = record["updated_at"]
+                cursor = max(cursor, datetime.fromisoformat(record["updated_at"]))
+                yield status_event(record)
+            # Pencerenin dışında kalan kayıtlar tekrar gelmez
+            delivered = {request_id: updated_at for request_id, updated_at in delivered.items() if updated_at >= since}
+
+
+def make_fanout(job_store=None) -> Optional[EventFanout]:
+    """``settings.sse_fanout`` ayarına göre paylaşımlı kanal (local: yalnızca bu süreç)"""
+    mode = settings.sse_fanout.lower()
+    if mode == "auto":
+        mode = "redis" if settings.job_store_backend.lower() == "redis" else "store"
+    if mode == "redis":
+        return RedisFanout()
+    if mode == "store":
+        if job_store is None:
+            from services.job_store import get_job_store
+            job_store = get_job_store()
+        if not hasattr(job_store, "list_updated_since"):
+            raise ValueError(f"SSE fanout 'store' is not supported by {job_store.__class__.__name__}")
+        return JobStoreFanout(job_store)
+    if mode == "local":
+        return None
+    raise ValueError(
+        f"Unsupported SSE fanout: '{settings.sse_fanout}'. Supported values are 'auto', 'redis', 'store' and 'local'."
+    )
+
+
+class StatusBroker:
+    """
+    İş durum geçişlerini yayınlar.
+
+    SSE aboneleri olay döngüsündeki kuyruklardan beslenir. Paylaşımlı bir
+    kanal (``fanout``) varsa olaylar kanal üzerinden tüm API işçilerine
+    ulaşır; abonesi olan her işçi kanalı tek bir görevle dinler. Kanal yoksa
+    (``local``) olaylar yalnızca yayınlayan işçinin abonelerine gider, bu
+    durumda API tek işçiyle çalıştırılmalıdır. İşin meta kaydında
+    ``callback_url`` varsa olay ayrıca imzalı webhook olarak (yalnızca
+    yayınlayan işçiden) gönderilir. Yavaş aboneler yayıncıyı bekletmez, en
+    eski olay düşürülür.
+    """
+
+    def __init__(self, queue_size: int = 100, fanout: Optional[EventFanout] = None):
+        self.logger = get_logger("StatusBroker")
+        self.queue_size = queue_size
+        self.fanout = fanout
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._deliveries: Set[asyncio.Task] = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self.fanout and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event: Dict[str, Any], callback_url: Optional[str] = None):
+        """Olayı abonelere ve varsa webhook adresine iletir (bloklamaz)"""
+        if self.fanout:
+            self.fanout.publish(event)
+        else:
+            self._deliver_local(event)
+
+        if callback_url:
+            task = asyncio.get_running_loop().create_task(self._deliver(callback_url, event))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    def _deliver_local(self, event: Dict[str, Any]):
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def _listen(self):
+        """Paylaşımlı kanaldaki olayları bu işçinin abonelerine dağıtır; hata olursa yeniden bağlanır"""
+        delay = 1
+        while True:
+            try:
+                async for event in self.fanout.listen():
+                    delay = 1
+                    self._deliver_local(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Status event fanout ({self.fanout.name}) failed, retrying in {delay}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    async def _deliver(self, url: str, event: Dict[str, Any]):
+        """Webhook'u kısa geri çekilmeyle birkaç kez dener"""
+        body = json.dumps(event).encode()
+        headers = {"Content-Type": "application/json"}
+        if settings.webhook_secret:
+            headers["X-Video-Signature"] = sign_payload(body, settings.webhook_secret)
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=settings.webhook_timeout)
+
+        for attempt in range(settings.webhook_max_attempts):
+            try:
+                response = await self._client.post(url, content=body, headers=headers)
+                if response.status_code < 500:
+                    if response.status_code >= 400:
+                        self.logger.warning(
+                            f"Webhook rejected for {event['request_id']}: {response.status_code}"
+                        )
+                    return
+                error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                error = str(e)
+            if attempt + 1 < settings.webhook_max_attempts:
+                await asyncio.sleep(2 ** attempt)
+
+        self.logger.error(f"Webhook delivery failed for {event['request_id']} ({url}): {error}")
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self.fanout is not None:
+            await self.fanout.close()
+        if self._deliveries:
+            await asyncio.gather(*self._deliveries, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+# Global instance
+_status_broker = None
+
+def get_status_broker() -> StatusBroker:
+    """Singleton status broker instance"""
+    global _status_broker
+    if _status_broker is None:
+        _status_broker = StatusBroker(fanout=make_fanout())
+    return _status_broker
@@ -0,0 +1,312 @@
+import os
+import re
+import ast
+import json
+import shutil
+import hashlib
+import threading
+import subprocess
+from abc import ABC, abstractmethod
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple, Type
+
+from config import settings
+from services.logger import get_logger
+
+MANIFEST_NAME = "manifest.json"
+
+
+class TTSEngine(ABC):
+    """Metni ses dosyasına çeviren motor; yeni motorlar register_tts_engine ile eklenir"""
+
+    name = "base"
+    extension = ".mp3"
+    offline = False
+
+    @abstractmethod
+    def synthesize(self, text: str, voice: str, speed: float, path: Path):
+        """``text`` metnini ``path`` yoluna ses dosyası olarak yazar"""
+        pass
+
+
+class GTTSEngine(TTSEngine):
+    """Google TTS (ağ bağlantısı gerekir)"""
+
+    name = "gtts"
+    extension = ".mp3"
+
+    def synthesize(self, text: str, voice: str, speed: float, path: Path):
+        from gtts import gTTS
+        gTTS(text, lang=voice, slow=speed < 1.0).save(str(path))
+
+
+class EspeakEngine(TTSEngine):
+    """espeak-ng ile çevrimdışı sentez"""
+
+    name = "espeak"
+    extension = ".wav"
+    offline = True
+    words_per_minute = 175
+
+    def synthesize(self, text: str, voice: str, speed: float, path: Path):
+        binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if binary is None:
+            raise RuntimeError("espeak-ng bulunamadı")
+        subprocess.run(
+            [binary, "-v", voice, "-s", str(int(self.words_per_minute * speed)), "-w", str(path), text],
+            check=True, capture_output=True, timeout=60
+        )
+
+
+TTS_ENGINES: Dict[str, Type[TTSEngine]] = {
+    GTTSEngine.name: GTTSEngine,
+    EspeakEngine.name: EspeakEngine,
+}
+
+
+def register_tts_engine(engine_class: Type[TTSEngine]):
+    """Yeni bir TTS motorunu ``settings.tts_engine`` ile seçilebilir yapar"""
+    TTS_ENGINES[engine_class.name] = engine_class
+    return engine_class
+
+
+def normalize_text(text: str) -> str:
+    """Seslendirmeyi değiştirmeyen boşluk farklarını yok sayar"""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def extract_narrations(code: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Manim kodundaki sabit seslendirme metinlerini çıkarır.
+
+    Returns:
+        (GTTSService(lang=...) ile verilen ses veya None, self.voiceover metinleri)
+        f-string gibi render sırasında oluşan metinler atlanır; onlar işçide sentezlenir
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None, []
+
+    voice, texts = None, []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        if isinstance(func, ast.Name) and func.id == "GTTSService":
+            for keyword in node.keywords:
+                if keyword.arg == "lang" and isinstance(keyword.value, ast.Constant):
+                    voice = keyword.value.value
+        elif isinstance(func, ast.Attribute) and func.attr == "voiceover":
+            candidates = [keyword.value for keyword in node.keywords if keyword.arg == "text"] + node.args[:1]
+            for value in candidates:
+                if isinstance(value, ast.Constant) and isinstance(value.value, str) and value.value.strip():
+                    texts.append(value.value)
+                    break
+    return voice, texts
+
+
+class TTSCache:
+    """
+    Metin, ses ve hız ile adreslenen TTS önbelleği.
+
+    Dosyalar içerik anahtarıyla saklanır; aynı cümle hangi işte geçerse
+    geçsin bir kez sentezlenir. Yazma geçici dosya + os.replace ile
+    yapıldığından render işçileri ve ana süreç aynı dizini paylaşabilir.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, engine: Optional[str] = None):
+        self.logger = get_logger("TTSCache")
+        self.cache_dir = Path(cache_dir or settings.tts_cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        engine_name = (engine or settings.tts_engine).lower()
+        if engine_name not in TTS_ENGINES:
+            raise ValueError(f"Unsupported TTS engine: '{engine_name}'. Supported engines: {', '.join(TTS_ENGINES)}")
+        self.engine = TTS_ENGINES[engine_name]()
+
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def make_key(self, text: str, voice: str, speed: float) -> str:
+        payload = json.dumps({
+            "engine": self.engine.name,
+            "text": normalize_text(text),
+            "voice": voice,
+            "speed": round(speed, 2),
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.engine.extension}"
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def synthesize(self,
+                   text: str,
+                   voice: Optional[str] = None,
+                   speed: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Önbellekte yoksa metni sentezler.
+
+        Returns:
+            {"text", "key", "path"} kaydı
+        """
+        voice = voice or settings.tts_voice
+        speed = speed or settings.tts_speed
+        key = self.make_key(text, voice, speed)
+        path = self._entry_path(key)
+
+        # Aynı süreçte aynı cümle iki kez sentezlenmesin
+        with self._key_lock(key):
+            if path.exists():
+                with self._lock:
+                    self.hits += 1
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = path.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}{self.engine.extension}")
+                try:
+                    self.engine.synthesize(normalize_text(text), voice, speed, temp_path)
+                    os.replace(temp_path, path)
+                except Exception:
+                    temp_path.unlink(missing_ok=True)
+                    with self._lock:
+                        self.errors += 1
+                    raise
+                with self._lock:
+                    self.misses += 1
+
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return {"text": text, "key": key, "path": path}
+
+    def presynthesize(self,
+                      texts: List[str],
+                      voice: Optional[str] = None,
+                      speed: Optional[float] = None,
+                      max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Metinleri paralel sentezler; hata veren metinler atlanır (işçide tekrar denenir)"""
+        unique_texts = list(dict.fromkeys(texts))
+        if not unique_texts:
+            return []
+
+        def synthesize_one(text: str) -> Optional[Dict[str, Any]]:
+            try:
+                return self.synthesize(text, voice, speed)
+            except Exception as e:
+                self.logger.warning(f"TTS pre-synthesis failed for '{text[:40]}': {e}")
+                return None
+
+        workers = min(max_workers or settings.tts_presynth_workers, len(unique_texts))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts") as executor:
+            entries = [entry for entry in executor.map(synthesize_one, unique_texts) if entry]
+
+        self.logger.info(f"TTS pre-synthesized {len(entries)}/{len(unique_texts)} narration lines")
+        return entries
+
+    def job_dir(self, output_id: str) -> Path:
+        """İşe ait ses dizini; manim_voiceover bu dizini cache_dir olarak kullanır"""
+        return settings.video_output_dir / "voiceovers" / output_id
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+        return {
+            "engine": self.engine.name,
+            "offline": self.engine.offline,
+            "voice": settings.tts_voice,
+            "speed": settings.tts_speed,
+            "hits": hits,
+            "misses": misses,
+            "errors": errors,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0
+        }
+
+
+def read_manifest(audio_dir: Path) -> List[Path]:
+    """İşin manifestindeki ses dosyaları (seslendirme sırasıyla)"""
+    manifest_path = Path(audio_dir) / MANIFEST_NAME
+    if not manifest_path.exists():
+        return []
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    files = [Path(audio_dir) / entry["file"] for entry in manifest.get("entries", [])]
+    return [path for path in files if path.exists()]
+
+
+def make_speech_service(cache: TTSCache, audio_dir: Path):
+    """
+    Üretilen koddaki GTTSService yerine kullanılan servis sınıfını oluşturur.
+
+    Ses dosyaları içerik önbelleğinden işin kendi dizinine bağlanır ve
+    kullanım sırasıyla manifeste yazılır.
+    """
+    from manim_voiceover.services.base import SpeechService
+
+    audio_dir = Path(audio_dir)
+    audio_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = audio_dir / MANIFEST_NAME
+    entries: List[Dict[str, Any]] = []
+
+    class CachedSpeechService(SpeechService):
+        def __init__(self, lang: Optional[str] = None, tld: Optional[str] = None, **kwargs):
+            self.voice = lang or settings.tts_voice
+            kwargs["cache_dir"] = str(audio_dir)
+            super().__init__(**kwargs)
+
+        def generate_from_text(self, text: str, cache_dir: Optional[str] = None, path: Optional[str] = None, **kwargs) -> dict:
+            entry = cache.synthesize(text, self.voice)
+            audio_name = path or entry["path"].name
+            target = Path(cache_dir or self.cache_dir) / audio_name
+            if not target.exists():
+                try:
+                    os.link(entry["path"], target)
+                except OSError:
+                    shutil.copy2(entry["path"], target)
+
+            entries.append({"text": text, "key": entry["key"], "file": audio_name})
+            manifest_path.write_text(json.dumps({
+                "engine": cache.engine.name,
+                "voice": self.voice,
+                "entries": entries,
+            }, ensure_ascii=False), encoding="utf-8")
+
+            return {
+                "input_text": text,
+                "input_data": {"input_text": text, "service": cache.engine.name, "voice": self.voice},
+                "original_audio": audio_name,
+            }
+
+    return CachedSpeechService
+
+
+def install_speech_service(audio_dir: Path):
+    """
+    İşçi sürecinde GTTSService'i önbellekli servisle değiştirir.
+
+    Returns:
+        Orijinal sınıfı geri yükleyen fonksiyon
+    """
+    import manim_voiceover.services.gtts as gtts_module
+
+    original = gtts_module.GTTSService
+    gtts_module.GTTSService = make_speech_service(get_tts_cache(), audio_dir)
+
+    def restore():
+        gtts_module.GTTSService = original
+    return restore
+
+# Global instance
+_tts_cache = None
+
+def get_tts_cache() -> TTSCache:
+    """Singleton TTS cache instance"""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
@@ -0,0 +1,269 @@
+import json
+import time
+import asyncio
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+from config import settings
+from services.logger import get_logger
+from utils.db import connect_sqlite, transaction
+
+# Video ile birlikte listelenen yan dosyalar
+RELATED_EXTENSIONS = ['.srt', '.wav', '.mp3', '.txt', '.json']
+
+# Listeleme için izin verilen sıralama alanları
+SORT_FIELDS = {
+    "created": "created_at",
+    "size": "size",
+    "duration": "duration",
+}
+
+
+class VideoCatalog:
+    """Render tamamlandığında doldurulan, indeksli video kataloğu"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.logger = get_logger("VideoCatalog")
+        self._lock = threading.Lock()
+        self.conn = connect_sqlite(path or settings.video_catalog_path)
+        self._create_schema()
+
+    def _create_schema(self):
+        with transaction(self.conn, self._lock):
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    duration REAL,
+                    has_audio INTEGER NOT NULL DEFAULT 0,
+                    video_codec TEXT,
+                    audio_codec TEXT,
+                    width INTEGER,
+                    height INTEGER,
+                    frame_rate TEXT,
+                    related_files TEXT NOT NULL DEFAULT '[]',
+                    metadata TEXT NOT NULL DEFAULT '{}',
+                    created_at REAL NOT NULL,
+                    modified_at REAL NOT NULL,
+                    indexed_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_videos_created ON videos(created_at)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_videos_location ON videos(location, created_at)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_videos_audio ON videos(has_audio, created_at)"
+            )
+
+    async def probe(self, video_path: Path) -> Dict[str, Any]:
+        """ffprobe'u olay döngüsünü bloklamadan çalıştırır"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'ffprobe', '-v', 'quiet', '-print_format', 'json',
+                '-show_format', '-show_streams', str(video_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=30)
+            return json.loads(stdout) if process.returncode == 0 else {}
+        except Exception as e:
+            self.logger.warning(f"ffprobe failed for {video_path}: {e}")
+            return {}
+
+    async def index_video(self, video_path: Path, location: str = "final") -> Optional[Dict[str, Any]]:
+        """Videoyu bir kez probe edip kataloğa ekler veya günceller"""
+        video_path = Path(video_path)
+        if not video_path.exists():
+            return None
+
+        metadata = await self.probe(video_path)
+        streams = metadata.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), {})
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+        duration = metadata.get("format", {}).get("duration")
+
+        stat = video_path.stat()
+        related = [
+            ext[1:] for ext in RELATED_EXTENSIONS
+            if video_path.with_suffix(ext).exists()
+        ]
+
+        row = (
+            video_path.stem,
+            video_path.name,
+            str(video_path),
+            location,
+            stat.st_size,
+            float(duration) if duration else None,
+            1 if audio else 0,
+            video.get("codec_name"),
+            audio.get("codec_name") if audio else None,
+            video.get("width"),
+            video.get("height"),
+            video.get("r_frame_rate"),
+            json.dumps(related),
+            json.dumps(metadata),
+            stat.st_ctime,
+            stat.st_mtime,
+            time.time(),
+        )
+        # SQLite yazması olay döngüsünü bloklamasın diye thread'de yapılır
+        await asyncio.to_thread(self._store, row)
+
+        self.logger.info(f"Video indexed: {video_path.stem}")
+        return await self.aget(video_path.stem)
+
+    def _store(self, row: Tuple[Any, ...]):
+        with transaction(self.conn, self._lock):
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO videos
+                    (id, filename, path, location, size, duration, has_audio,
+                     video_codec, audio_codec, width, height, frame_rate,
+                     related_files, metadata, created_at, modified_at, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                row
+            )
+
+    def remove(self, video_id: str):
+        with transaction(self.conn, self._lock):
+            self.conn.execute("DELETE FROM videos WHERE id = ?", (video_id,))
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM videos WHERE id = ?", (video_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list(self,
+             limit: int = 50,
+             offset: int = 0,
+             location: Optional[str] = None,
+             has_audio: Optional[bool] = None,
+             sort: str = "created",
+             descending: bool = True) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Filtrelenmiş ve sayfalanmış video listesi.
+
+        Returns:
+            (videolar, filtreye uyan toplam kayıt sayısı)
+        """
+        conditions, params = [], []
+        if location:
+            conditions.append("location = ?")
+            params.append(location)
+        if has_audio is not None:
+            conditions.append("has_audio = ?")
+            params.append(1 if has_audio else 0)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = f"{SORT_FIELDS.get(sort, 'created_at')} {'DESC' if descending else 'ASC'}"
+
+        with self._lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM videos {where}", params).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT * FROM videos {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [self._row_to_dict(row, include_metadata=False) for row in rows], total
+
+    def stats(self) -> Dict[str, Any]:
+        """Konum bazında video sayısı, toplam boyut ve süre"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT location, COUNT(*) AS count, COALESCE(SUM(size), 0) AS size, "
+                "COALESCE(SUM(duration), 0) AS duration FROM videos GROUP BY location"
+            ).fetchall()
+
+        by_location = {row["location"]: row["count"] for row in rows}
+        total_size = sum(row["size"] for row in rows)
+        return {
+            "by_location": by_location,
+            "total_videos": sum(by_location.values()),
+            "total_size_bytes": total_size,
+            "total_duration_seconds": round(sum(row["duration"] for row in rows), 1),
+        }
+
+    async def reindex(self, directories: Dict[str, Path]) -> Dict[str, int]:
+        """
+        Dizinleri tarayıp kataloğu yeniden oluşturur (bakım işlemi).
+
+        Args:
+            directories: konum adı -> dizin (ör. {"final": ..., "old": ...})
+        """
+        seen = set()
+        indexed = 0
+        for location, directory in directories.items():
+            if not directory.exists():
+                continue
+            for video_file in directory.glob("*.mp4"):
+                if video_file.stem.endswith("_preview") or video_file.stem in seen:
+                    continue
+                seen.add(video_file.stem)
+                await self.index_video(video_file, location)
+                indexed += 1
+
+        # Dosyası silinmiş kayıtları temizle
+        stale = await asyncio.to_thread(self._remove_missing, seen)
+
+        self.logger.info(f"Catalog reindexed: {indexed} videos, {len(stale)} stale entries removed")
+        return {"indexed": indexed, "removed": len(stale)}
+
+    def _remove_missing(self, seen: set) -> List[str]:
+        with self._lock:
+            known = [row["id"] for row in self.conn.execute("SELECT id FROM videos").fetchall()]
+        stale = [video_id for video_id in known if video_id not in seen]
+        with transaction(self.conn, self._lock):
+            self.conn.executemany("DELETE FROM videos WHERE id = ?", [(v,) for v in stale])
+        return stale
+
+    # Olay döngüsünden çağrılar için: SQLite erişimi thread'de yapılır
+    async def aget(self, video_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.get, video_id)
+
+    async def alist(self, **kwargs) -> Tuple[List[Dict[str, Any]], int]:
+        return await asyncio.to_thread(lambda: self.list(**kwargs))
+
+    async def astats(self) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.stats)
+
+    async def aremove(self, video_id: str):
+        await asyncio.to_thread(self.remove, video_id)
+
+    def _row_to_dict(self, row, include_metadata: bool = True) -> Dict[str, Any]:
+        data = {
+            "id": row["id"],
+            "filename": row["filename"],
+            "path": row["path"],
+            "location": row["location"],
+            "size": row["size"],
+            "duration": row["duration"],
+            "has_audio": bool(row["has_audio"]),
+            "video_codec": row["video_codec"],
+            "audio_codec": row["audio_codec"],
+            "width": row["width"],
+            "height": row["height"],
+            "frame_rate": row["frame_rate"],
+            "related_files": json.loads(row["related_files"]),
+            "created": row["created_at"],
+            "modified": row["modified_at"],
+        }
+        if include_metadata:
+            data["metadata"] = json.loads(row["metadata"])
+        return data
+
+# Global instance
+_video_catalog = None
+
+def get_video_catalog() -> VideoCatalog:
+    """Singleton video catalog instance"""
+    global _video_catalog
+    if _video_catalog is None:
+        _video_catalog = VideoCatalog()
+    return _video_catalog
@@ -1,19 +1,129 @@
 import os
+import json
+import shutil
+import tempfile
 import subprocess
 from pathlib import Path
-from typing import List, Optional
-from moviepy.editor import VideoFileClip, concatenate_videoclips, CompositeVideoClip
-import numpy as np
+from typing import List, Optional, Dict, Any, Tuple
 
 from services.logger import get_logger
 from config import settings
 
+# Manim'in libx264 varsayılanları (preset ve CRF, SPS/PPS'i etkileyen kodlayıcı kararlarını belirler)
+X264_PRESET = "medium"
+X264_CRF = "23"
+# x264'ün B-kare varsayılanı; has_b_frames=0 olan akışlar B-karesiz kodlanır
+X264_BFRAMES = 3
+# ffprobe profil adı -> libx264 -profile:v değeri
+H264_PROFILES = {
+    "Constrained Baseline": "baseline",
+    "Baseline": "baseline",
+    "Main": "main",
+    "High": "high",
+    "High 10": "high10",
+    "High 4:2:2": "high422",
+    "High 4:4:4 Predictive": "high444",
+}
+AUDIO_ENCODE_ARGS = ['-c:a', 'aac', '-b:a', '128k']
+
 class VideoMerger:
     """Video birleştirme ve düzenleme sınıfı"""
     
     def __init__(self):
         self.logger = get_logger("VideoMerger")
         
+    def probe_video(self, video_path: Path) -> Dict[str, Any]:
+        """ffprobe ile süre ve akış parametrelerini okur"""
+        cmd = [
+            'ffprobe', '-v', 'error', '-print_format', 'json',
+            '-show_format', '-show_streams', str(video_path)
+        ]
+        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        data = json.loads(result.stdout)
+        
+        video = next((s for s in data.get('streams', []) if s.get('codec_type') == 'video'), None)
+        audio = next((s for s in data.get('streams', []) if s.get('codec_type') == 'audio'), None)
+        if not video:
+            raise ValueError(f"Video akışı bulunamadı: {video_path}")
+        
+        return {
+            "duration": float(data["format"]["duration"]),
+            "video": {
+                "codec_name": video.get("codec_name"),
+                "profile": video.get("profile"),
+                "level": video.get("level"),
+                "refs": video.get("refs"),
+                "has_b_frames": video.get("has_b_frames"),
+                "width": video.get("width"),
+                "height": video.get("height"),
+                "pix_fmt": video.get("pix_fmt"),
+                "r_frame_rate": video.get("r_frame_rate"),
+                "time_base": video.get("time_base"),
+            },
+            "audio": {
+                "codec_name": audio.get("codec_name"),
+                "sample_rate": audio.get("sample_rate"),
+                "channels": audio.get("channels"),
+            } if audio else None
+        }
+    
+    def keyframe_times(self, video_path: Path) -> List[float]:
+        """Video akışındaki anahtar karelerin zamanlarını (çözmeden) döndürür"""
+        cmd = [
+            'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0',
+            str(video_path)
+        ]
+        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        
+        times = []
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.partition(',')
+            if 'K' in flags and pts_time not in ('', 'N/A'):
+                times.append(float(pts_time))
+        return sorted(times)
+    
+    def concat_videos(self,
+                      video_paths: List[Path],
+                      output_path: Path,
+                      audio: Optional[Tuple[List[Path], str]] = None) -> Path:
+        """
+        Aynı kodlama parametrelerine sahip videoları concat demuxer ile
+        yeniden kodlamadan (stream copy) birleştirir.
+        
+        Args:
+            audio: (girdiler, filtre grafiği) verilirse videoların yalnızca
+                görüntüsü kopyalanır; ses izi bu girdilerden tek seferde
+                kodlanır (grafiğin çıkışı ``[aout]``)
+        """
+        list_file = output_path.with_suffix('.concat.txt')
+        lines = []
+        for video_path in video_paths:
+            escaped = str(Path(video_path).resolve()).replace("'", "'\\''")
+            lines.append(f"file '{escaped}'")
+        list_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        
+        cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', str(list_file)]
+        if audio:
+            inputs, graph = audio
+            for path in inputs:
+                cmd += ['-i', str(path)]
+            cmd += [
+                '-filter_complex', graph,
+                '-map', '0:v:0', '-map', '[aout]',
+                '-c:v', 'copy', *AUDIO_ENCODE_ARGS,
+            ]
+        else:
+            cmd += ['-c', 'copy']
+        cmd += ['-movflags', '+faststart', str(output_path)]
+        
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
+        finally:
+            list_file.unlink(missing_ok=True)
+        
+        return output_path
+    
     def merge_videos(self, 
                     video_paths: List[Path], 
                     output_path: Path,
@@ -21,6 +131,11 @@ class VideoMerger:
         """
         Birden fazla videoyu birleştirir
         
+        Görüntü stream copy ile birleştirilir; yalnızca parametreleri farklı
+        olan klipler ve geçiş (crossfade) pencereleri Manim'in x264
+        ayarlarıyla yeniden kodlanır. Ses izi anahtar kare kesimlerine
+        bağlı kalmasın diye tüm zaman çizelgesi üzerinden bir kez kodlanır.
+        
         Args:
             video_paths: Birleştirilecek video dosyaları
             output_path: Çıktı dosya yolu
@@ -29,43 +144,226 @@ class VideoMerger:
         Returns:
             Birleştirilmiş video dosya yolu
         """
+        work_dir = Path(tempfile.mkdtemp(prefix="merge_", dir=settings.temp_dir))
+        
         try:
             self.logger.info(f"Merging {len(video_paths)} videos")
             
+            infos = [self.probe_video(Path(p)) for p in video_paths]
+            reference = infos[0]
+            
+            # Görüntü parametreleri ilk klipten farklı olanları ona uydur
+            sources = [(Path(p), info) for p, info in zip(video_paths, infos)]
             clips = []
-            for i, video_path in enumerate(video_paths):
-                clip = VideoFileClip(str(video_path))
-                
-                # Geçiş efekti ekle (ilk video hariç)
-                if i > 0 and transition_duration > 0:
-                    clip = clip.crossfadein(transition_duration)
-                
-                clips.append(clip)
-            
-            # Videoları birleştir
-            final_clip = concatenate_videoclips(clips, method="compose")
-            
-            # Çıktıyı kaydet
-            final_clip.write_videofile(
-                str(output_path),
-                codec='libx264',
-                audio_codec='aac',
-                fps=60,
-                preset='medium',
-                threads=4
-            )
-            
-            # Belleği temizle
-            for clip in clips:
-                clip.close()
-            final_clip.close()
+            for index, (video_path, info) in enumerate(sources):
+                if self._signature(info) != self._signature(reference):
+                    self.logger.info(f"Re-encoding mismatched clip: {video_path}")
+                    video_path = self._reencode(video_path, reference, work_dir / f"norm_{index}.mp4")
+                    info = self.probe_video(video_path)
+                clips.append((video_path, info))
+            
+            segments = [clip for clip, _ in clips]
+            crossfade = 0.0
+            if transition_duration > 0 and len(clips) > 1:
+                try:
+                    segments = self._crossfade_segments(clips, reference, transition_duration, work_dir)
+                    crossfade = transition_duration
+                except (subprocess.CalledProcessError, ValueError) as e:
+                    # Geçiş üretilemezse düz birleştirmeye dön
+                    self.logger.warning(f"Crossfade skipped, falling back to plain concat: {e}")
+                    segments = [clip for clip, _ in clips]
+            
+            # Ses orijinal kliplerden okunur; süreler görüntü zaman çizelgesiyle aynı hesaplanır
+            self.concat_videos(segments, output_path, self._audio_graph(sources, crossfade))
             
             self.logger.info(f"Videos merged successfully: {output_path}")
             return output_path
             
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"Video merge error: {e.stderr.decode(errors='replace') if e.stderr else e}")
+            raise
         except Exception as e:
             self.logger.error(f"Video merge error: {str(e)}")
             raise
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    def _signature(self, info: Dict[str, Any]) -> Tuple:
+        """
+        Stream copy birleştirme için eşleşmesi gereken görüntü parametreleri.
+        
+        Concat demuxer yalnızca ilk klibin SPS/PPS (avcC) kaydını taşır; seviye,
+        referans kare ve B-kare ayarları farklı klipler bozuk çözülür.
+        """
+        video = info["video"]
+        return (
+            video["codec_name"], video["profile"], video["level"], video["refs"], video["has_b_frames"],
+            video["width"], video["height"], video["pix_fmt"], video["r_frame_rate"], video["time_base"],
+        )
+    
+    def _encode_args(self, reference: Dict[str, Any]) -> List[str]:
+        """Referans klibin SPS/PPS'i ile aynı görüntü kodlama argümanları (ses yok)"""
+        video = reference["video"]
+        args = [
+            '-c:v', 'libx264', '-preset', X264_PRESET, '-crf', X264_CRF,
+            '-pix_fmt', video["pix_fmt"],
+            '-r', video["r_frame_rate"],
+            '-video_track_timescale', video["time_base"].split('/')[-1],
+        ]
+        
+        profile = H264_PROFILES.get(video.get("profile"))
+        if profile:
+            args += ['-profile:v', profile]
+        if video.get("level") and video["level"] > 0:
+            args += ['-level', f'{video["level"] / 10:.1f}']
+        
+        x264_params = []
+        if video.get("refs"):
+            x264_params.append(f'ref={video["refs"]}')
+        bframes = X264_BFRAMES if video.get("has_b_frames") else 0
+        x264_params.append(f'bframes={bframes}')
+        args += ['-x264-params', ':'.join(x264_params), '-an']
+        return args
+    
+    def _audio_graph(self,
+                     clips: List[Tuple[Path, Dict[str, Any]]],
+                     crossfade: float) -> Optional[Tuple[List[Path], str]]:
+        """
+        Tüm klipler için tek ses izi üreten filtre grafiği.
+        
+        Her klibin sesi örnek hassasiyetinde görüntü süresine tamamlanır veya
+        kısaltılır (sessiz klipler için sessizlik üretilir); geçişlerde
+        görüntüdeki xfade ile aynı süreli acrossfade uygulanır.
+        
+        Returns:
+            (girdi dosyaları, grafik) veya hiçbir klipte ses yoksa None
+        """
+        audio = next((info["audio"] for _, info in clips if info["audio"]), None)
+        if not audio:
+            return None
+        
+        sample_rate = audio["sample_rate"]
+        layout = 'stereo' if audio["channels"] == 2 else 'mono'
+        normalize = f'aresample={sample_rate},aformat=sample_fmts=fltp:channel_layouts={layout}'
+        
+        filters = []
+        for index, (_, info) in enumerate(clips):
+            duration = f'{info["duration"]:.6f}'
+            if info["audio"]:
+                source = f'[{index + 1}:a]{normalize},apad'
+            else:
+                source = f'anullsrc=r={sample_rate}:cl={layout},{normalize}'
+            filters.append(f'{source},atrim=duration={duration},asetpts=N/SR/TB[a{index}]')
+        
+        if len(clips) == 1:
+            filters.append('[a0]anull[aout]')
+        elif crossfade > 0:
+            previous = 'a0'
+            for index in range(1, len(clips)):
+                label = 'aout' if index == len(clips) - 1 else f'x{index}'
+                filters.append(f'[{previous}][a{index}]acrossfade=d={crossfade}:c1=tri:c2=tri[{label}]')
+                previous = label
+        else:
+            labels = ''.join(f'[a{index}]' for index in range(len(clips)))
+            filters.append(f'{labels}concat=n={len(clips)}:v=0:a=1[aout]')
+        
+        return [clip for clip, _ in clips], ';'.join(filters)
+    
+    def _reencode(self, video_path: Path, reference: Dict[str, Any], output_path: Path) -> Path:
+        """Klibin görüntüsünü referans parametrelerine göre yeniden kodlar (ses ayrıca kodlanır)"""
+        video = reference["video"]
+        cmd = [
+            'ffmpeg', '-y', '-i', str(video_path), '-map', '0:v:0',
+            '-vf', f'scale={video["width"]}:{video["height"]},fps={video["r_frame_rate"]}',
+            *self._encode_args(reference),
+            str(output_path)
+        ]
+        subprocess.run(cmd, check=True, capture_output=True)
+        return output_path
+    
+    def _crossfade_segments(self,
+                            clips: List[Tuple[Path, Dict[str, Any]]],
+                            reference: Dict[str, Any],
+                            duration: float,
+                            work_dir: Path) -> List[Path]:
+        """
+        Geçişli birleştirme için görüntü segment listesi üretir.
+        
+        Her klibin anahtar kareler arasında kalan gövdesi kopyalanır; sadece
+        iki klip arasındaki geçiş penceresi (önceki klibin son anahtar
+        karesinden sonrası + sonraki klibin ilk anahtar karesine kadarı)
+        yeniden kodlanır. Segmentler ses içermez.
+        """
+        cuts = []
+        for index, (clip, info) in enumerate(clips):
+            keyframes = self.keyframe_times(clip)
+            head = 0.0
+            tail = info["duration"]
+            
+            if index > 0:
+                head = next((t for t in keyframes if t >= duration), None)
+                if head is None:
+                    raise ValueError(f"No keyframe after transition window in {clip.name}")
+            if index < len(clips) - 1:
+                tail = max((t for t in keyframes if t <= info["duration"] - duration), default=None)
+                if tail is None or tail < head:
+                    raise ValueError(f"No keyframe before transition window in {clip.name}")
+            cuts.append((head, tail))
+        
+        segments = []
+        for index, (clip, info) in enumerate(clips):
+            head, tail = cuts[index]
+            
+            # Gövde: anahtar karelerden kesildiği için görüntüde stream copy yeterli
+            if head == 0 and tail == info["duration"]:
+                segments.append(clip)
+            elif tail > head:
+                body = work_dir / f"body_{index}.mp4"
+                subprocess.run([
+                    'ffmpeg', '-y', '-ss', f'{head:.6f}', '-i', str(clip),
+                    '-t', f'{tail - head:.6f}', '-map', '0:v:0', '-c:v', 'copy', '-an',
+                    '-avoid_negative_ts', 'make_zero', str(body)
+                ], check=True, capture_output=True)
+                segments.append(body)
+            
+            if index < len(clips) - 1:
+                segments.append(self._crossfade_boundary(
+                    clip, info, tail, clips[index + 1][0], cuts[index + 1][0],
+                    reference, duration, work_dir / f"xfade_{index}.mp4"
+                ))
+        
+        return segments
+    
+    def _crossfade_boundary(self,
+                            first: Path,
+                            first_info: Dict[str, Any],
+                            first_start: float,
+                            second: Path,
+                            second_end: float,
+                            reference: Dict[str, Any],
+                            duration: float,
+                            output_path: Path) -> Path:
+        """İki klip arasındaki geçiş penceresinin görüntüsünü yeniden kodlar"""
+        fps = reference["video"]["r_frame_rate"]
+        offset = first_info["duration"] - first_start - duration
+        
+        filters = [
+            f'[0:v]settb=AVTB,fps={fps}[v0]',
+            f'[1:v]settb=AVTB,fps={fps}[v1]',
+            f'[v0][v1]xfade=transition=fade:duration={duration}:offset={offset:.6f}[v]',
+        ]
+        
+        cmd = [
+            'ffmpeg', '-y',
+            '-ss', f'{first_start:.6f}', '-i', str(first),
+            '-t', f'{second_end:.6f}', '-i', str(second),
+            '-filter_complex', ';'.join(filters),
+            '-map', '[v]',
+            *self._encode_args(reference),
+            str(output_path)
+        ]
+        subprocess.run(cmd, check=True, capture_output=True)
+        return output_path
     
     def add_watermark(self, 
                      video_path: Path,
@@ -149,6 +447,7 @@ class VideoMerger:
                 '-preset', settings["preset"],
                 '-c:a', 'aac',
                 '-b:a', '128k',
+                '-movflags', '+faststart',
                 str(output_path),
                 '-y'
             ]
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# config.Settings zorunlu ayarları ortamdan okur; testler gerçek anahtar gerektirmez
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+# Servis modülleri agents/ kökünden içe aktarılır (from config import settings)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
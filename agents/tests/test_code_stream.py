@@ -0,0 +1,85 @@
+import pytest
+
+from utils.code_stream import PythonBlockExtractor, IncrementalSyntaxChecker, CodeStreamError
+
+RESPONSE = "Açıklama:\n```python\nfrom manim import *\n\nclass Cozum(Scene):\n    pass\n```\nSon not ```"
+CODE = "from manim import *\n\nclass Cozum(Scene):\n    pass\n"
+
+
+def _feed_all(chunks):
+    extractor = PythonBlockExtractor()
+    emitted = "".join(extractor.feed(chunk) for chunk in chunks)
+    return extractor, emitted
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(RESPONSE)])
+def test_fences_split_across_chunks(size):
+    chunks = [RESPONSE[i:i + size] for i in range(0, len(RESPONSE), size)]
+    extractor, emitted = _feed_all(chunks)
+
+    assert extractor.complete
+    assert emitted == extractor.code == CODE
+    assert extractor.text == RESPONSE
+
+
+def test_backticks_inside_block_are_held_until_resolved():
+    extractor = PythonBlockExtractor()
+    extractor.feed("```python\nx = 1\n`")
+    assert extractor.code == "x = 1\n"
+    extractor.feed("``")
+    assert extractor.complete
+    assert extractor.code == "x = 1\n"
+
+
+def test_response_without_block():
+    extractor, emitted = _feed_all(["Kod yok", ", sadece metin ``", "`"])
+    assert not extractor.started and not extractor.complete
+    assert emitted == ""
+
+
+def _check(source, check_every=1):
+    checker = IncrementalSyntaxChecker(check_every=check_every)
+    for line in source.splitlines(keepends=True):
+        checker.feed(line)
+    return checker
+
+
+@pytest.mark.parametrize("source", [
+    # Kapanmamış parantezler
+    "self.play(\n    Write(baslik),\n",
+    "noktalar = [\n    (0, 0),\n    (1, 2),\n",
+    "renkler = {\n    'a': RED,\n",
+    # Gövdesi gelmemiş blok ve sondaki dekoratör
+    "class Cozum(Scene):\n    def construct(self):\n",
+    "class Cozum(Scene):\n    @staticmethod\n",
+    "@dataclass\n",
+    # Satır devamı
+    "toplam = 1 + \\\n",
+    "toplam = 1 + \\\n    2 + \\\n",
+    # Kapanmamış çok satırlı metin ve except bekleyen try
+    'aciklama = """\nBirinci satır\n',
+    "try:\n    x = 1\n",
+    # Henüz tamamlanmamış son satır kontrol edilmez
+    "x = 1\ny = (",
+])
+def test_incomplete_code_is_not_an_error(source):
+    _check(source)
+
+
+def test_syntax_error_before_last_line_aborts():
+    with pytest.raises(CodeStreamError) as excinfo:
+        _check("x = 1\ny = = 2\nz = 3\n")
+    assert excinfo.value.lineno == 2
+
+
+def test_error_on_last_line_waits_for_more_code():
+    # Son satırdaki hata bir sonraki satırla tamamlanabilir, hemen kesilmez
+    checker = _check("x = 1\ny = = 2\n")
+    with pytest.raises(CodeStreamError):
+        checker.feed("z = 3\n")
+
+
+def test_check_every_limits_parsing():
+    checker = _check("x = 1\ny = = 2\nz = 3\n", check_every=10)
+    with pytest.raises(CodeStreamError):
+        checker.feed("a = 1\n" * 7)
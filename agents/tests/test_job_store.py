@@ -0,0 +1,76 @@
+import pytest
+
+from services.job_store import SQLiteJobStore, ALLOWED_TRANSITIONS
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteJobStore(path=tmp_path / "jobs.db", ttl=3600)
+
+
+def test_first_transition_must_be_processing(store):
+    assert not store.transition("job", "completed", "Video hazır")
+    assert store.get("job") is None
+    assert store.transition("job", "processing", "Başladı")
+    assert store.get("job")["status"] == "processing"
+
+
+@pytest.mark.parametrize("final", ["completed", "failed"])
+def test_final_states_reject_further_transitions(store, final):
+    store.transition("job", "processing", "Başladı")
+    assert store.transition("job", final, "Bitti")
+
+    for status in ALLOWED_TRANSITIONS:
+        if status:
+            assert not store.transition("job", status, "Geç gelen olay")
+    assert store.get("job")["status"] == final
+
+
+def test_transition_merges_meta_and_keeps_first_stage_time(store):
+    store.transition("job", "processing", "Başladı", callback_url="http://example.com/hook")
+    first_stage = store.get("job")["stages"]["processing"]
+    store.transition("job", "rendering", "Render", preview_path="/tmp/preview.mp4")
+    store.transition("job", "processing", "Düzeltiliyor")
+    store.transition("job", "completed", "Hazır", "/videos/job.mp4")
+
+    record = store.get("job")
+    assert record["meta"] == {"callback_url": "http://example.com/hook", "preview_path": "/tmp/preview.mp4"}
+    assert record["stages"]["processing"] == first_stage
+    assert set(record["stages"]) == {"processing", "rendering", "completed"}
+    assert record["video_path"] == "/videos/job.mp4"
+
+
+def test_expired_records_are_hidden_and_purged(tmp_path):
+    store = SQLiteJobStore(path=tmp_path / "jobs.db", ttl=-1)
+    assert store.transition("old", "processing", "Başladı")
+
+    assert store.get("old") is None
+    assert store.list_by_status("processing") == []
+    assert store.purge_expired() == 1
+    assert store.purge_expired() == 0
+
+
+def test_expired_record_can_start_again(tmp_path):
+    store = SQLiteJobStore(path=tmp_path / "jobs.db", ttl=-1)
+    store.transition("job", "processing", "Başladı")
+    store.transition("job", "completed", "Hazır")
+
+    # Süresi dolmuş tamamlanmış kayıt yeni bir işi engellemez
+    assert store.transition("job", "processing", "Tekrar")
+
+
+def test_list_by_status_newest_first_with_limit(store):
+    for request_id in ("a", "b", "c"):
+        store.transition(request_id, "processing", "Başladı")
+    store.transition("b", "rendering", "Render")
+
+    assert [job["request_id"] for job in store.list_by_status("processing")] == ["c", "a"]
+    assert [job["request_id"] for job in store.list_by_status("processing", limit=1)] == ["c"]
+    assert [job["request_id"] for job in store.list_by_status("rendering")] == ["b"]
+    assert store.list_by_status("completed") == []
+
+
+def test_delete(store):
+    store.transition("job", "processing", "Başladı")
+    store.delete("job")
+    assert store.get("job") is None
@@ -0,0 +1,146 @@
+import time
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services import llm_router
+from services.llm_router import LLMRouter
+
+
+class FakeProvider:
+    """İlk parçayı ``delay`` sonra gönderen (veya ``error`` fırlatan) sahte async sağlayıcı"""
+
+    def __init__(self, chunks=("merhaba", " dünya"), delay=0.0, error=None):
+        self.chunks = chunks
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def astream(self, message):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            for chunk in self.chunks:
+                yield chunk
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(llm_router, "settings", SimpleNamespace(
+        llm_provider="gemini",
+        llm_secondary_provider="openai",
+        gemini_model="gemini-test",
+        openai_model="openai-test",
+        llm_stats_window=50,
+        llm_breaker_threshold=3,
+        llm_breaker_reset_timeout=60,
+        llm_max_concurrency=4,
+        llm_hedging_enabled=True,
+        llm_hedge_min_samples=5,
+        llm_hedge_min_delay=0.01,
+    ))
+    return LLMRouter()
+
+
+def _use(router, primary, secondary):
+    router._services = {"gemini": primary, "openai": secondary}
+
+
+def _collect(router):
+    async def consume():
+        return [item async for item in router.astream({"prompt": "soru"})]
+    return asyncio.run(consume())
+
+
+def test_primary_within_p95_is_not_hedged(router):
+    primary, secondary = FakeProvider(), FakeProvider()
+    _use(router, primary, secondary)
+    router.stats["gemini"].first_chunk_latencies.extend([0.2] * 10)
+
+    assert _collect(router) == [("gemini", "merhaba"), ("gemini", " dünya")]
+    assert secondary.calls == 0
+    assert router.stats["gemini"].hedged == 0
+
+
+def test_hedge_fires_after_p95_and_cancels_loser(router):
+    primary, secondary = FakeProvider(delay=5), FakeProvider(chunks=("yedek",))
+    _use(router, primary, secondary)
+    router.stats["gemini"].first_chunk_latencies.extend([0.1] * 10)
+
+    started = time.monotonic()
+    result = _collect(router)
+    elapsed = time.monotonic() - started
+
+    assert result == [("openai", "yedek")]
+    assert 0.1 <= elapsed < 1
+    assert primary.cancelled
+    assert router.stats["gemini"].hedged == 1
+    assert router.stats["gemini"].hedge_wins == 1
+    # Kaybeden birincil hata sayılmaz, bekleme süresi ilk parça gecikmesine eklenir
+    assert True not in router.stats["gemini"].outcomes
+    assert max(router.stats["gemini"].first_chunk_latencies) >= 0.1
+
+
+def test_no_hedge_without_enough_samples(router):
+    primary, secondary = FakeProvider(delay=0.2), FakeProvider()
+    _use(router, primary, secondary)
+    router.stats["gemini"].first_chunk_latencies.extend([0.01] * 4)
+
+    assert _collect(router)[0][0] == "gemini"
+    assert secondary.calls == 0
+
+
+def test_open_breaker_is_skipped(router):
+    primary, secondary = FakeProvider(), FakeProvider(chunks=("yedek",))
+    _use(router, primary, secondary)
+    for _ in range(3):
+        router.stats["gemini"].record_failure(RuntimeError("kota"))
+
+    assert _collect(router) == [("openai", "yedek")]
+    assert primary.calls == 0
+    assert router.stats["gemini"].snapshot()["state"] == "open"
+
+
+def test_failover_on_error_before_first_chunk(router):
+    primary = FakeProvider(error=RuntimeError("503"))
+    secondary = FakeProvider(chunks=("yedek",))
+    _use(router, primary, secondary)
+
+    assert _collect(router) == [("openai", "yedek")]
+    assert router.stats["gemini"].last_error == "503"
+    assert router.stats["gemini"].hedged == 0
+
+
+def test_error_after_first_chunk_is_not_failed_over(router):
+    class Broken(FakeProvider):
+        async def astream(self, message):
+            self.calls += 1
+            yield "yarım"
+            raise RuntimeError("bağlantı koptu")
+
+    primary, secondary = Broken(), FakeProvider()
+    _use(router, primary, secondary)
+
+    async def consume():
+        received = []
+        with pytest.raises(RuntimeError):
+            async for item in router.astream({"prompt": "soru"}):
+                received.append(item)
+        return received
+
+    assert asyncio.run(consume()) == [("gemini", "yarım")]
+    assert secondary.calls == 0
+
+
+def test_all_providers_failing_raises_last_error(router):
+    _use(router, FakeProvider(error=RuntimeError("birincil")), FakeProvider(error=RuntimeError("ikincil")))
+
+    with pytest.raises(RuntimeError, match="ikincil"):
+        _collect(router)
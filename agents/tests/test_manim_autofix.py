@@ -0,0 +1,142 @@
+import ast
+
+import pytest
+
+from utils import manim_preflight
+from utils.manim_autofix import ManimAutoFixer, AutoFixRule, SPEECH_SERVICE_LINE
+
+
+@pytest.fixture(autouse=True)
+def no_export_tables(monkeypatch):
+    # Manim kurulu olsun olmasın isim çözümlemesi atlanır, sonuçlar deterministik kalır
+    monkeypatch.setattr(manim_preflight, "get_export_tables", lambda: None)
+
+
+HEADER = "from manim import *\n\n"
+
+# Kuralın giderdiği preflight sorun türü (aynı adda değilse)
+ISSUE_RULES = {"rename_solution_class": "solution_class", "missing_imports": "imports"}
+
+CASES = [
+    pytest.param(
+        "rename_solution_class",
+        HEADER + "class MySolution(Scene):\n    def construct(self):\n        self.wait()\n\nscene = MySolution()\n",
+        "AttributeError: module 'scene' has no attribute 'Solution'",
+        ["class Solution(Scene):", "scene = Solution()"],
+        ["MySolution"],
+        id="class-rename",
+    ),
+    pytest.param(
+        "deprecated_api",
+        HEADER + "class Solution(Scene):\n    def construct(self):\n"
+                 "        t = TextMobject('a')\n        self.play(ShowCreation(t))\n        g = ax.get_graph(f)\n",
+        "",
+        ["t = Text('a')", "self.play(Create(t))", "g = ax.plot(f)"],
+        ["TextMobject", "ShowCreation", "get_graph"],
+        id="deprecated-names",
+    ),
+    pytest.param(
+        "speech_service",
+        HEADER + "from manim_voiceover import VoiceoverScene\n\n"
+                 "class Solution(VoiceoverScene):\n    def construct(self):\n"
+                 "        with self.voiceover(text='Merhaba'):\n            self.wait()\n",
+        "",
+        ["    def construct(self):\n        " + SPEECH_SERVICE_LINE + "\n        with self.voiceover",
+         "from manim_voiceover.services.gtts import GTTSService"],
+        [],
+        id="speech-service",
+    ),
+    pytest.param(
+        "missing_imports",
+        "class Solution(Scene):\n    def construct(self):\n        self.wait()\n",
+        "NameError: name 'Scene' is not defined",
+        ["from manim import *\nclass Solution(Scene):"],
+        [],
+        id="imports",
+    ),
+    pytest.param(
+        "latex_raw_string",
+        HEADER + "class Solution(Scene):\n    def construct(self):\n        self.add(MathTex(\"\\frac{1}{2}\"))\n",
+        "",
+        ['MathTex(r"\\frac{1}{2}")'],
+        [],
+        id="raw-latex",
+    ),
+    pytest.param(
+        "font_size",
+        HEADER + "class Solution(Scene):\n    def construct(self):\n        self.add(Text('a', font_size=\"large\"))\n",
+        "",
+        ["font_size=48"],
+        ['"large"'],
+        id="font-size",
+    ),
+    pytest.param(
+        "solution_base",
+        HEADER + "class Solution(Scene):\n    def construct(self):\n"
+                 "        " + SPEECH_SERVICE_LINE + "\n"
+                 "        with self.voiceover(text='Merhaba'):\n            self.wait()\n",
+        "",
+        ["class Solution(VoiceoverScene):", "from manim_voiceover import VoiceoverScene"],
+        [],
+        id="solution-base",
+    ),
+]
+
+
+@pytest.mark.parametrize("rule_name, code, error, present, absent", CASES)
+def test_rule_fixes_code(rule_name, code, error, present, absent):
+    fixer = ManimAutoFixer()
+    result = fixer.fix(code, error)
+
+    assert result is not None
+    fixed, applied = result
+    assert rule_name in applied
+    ast.parse(fixed)
+    for text in present:
+        assert text in fixed
+    for text in absent:
+        assert text not in fixed
+    # Düzeltilen sorun türü preflight'ta artık görünmez
+    remaining = {issue["rule"] for issue in manim_preflight.preflight(fixed)}
+    assert ISSUE_RULES.get(rule_name, rule_name) not in remaining
+    assert fixer.stats()["rules"][rule_name]["applied"] == 1
+
+
+def test_fix_returns_none_when_no_rule_applies():
+    fixer = ManimAutoFixer()
+    code = HEADER + "class Solution(Scene):\n    def construct(self):\n        self.wait()\n"
+
+    assert fixer.fix(code, "RuntimeError: ffmpeg bulunamadı") is None
+    assert all(counts["applied"] == 0 for counts in fixer.stats()["rules"].values())
+
+
+def test_fix_returns_none_for_unparseable_code():
+    assert ManimAutoFixer().fix("class Solution(:\n", "SyntaxError") is None
+
+
+def test_loop_terminates_when_rule_keeps_producing_edits():
+    calls = []
+
+    def append_comment(source, tree, issues, error):
+        calls.append(1)
+        return [(len(source.code), len(source.code), "# düzeltildi\n")]
+
+    fixer = ManimAutoFixer(rules=[AutoFixRule("always", append_comment, error_patterns=("hata",))], max_passes=5)
+    fixed, applied = fixer.fix("x = 1\n", "hata")
+
+    # Uygulanan kural sonraki geçişlerde tekrar denenmez
+    assert applied == ["always"]
+    assert fixed == "x = 1\n# düzeltildi\n"
+    assert len(calls) == 1
+
+
+def test_rule_producing_invalid_code_is_skipped():
+    def break_code(source, tree, issues, error):
+        return [(0, 0, "(")]
+
+    fixer = ManimAutoFixer(rules=[AutoFixRule("broken", break_code, error_patterns=("hata",))])
+
+    assert fixer.fix("x = 1\n", "hata") is None
+    assert fixer.stats()["rules"]["broken"] == {
+        "triggered": 1, "applied": 0, "resolved": 0, "unresolved": 0, "hit_rate": 0.0
+    }
@@ -0,0 +1,134 @@
+import os
+import asyncio
+from email.utils import formatdate
+
+import pytest
+
+from utils.range_response import parse_range_header, RangeFileResponse
+
+SIZE = 1000
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", [(0, 99)]),
+    ("bytes=900-", [(900, 999)]),
+    ("bytes=-100", [(900, 999)]),
+    ("bytes=-5000", [(0, 999)]),
+    ("bytes=500-5000", [(500, 999)]),
+    ("bytes=0-99, 50-149", [(0, 149)]),
+    ("bytes=200-299,0-99,100-149", [(0, 149), (200, 299)]),
+    ("bytes=0-0,-1", [(0, 0), (999, 999)]),
+])
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, SIZE) == expected
+
+
+@pytest.mark.parametrize("header", ["items=0-10", "bytes=", "bytes=abc", "bytes=-", "bytes=50-10"])
+def test_invalid_range_header_serves_whole_file(header):
+    assert parse_range_header(header, SIZE) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=2000-3000", "bytes=-0"])
+def test_unsatisfiable_range_header(header):
+    assert parse_range_header(header, SIZE) == []
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / "video.mp4"
+    path.write_bytes(bytes(range(256)) * 4)  # 1024 bayt
+    return path
+
+
+def _serve(response, method="GET", extensions=None):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "extensions": extensions or {}}
+    asyncio.run(response(scope, None, send))
+
+    start = messages[0]
+    headers = {key.decode(): value.decode() for key, value in start["headers"]}
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], headers, body
+
+
+def test_whole_file_without_range(video):
+    status, headers, body = _serve(RangeFileResponse(video, {}))
+
+    assert status == 200
+    assert headers["accept-ranges"] == "bytes"
+    assert headers["content-length"] == "1024"
+    assert body == video.read_bytes()
+
+
+def test_single_range(video):
+    status, headers, body = _serve(RangeFileResponse(video, {"range": "bytes=100-199"}))
+
+    assert status == 206
+    assert headers["content-range"] == "bytes 100-199/1024"
+    assert headers["content-length"] == "100"
+    assert body == video.read_bytes()[100:200]
+
+
+def test_suffix_range(video):
+    status, headers, body = _serve(RangeFileResponse(video, {"range": "bytes=-24"}))
+
+    assert status == 206
+    assert headers["content-range"] == "bytes 1000-1023/1024"
+    assert body == video.read_bytes()[-24:]
+
+
+def test_unsatisfiable_range_returns_416(video):
+    status, headers, body = _serve(RangeFileResponse(video, {"range": "bytes=5000-"}))
+
+    assert status == 416
+    assert headers["content-range"] == "bytes */1024"
+    assert headers["content-length"] == "0"
+    assert body == b""
+
+
+def test_multipart_byteranges(video):
+    response = RangeFileResponse(video, {"range": "bytes=0-9,20-29,25-39"})
+    status, headers, body = _serve(response)
+    data = video.read_bytes()
+
+    assert status == 206
+    assert headers["content-type"].startswith(f"multipart/byteranges; boundary={response.boundary}")
+    assert int(headers["content-length"]) == len(body)
+    assert body == (
+        f"--{response.boundary}\r\nContent-Type: video/mp4\r\nContent-Range: bytes 0-9/1024\r\n\r\n".encode()
+        + data[0:10] + b"\r\n"
+        + f"--{response.boundary}\r\nContent-Type: video/mp4\r\nContent-Range: bytes 20-39/1024\r\n\r\n".encode()
+        + data[20:40] + b"\r\n"
+        + f"--{response.boundary}--\r\n".encode()
+    )
+
+
+def test_if_range_etag_mismatch_falls_back_to_200(video):
+    status, headers, body = _serve(RangeFileResponse(video, {"range": "bytes=0-9", "if-range": '"stale"'}))
+
+    assert status == 200
+    assert "content-range" not in headers
+    assert body == video.read_bytes()
+
+
+def test_if_range_matching_etag_and_date(video):
+    etag = RangeFileResponse(video, {}).headers["etag"]
+    assert _serve(RangeFileResponse(video, {"range": "bytes=0-9", "if-range": etag}))[0] == 206
+
+    modified = formatdate(os.stat(video).st_mtime, usegmt=True)
+    assert _serve(RangeFileResponse(video, {"range": "bytes=0-9", "if-range": modified}))[0] == 206
+
+    older = formatdate(os.stat(video).st_mtime - 3600, usegmt=True)
+    assert _serve(RangeFileResponse(video, {"range": "bytes=0-9", "if-range": older}))[0] == 200
+
+
+def test_head_sends_headers_only(video):
+    status, headers, body = _serve(RangeFileResponse(video, {"range": "bytes=0-9"}), method="HEAD")
+
+    assert status == 206
+    assert headers["content-length"] == "10"
+    assert body == b""
@@ -0,0 +1,96 @@
+import pytest
+
+from services.render_cache import RenderCache, normalize_code
+
+CODE = '''
+from manim import *
+
+class Solution(Scene):
+    def construct(self):
+        self.play(Write(Text("x = 2")))
+'''
+
+
+def test_normalize_code_ignores_formatting_and_comments():
+    reformatted = '''
+from manim import *
+# Çözüm sahnesi
+class Solution(Scene):
+
+    def construct(self):   # kurulum
+        self.play(
+            Write(Text("x = 2"))
+        )
+'''
+    assert normalize_code(CODE) == normalize_code(reformatted)
+
+
+def test_normalize_code_keeps_semantic_differences():
+    assert normalize_code(CODE) != normalize_code(CODE.replace("x = 2", "x = 3"))
+
+
+def test_normalize_code_falls_back_to_whitespace_for_invalid_code():
+    assert normalize_code("def broken(:\n    pass") == normalize_code("def   broken(:  pass")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RenderCache(cache_dir=tmp_path / "cache", max_bytes=10_000)
+
+
+def _video(directory, name, size=1000, sidecars=()):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.mp4"
+    path.write_bytes(b"v" * size)
+    for ext in sidecars:
+        path.with_suffix(ext).write_text("yan dosya")
+    return path
+
+
+def test_make_key_is_format_independent(cache):
+    assert cache.make_key(CODE) == cache.make_key(CODE.replace("\n", "\n\n"))
+    assert cache.make_key(CODE) != cache.make_key(CODE.replace("Write", "FadeIn"))
+
+
+def test_lookup_counts_hits_and_misses(cache, tmp_path):
+    target_dir = tmp_path / "final"
+    target_dir.mkdir()
+    key = cache.make_key(CODE)
+
+    assert cache.lookup(key, "first", target_dir) is None
+    cache.store(key, _video(tmp_path / "render", "scene", sidecars=[".srt"]))
+    hit = cache.lookup(key, "second", target_dir)
+
+    assert hit == target_dir / "second.mp4"
+    assert hit.read_bytes() == b"v" * 1000
+    assert (target_dir / "second.srt").exists()
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_missing_file_counts_as_miss_and_drops_entry(cache, tmp_path):
+    key = cache.make_key(CODE)
+    cache.store(key, _video(tmp_path / "render", "scene"))
+    (cache.cache_dir / f"{key}.mp4").unlink()
+
+    assert cache.lookup(key, "job", tmp_path) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used_over_limit(cache, tmp_path):
+    keys = [cache.make_key(CODE.replace("x = 2", f"x = {i}")) for i in range(3)]
+    target_dir = tmp_path / "final"
+    target_dir.mkdir()
+
+    cache.store(keys[0], _video(tmp_path / "render", "a", size=4000))
+    cache.store(keys[1], _video(tmp_path / "render", "b", size=4000))
+    # İlk kayıt kullanıldı; sınır aşılınca en uzun süre kullanılmayan (ikinci) silinmeli
+    assert cache.lookup(keys[0], "reused", target_dir)
+    cache.store(keys[2], _video(tmp_path / "render", "c", size=4000))
+
+    assert cache.lookup(keys[1], "evicted", target_dir) is None
+    assert not (cache.cache_dir / f"{keys[1]}.mp4").exists()
+    assert cache.lookup(keys[0], "kept", target_dir)
+    assert cache.lookup(keys[2], "newest", target_dir)
+    assert cache.stats()["entries"] == 2
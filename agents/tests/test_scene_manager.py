@@ -0,0 +1,55 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agents.scene_manager import SceneManager
+from services.logger import get_logger
+
+
+@pytest.fixture
+def manager():
+    # Grafik çalıştırma CodeAgent gerektirmez
+    manager = SceneManager.__new__(SceneManager)
+    manager.logger = get_logger("SceneManager")
+    return manager
+
+
+def test_dependent_nodes_receive_results(manager):
+    async def solve(results):
+        return "çözüm"
+
+    async def content(results):
+        return results["solution"] + " sahnesi"
+
+    graph = {"content": (["solution"], content), "solution": ([], solve)}
+
+    assert asyncio.run(manager.run_graph(graph)) == {"solution": "çözüm", "content": "çözüm sahnesi"}
+
+
+def test_failures_are_collected_and_pending_nodes_cancelled(manager):
+    cancelled = []
+
+    async def fail(results):
+        raise RuntimeError("ilk")
+
+    async def fail_too(results):
+        raise ValueError("ikinci")
+
+    async def slow(results):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    graph = {"a": ([], fail), "b": ([], fail_too), "slow": ([], slow), "after": (["a"], slow)}
+    errors = []
+    manager.logger = SimpleNamespace(info=lambda message: None, error=errors.append)
+
+    with pytest.raises(RuntimeError, match="ilk"):
+        asyncio.run(manager.run_graph(graph))
+
+    # Aynı anda biten iki hata da alınır, bekleyen düğüm iptal edilir
+    assert errors == ["Scene graph node failed: a: ilk", "Scene graph node failed: b: ikinci"]
+    assert cancelled == ["slow"]
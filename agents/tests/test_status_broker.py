@@ -0,0 +1,67 @@
+import asyncio
+
+from services.job_store import SQLiteJobStore
+from services.status_broker import StatusBroker, JobStoreFanout, status_event
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_local_broker_delivers_to_subscribers_and_drops_oldest():
+    async def scenario():
+        broker = StatusBroker(queue_size=2)
+        queue = broker.subscribe()
+        for i in range(3):
+            broker.publish({"request_id": "job", "status": "processing", "n": i})
+        events = [queue.get_nowait()["n"] for _ in range(queue.qsize())]
+        await broker.close()
+        return events
+
+    assert _run(scenario()) == [1, 2]
+
+
+def test_store_fanout_reaches_subscribers_of_other_workers(tmp_path):
+    path = tmp_path / "jobs.db"
+    # Yayınlayan işçi ve abone işçi aynı SQLite dosyasını ayrı bağlantılarla kullanır
+    publisher_store = SQLiteJobStore(path=path, ttl=3600)
+    subscriber_store = SQLiteJobStore(path=path, ttl=3600)
+
+    async def scenario():
+        publisher = StatusBroker(fanout=JobStoreFanout(publisher_store, interval=0.05))
+        subscriber = StatusBroker(fanout=JobStoreFanout(subscriber_store, interval=0.05))
+        queue = subscriber.subscribe()
+        await asyncio.sleep(0.1)
+
+        publisher_store.transition("job", "processing", "Başladı")
+        publisher.publish(status_event(publisher_store.get("job")))
+        first = await asyncio.wait_for(queue.get(), 2)
+
+        publisher_store.transition("job", "completed", "Hazır", "/videos/job.mp4")
+        publisher.publish(status_event(publisher_store.get("job")))
+        second = await asyncio.wait_for(queue.get(), 2)
+
+        # Örtüşen yoklama penceresi aynı geçişi tekrar iletmez
+        await asyncio.sleep(0.2)
+        assert queue.empty()
+
+        await publisher.close()
+        await subscriber.close()
+        return first, second
+
+    first, second = _run(scenario())
+    assert (first["request_id"], first["status"]) == ("job", "processing")
+    assert second["status"] == "completed"
+    assert second["video_urls"]["direct"] == "/videos/job.mp4"
+
+
+def test_list_updated_since_orders_and_filters(tmp_path):
+    store = SQLiteJobStore(path=tmp_path / "jobs.db", ttl=3600)
+    store.transition("a", "processing", "Başladı")
+    since = store.get("a")["updated_at"]
+    store.transition("b", "processing", "Başladı")
+    store.transition("a", "completed", "Hazır")
+
+    records = store.list_updated_since(since)
+    assert [record["request_id"] for record in records] == ["b", "a"]
+    assert records[-1]["status"] == "completed"
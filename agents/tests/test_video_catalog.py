@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from services.video_catalog import VideoCatalog
+
+METADATA = {
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080, "r_frame_rate": "60/1"},
+        {"codec_type": "audio", "codec_name": "aac"},
+    ],
+    "format": {"duration": "12.5"},
+}
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    catalog = VideoCatalog(path=tmp_path / "catalog.db")
+
+    async def probe(video_path):
+        return METADATA
+
+    monkeypatch.setattr(catalog, "probe", probe)
+    return catalog
+
+
+def _video(directory, name):
+    path = directory / f"{name}.mp4"
+    path.write_bytes(b"\0" * 1024)
+    return path
+
+
+def test_index_and_async_queries(catalog, tmp_path):
+    _video(tmp_path, "a")
+    (tmp_path / "a.srt").write_text("1")
+
+    async def scenario():
+        video = await catalog.index_video(tmp_path / "a.mp4")
+        listed, total = await catalog.alist(limit=10, has_audio=True)
+        stats = await catalog.astats()
+        await catalog.aremove("a")
+        return video, listed, total, stats, await catalog.aget("a")
+
+    video, listed, total, stats, removed = asyncio.run(scenario())
+    assert (video["duration"], video["related_files"], video["has_audio"]) == (12.5, ["srt"], True)
+    assert total == 1 and listed[0]["id"] == "a"
+    assert stats["by_location"] == {"final": 1}
+    assert stats["total_size_bytes"] == 1024
+    assert removed is None
+
+
+def test_reindex_removes_missing_files(catalog, tmp_path):
+    final_dir, old_dir = tmp_path / "final", tmp_path / "old"
+    final_dir.mkdir()
+    old_dir.mkdir()
+    _video(final_dir, "a")
+    _video(final_dir, "a_preview")
+    _video(old_dir, "b")
+
+    first = asyncio.run(catalog.reindex({"final": final_dir, "old": old_dir}))
+    (old_dir / "b.mp4").unlink()
+    second = asyncio.run(catalog.reindex({"final": final_dir, "old": old_dir}))
+
+    assert first == {"indexed": 2, "removed": 0}
+    assert second == {"indexed": 1, "removed": 1}
+    assert catalog.get("b") is None
+    assert catalog.get("a")["location"] == "final"
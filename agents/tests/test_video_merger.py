@@ -0,0 +1,98 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from services import video_merger as video_merger_module
+from services.video_merger import VideoMerger
+
+requires_ffmpeg = pytest.mark.skipif(
+    not (shutil.which("ffmpeg") and shutil.which("ffprobe")), reason="ffmpeg/ffprobe gerekli"
+)
+
+REFERENCE = {
+    "duration": 2.0,
+    "video": {
+        "codec_name": "h264", "profile": "High", "level": 31, "refs": 3, "has_b_frames": 2,
+        "width": 640, "height": 360, "pix_fmt": "yuv420p", "r_frame_rate": "24/1", "time_base": "1/12288",
+    },
+    "audio": {"codec_name": "aac", "sample_rate": "44100", "channels": 2},
+}
+
+
+def test_encode_args_pin_reference_sps_parameters():
+    args = VideoMerger()._encode_args(REFERENCE)
+
+    assert args[args.index('-profile:v') + 1] == 'high'
+    assert args[args.index('-level') + 1] == '3.1'
+    assert args[args.index('-x264-params') + 1] == 'ref=3:bframes=3'
+    assert args[args.index('-preset') + 1] == video_merger_module.X264_PRESET
+    assert args[args.index('-crf') + 1] == video_merger_module.X264_CRF
+    assert '-an' in args
+
+
+def test_encode_args_without_b_frames():
+    reference = {**REFERENCE, "video": {**REFERENCE["video"], "has_b_frames": 0, "profile": "Constrained Baseline"}}
+    args = VideoMerger()._encode_args(reference)
+
+    assert args[args.index('-profile:v') + 1] == 'baseline'
+    assert 'bframes=0' in args[args.index('-x264-params') + 1]
+
+
+def test_signature_detects_sps_differences():
+    merger = VideoMerger()
+    for field, value in (("level", 40), ("refs", 1), ("has_b_frames", 0)):
+        other = {**REFERENCE, "video": {**REFERENCE["video"], field: value}}
+        assert merger._signature(other) != merger._signature(REFERENCE)
+    # Ses izi ayrıca kodlandığı için ses farkı görüntü kopyalamayı engellemez
+    assert merger._signature({**REFERENCE, "audio": None}) == merger._signature(REFERENCE)
+
+
+def test_audio_graph_crossfades_and_fills_silent_clips():
+    silent = {**REFERENCE, "duration": 3.0, "audio": None}
+    inputs, graph = VideoMerger()._audio_graph([(Path("a.mp4"), REFERENCE), (Path("b.mp4"), silent)], 0.5)
+
+    assert inputs == [Path("a.mp4"), Path("b.mp4")]
+    assert "[1:a]" in graph and "[2:a]" not in graph
+    assert "anullsrc=r=44100:cl=stereo" in graph
+    assert "atrim=duration=3.000000" in graph
+    assert graph.endswith("[a0][a1]acrossfade=d=0.5:c1=tri:c2=tri[aout]")
+
+
+def test_audio_graph_without_audio_is_none():
+    assert VideoMerger()._audio_graph([(Path("a.mp4"), {**REFERENCE, "audio": None})], 0.5) is None
+
+
+def _synthetic_clip(path: Path, duration: float, frequency: int):
+    # Manim gibi libx264 varsayılanlarıyla; 0.5 sn'de bir anahtar kare
+    subprocess.run([
+        'ffmpeg', '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f'testsrc=size=320x240:rate=24:duration={duration}',
+        '-f', 'lavfi', '-i', f'sine=frequency={frequency}:sample_rate=44100:duration={duration}',
+        '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-g', '12',
+        '-c:a', 'aac', '-ac', '2', '-shortest', str(path)
+    ], check=True, capture_output=True)
+    return path
+
+
+@requires_ffmpeg
+@pytest.mark.parametrize("transition", [0.5, 0])
+def test_merge_two_clips(tmp_path, monkeypatch, transition):
+    monkeypatch.setattr(video_merger_module.settings, "temp_dir", tmp_path)
+    merger = VideoMerger()
+    first = _synthetic_clip(tmp_path / "first.mp4", 2.0, 440)
+    second = _synthetic_clip(tmp_path / "second.mp4", 3.0, 660)
+    reference = merger.probe_video(first)
+
+    output = merger.merge_videos([first, second], tmp_path / "merged.mp4", transition_duration=transition)
+    merged = merger.probe_video(output)
+
+    expected = reference["duration"] + merger.probe_video(second)["duration"] - transition
+    assert merged["duration"] == pytest.approx(expected, abs=0.1)
+    for field in ("codec_name", "profile", "level", "width", "height", "pix_fmt", "r_frame_rate"):
+        assert merged["video"][field] == reference["video"][field]
+    assert merged["audio"]["codec_name"] == "aac"
+    assert merged["audio"]["sample_rate"] == reference["audio"]["sample_rate"]
+    assert merged["audio"]["channels"] == 2
+    assert not list(tmp_path.glob("merge_*"))
@@ -1,4 +1,4 @@
-from .file_handler import FileHandler
+from .file_handler import FileHandler, FileTooLargeError
 from .validators import (
     validate_file_type,
     validate_manim_code,
@@ -8,6 +8,7 @@ from .validators import (
 
 __all__ = [
     "FileHandler",
+    "FileTooLargeError",
     "validate_file_type",
     "validate_manim_code",
     "validate_solution_format",
@@ -0,0 +1,117 @@
+import ast
+from typing import List, Optional
+
+# Kod henüz yarımken görülen, "bozuk" sayılmaması gereken hata mesajları
+INCOMPLETE_MARKERS = (
+    "was never closed",
+    "unterminated triple-quoted",
+    "unexpected EOF",
+    "expected 'except' or 'finally' block",
+)
+
+
+class CodeStreamError(ValueError):
+    """Akış sırasında üretilen kodun kesin olarak bozuk olduğu anlaşıldı"""
+
+    def __init__(self, message: str, lineno: Optional[int] = None):
+        super().__init__(message)
+        self.lineno = lineno
+
+
+class PythonBlockExtractor:
+    """
+    Akan LLM yanıtından ilk ```python bloğunu parça parça çıkarır.
+
+    Parçalar listede tutulur; çit işaretleri iki parça arasında bölünse de
+    doğru algılanır. ``CodeAgent._extract_python_code`` ile aynı kuralı
+    uygular: açılış çitinden sonraki ilk ``` bloğu kapatır.
+    """
+
+    OPEN_FENCE = "```python\n"
+    CLOSE_FENCE = "```"
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._code: List[str] = []
+        self._pending = ""
+        self.started = False
+        self.complete = False
+
+    @property
+    def text(self) -> str:
+        """Şimdiye kadar alınan yanıtın tamamı"""
+        return "".join(self._chunks)
+
+    @property
+    def code(self) -> str:
+        """Şimdiye kadar çıkarılan kod"""
+        return "".join(self._code)
+
+    def feed(self, chunk: str) -> str:
+        """Yeni parçayı işler, bloğa eklenen yeni kodu döndürür"""
+        self._chunks.append(chunk)
+        if self.complete:
+            return ""
+
+        buffer = self._pending + chunk
+        if not self.started:
+            index = buffer.find(self.OPEN_FENCE)
+            if index < 0:
+                # Çitin bir kısmı bir sonraki parçada gelebilir
+                self._pending = buffer[-(len(self.OPEN_FENCE) - 1):]
+                return ""
+            self.started = True
+            buffer = buffer[index + len(self.OPEN_FENCE):]
+
+        index = buffer.find(self.CLOSE_FENCE)
+        if index >= 0:
+            self.complete = True
+            self._pending = ""
+            new_code = buffer[:index]
+        else:
+            # Sondaki ` karakterleri kapanış çitinin başlangıcı olabilir
+            held = len(buffer) - len(buffer.rstrip("`"))
+            self._pending = buffer[len(buffer) - held:] if held else ""
+            new_code = buffer[:len(buffer) - held]
+
+        self._code.append(new_code)
+        return new_code
+
+
+class IncrementalSyntaxChecker:
+    """
+    Kod geldikçe tamamlanmış satırları periyodik olarak parse eder.
+
+    Yarım kalmış yapı (kapanmamış parantez, gövdesi gelmemiş blok vb.)
+    hata sayılmaz; yalnızca son satırdan önce görülen kesin sözdizimi
+    hatalarında ``CodeStreamError`` fırlatılır.
+    """
+
+    def __init__(self, check_every: int = 20):
+        self.check_every = check_every
+        self._code: List[str] = []
+        self._lines = 0
+        self._checked_lines = 0
+
+    def feed(self, code: str):
+        if not code:
+            return
+        self._code.append(code)
+        self._lines += code.count("\n")
+        if self._lines - self._checked_lines >= self.check_every:
+            self._check()
+
+    def _check(self):
+        self._checked_lines = self._lines
+        source = "".join(self._code)
+        # Yalnızca tamamlanmış satırlar
+        prefix = source[:source.rfind("\n") + 1]
+        try:
+            ast.parse(prefix)
+        except SyntaxError as e:
+            last_line = prefix.count("\n")
+            if any(marker in e.msg for marker in INCOMPLETE_MARKERS):
+                return
+            if e.lineno is None or e.lineno >= last_line:
+                return
+            raise CodeStreamError(f"Syntax error at line {e.lineno}: {e.msg}", e.lineno) from e
@@ -0,0 +1,41 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def connect_sqlite(path: Path) -> sqlite3.Connection:
+    """
+    WAL modunda, birden fazla süreçten paylaşılabilen SQLite bağlantısı açar.
+
+    Bağlantı autocommit modundadır; atomik işlemler için ``transaction``
+    yardımcı fonksiyonu kullanılmalıdır.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(
+        str(path),
+        timeout=30,
+        check_same_thread=False,
+        isolation_level=None
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection, lock: threading.Lock):
+    """Yazma kilidini baştan alan (BEGIN IMMEDIATE) atomik işlem bloğu"""
+    with lock:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
@@ -1,16 +1,20 @@
 import os
-import base64
+import asyncio
+import hashlib
 import shutil
 from pathlib import Path
 from typing import Dict, Any, Optional
 import aiofiles
 from PIL import Image
 import PyPDF2
-import io
 
 from config import settings
 from services.logger import get_logger
 
+class FileTooLargeError(ValueError):
+    """Yüklenen dosya boyut sınırını aştığında"""
+    pass
+
 class FileHandler:
     """Dosya işleme ve yönetim sınıfı"""
     
@@ -19,35 +23,60 @@ class FileHandler:
         self.allowed_image_types = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
         self.allowed_pdf_types = {'.pdf'}
         self.max_file_size = 50 * 1024 * 1024  # 50MB
+        self.chunk_size = 1024 * 1024  # 1MB
+        
+    async def save_upload(self, file, request_id: str) -> Dict[str, Any]:
+        """
+        Yüklenen dosyayı parça parça diske yazar.
+        
+        Boyut sınırı yazma sırasında uygulanır ve SHA-256 özeti aynı geçişte
+        hesaplanır; bellekte en fazla bir parça tutulur.
+        
+        Returns:
+            path, sha256 ve size alanlarını içeren sözlük
+        """
+        # Dosya adını güvenli hale getir
+        safe_filename = f"{request_id}_{Path(file.filename).name}"
+        file_path = settings.upload_dir / safe_filename
+        digest = hashlib.sha256()
+        size = 0
         
-    async def save_upload(self, file, request_id: str) -> Path:
-        """Yüklenen dosyayı kaydet"""
         try:
-            # Dosya adını güvenli hale getir
-            safe_filename = f"{request_id}_{file.filename}"
-            file_path = settings.upload_dir / safe_filename
-            
-            # Dosyayı kaydet
             async with aiofiles.open(file_path, 'wb') as f:
-                content = await file.read()
-                await f.write(content)
+                while True:
+                    chunk = await file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    
+                    size += len(chunk)
+                    if size > self.max_file_size:
+                        raise FileTooLargeError(
+                            f"Dosya boyutu sınırı aşıldı: {file.filename} "
+                            f"(max {self.max_file_size // (1024 * 1024)}MB)"
+                        )
+                    
+                    digest.update(chunk)
+                    await f.write(chunk)
             
-            self.logger.info(f"File saved: {file_path}")
-            return file_path
+            self.logger.info(f"File saved: {file_path} ({size} bytes)")
+            return {"path": file_path, "sha256": digest.hexdigest(), "size": size}
             
         except Exception as e:
+            # Yarım kalan dosyayı bırakma
+            file_path.unlink(missing_ok=True)
             self.logger.error(f"File save error: {str(e)}")
             raise
     
-    async def process_file(self, file_path: Path) -> Dict[str, Any]:
-        """Dosyayı işle ve base64'e dönüştür"""
+    async def process_file(self, upload: Dict[str, Any]) -> Dict[str, Any]:
+        """Kaydedilen dosyayı işle, LLM katmanına dosya yolu olarak verilecek eki döndür"""
         try:
+            file_path = Path(upload["path"])
             file_ext = file_path.suffix.lower()
             
             if file_ext in self.allowed_image_types:
-                return await self._process_image(file_path)
+                return await asyncio.to_thread(self._process_image, file_path)
             elif file_ext in self.allowed_pdf_types:
-                return await self._process_pdf(file_path)
+                return await asyncio.to_thread(self._process_pdf, file_path, upload)
             else:
                 raise ValueError(f"Unsupported file type: {file_ext}")
                 
@@ -55,7 +84,7 @@ class FileHandler:
             self.logger.error(f"File processing error: {str(e)}")
             raise
     
-    async def _process_image(self, file_path: Path) -> Dict[str, Any]:
+    def _process_image(self, file_path: Path) -> Dict[str, Any]:
         """Görsel dosyayı işle"""
         try:
             # Görseli aç ve optimize et
@@ -68,20 +97,23 @@ class FileHandler:
                 if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
                     img.thumbnail(max_size, Image.Resampling.LANCZOS)
                 
-                # Base64'e dönüştür
-                buffer = io.BytesIO()
-                img.save(buffer, format='JPEG', quality=85, optimize=True)
-                image_data = buffer.getvalue()
+                if img.mode not in ('RGB', 'L'):
+                    img = img.convert('RGB')
                 
-            image_b64 = base64.b64encode(image_data).decode('utf-8')
+                # Optimize edilmiş JPEG'i yüklemenin yanına yaz
+                output_path = file_path.with_name(f"{file_path.stem}_optimized.jpg")
+                img.save(output_path, format='JPEG', quality=85, optimize=True)
+                dimensions = img.size
             
             return {
                 "type": "image",
-                "data": image_b64,
+                "path": str(output_path),
+                "mime": "image/jpeg",
+                "sha256": self._file_digest(output_path),
                 "metadata": {
                     "filename": file_path.name,
-                    "size": len(image_data),
-                    "dimensions": img.size
+                    "size": output_path.stat().st_size,
+                    "dimensions": dimensions
                 }
             }
             
@@ -89,29 +121,26 @@ class FileHandler:
             self.logger.error(f"Image processing error: {str(e)}")
             raise
     
-    async def _process_pdf(self, file_path: Path) -> Dict[str, Any]:
+    def _process_pdf(self, file_path: Path, upload: Dict[str, Any]) -> Dict[str, Any]:
         """PDF dosyayı işle"""
         try:
-            with open(file_path, 'rb') as f:
-                pdf_data = f.read()
-                
-            # PDF bilgilerini oku
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_data))
+            # PdfReader dosyadan okur, içerik belleğe kopyalanmaz
+            pdf_reader = PyPDF2.PdfReader(str(file_path))
             num_pages = len(pdf_reader.pages)
             
             # İlk sayfadan metin çıkar
             first_page_text = ""
             if num_pages > 0:
-                first_page_text = pdf_reader.pages[0].extract_text()[:500]
-            
-            pdf_b64 = base64.b64encode(pdf_data).decode('utf-8')
+                first_page_text = (pdf_reader.pages[0].extract_text() or "")[:500]
             
             return {
                 "type": "pdf",
-                "data": pdf_b64,
+                "path": str(file_path),
+                "mime": "application/pdf",
+                "sha256": upload.get("sha256") or self._file_digest(file_path),
                 "metadata": {
                     "filename": file_path.name,
-                    "size": len(pdf_data),
+                    "size": upload.get("size") or file_path.stat().st_size,
                     "pages": num_pages,
                     "preview": first_page_text
                 }
@@ -121,6 +150,14 @@ class FileHandler:
             self.logger.error(f"PDF processing error: {str(e)}")
             raise
     
+    def _file_digest(self, file_path: Path) -> str:
+        """Dosyanın SHA-256 özetini parça parça hesapla"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
     def _fix_orientation(self, img: Image.Image) -> Image.Image:
         """EXIF verilerine göre görsel yönünü düzelt"""
         try:
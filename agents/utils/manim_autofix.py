@@ -0,0 +1,401 @@
+import io
+import re
+import ast
+import tokenize
+import threading
+from typing import Dict, Any, List, Optional, Set, Tuple, Callable
+
+from services.logger import get_logger
+from utils.manim_preflight import preflight, FALLBACK_SCENES, LATEX_ESCAPES
+
+# Kaynak üzerindeki düzenleme: (başlangıç indeksi, bitiş indeksi, yeni metin)
+Edit = Tuple[int, int, str]
+
+# Güncel karşılığı birebir olan eski Manim isimleri
+RENAMED_NAMES = {
+    "ShowCreation": "Create",
+    "ShowCreationThenDestruction": "ShowPassingFlash",
+    "ShowCreationThenFadeOut": "ShowPassingFlash",
+    "TextMobject": "Text",
+    "TexMobject": "MathTex",
+    "TexText": "Tex",
+    "OldTex": "MathTex",
+}
+RENAMED_METHODS = {
+    "get_graph": "plot",
+}
+
+# Tanımsız kaldığında eklenecek import satırları
+KNOWN_IMPORTS = {
+    "VoiceoverScene": "from manim_voiceover import VoiceoverScene",
+    "GTTSService": "from manim_voiceover.services.gtts import GTTSService",
+}
+
+# Metin nesneleri Write, diğer Mobject'ler Create ile oynatılır
+TEXT_MOBJECTS = {"Text", "MarkupText", "Paragraph", "Title", "MathTex", "Tex", "SingleStringMathTex"}
+FONT_SIZES = {"tiny": 20, "small": 24, "normal": 36, "medium": 36, "large": 48, "huge": 72}
+
+SPEECH_SERVICE_LINE = 'self.set_speech_service(GTTSService(lang="tr"))'
+
+
+class _Source:
+    """Kaynak metin ve AST konumlarını (UTF-8 bayt sütunları) metin indeksine çevirme"""
+
+    def __init__(self, code: str):
+        self.code = code
+        self.lines = code.splitlines(keepends=True)
+        self._starts = [0]
+        for line in self.lines:
+            self._starts.append(self._starts[-1] + len(line))
+
+    def index(self, lineno: int, col: int) -> int:
+        line = self.lines[lineno - 1] if lineno <= len(self.lines) else ""
+        return self._starts[lineno - 1] + len(line.encode("utf-8")[:col].decode("utf-8", errors="ignore"))
+
+    def span(self, item: Any) -> Tuple[int, int]:
+        """AST düğümü veya sorun kaydının kapsadığı metin aralığı"""
+        if isinstance(item, dict):
+            return self.index(item["line"], item["col"]), self.index(item["end_line"], item["end_col"])
+        return self.index(item.lineno, item.col_offset), self.index(item.end_lineno, item.end_col_offset)
+
+    def segment(self, item: Any) -> str:
+        start, end = self.span(item)
+        return self.code[start:end]
+
+    def apply(self, edits: List[Edit]) -> str:
+        """Çakışmayan düzenlemeleri sondan başa uygular"""
+        code = self.code
+        last_start = len(code) + 1
+        for start, end, text in sorted(set(edits), reverse=True):
+            if end > last_start:
+                continue
+            code = code[:start] + text + code[end:]
+            last_start = start
+        return code
+
+
+class AutoFixRule:
+    """Hata mesajı veya preflight sorunuyla tetiklenen deterministik düzeltme"""
+
+    def __init__(self,
+                 name: str,
+                 func: Callable[[_Source, ast.Module, List[Dict[str, Any]], str], List[Edit]],
+                 error_patterns: Tuple[str, ...] = (),
+                 issue_rules: Tuple[str, ...] = ()):
+        self.name = name
+        self.func = func
+        self.error_patterns = [re.compile(pattern) for pattern in error_patterns]
+        self.issue_rules = set(issue_rules)
+
+    def matches(self, error: str, issue_rules: Set[str]) -> bool:
+        return bool(self.issue_rules & issue_rules) or any(pattern.search(error) for pattern in self.error_patterns)
+
+
+RULES: List[AutoFixRule] = []
+
+
+def rule(name: str, error_patterns: Tuple[str, ...] = (), issue_rules: Tuple[str, ...] = ()):
+    """Kuralı kütüphaneye kaydeder; kurallar kayıt sırasıyla denenir"""
+    def decorator(func):
+        RULES.append(AutoFixRule(name, func, error_patterns, issue_rules))
+        return func
+    return decorator
+
+
+def _issues_for(issues: List[Dict[str, Any]], rule_name: str) -> List[Dict[str, Any]]:
+    return [issue for issue in issues if issue["rule"] == rule_name and issue.get("end_line")]
+
+
+def _string_tokens(segment: str) -> List[str]:
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(segment).readline)
+        return [token.string for token in tokens if token.type == tokenize.STRING]
+    except (tokenize.TokenError, SyntaxError):
+        return []
+
+
+def _solution_class(tree: ast.Module) -> Optional[ast.ClassDef]:
+    return next(
+        (node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == "Solution"),
+        None
+    )
+
+
+@rule("rename_solution_class",
+      error_patterns=(r"has no attribute 'Solution'", r"name 'Solution' is not defined"),
+      issue_rules=("solution_class",))
+def _rename_solution_class(source, tree, issues, error):
+    """Sahne sınıfı farklı adlandırılmışsa (MySolution vb.) Solution yap"""
+    if _solution_class(tree):
+        return []
+    candidates = [
+        node for node in tree.body
+        if isinstance(node, ast.ClassDef) and any(
+            isinstance(base, ast.Name) and (base.id in FALLBACK_SCENES or base.id.endswith("Scene"))
+            for base in node.bases
+        )
+    ]
+    if not candidates:
+        return []
+
+    old_name = candidates[-1].name
+    edits = []
+    header = re.compile(rf"class\s+{re.escape(old_name)}\b")
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef) and node.name == old_name:
+            line_start = source.index(node.lineno, 0)
+            match = header.search(source.code, line_start)
+            if match:
+                name_start = match.end() - len(old_name)
+                edits.append((name_start, match.end(), "Solution"))
+        elif isinstance(node, ast.Name) and node.id == old_name:
+            start, end = source.span(node)
+            edits.append((start, end, "Solution"))
+    return edits
+
+
+@rule("deprecated_api",
+      error_patterns=(
+          r"name '(%s)' is not defined" % "|".join(RENAMED_NAMES),
+          r"has no attribute '(%s)'" % "|".join(RENAMED_METHODS),
+      ),
+      issue_rules=("deprecated_api",))
+def _replace_deprecated_api(source, tree, issues, error):
+    """Eski isimleri ve metotları güncel karşılıklarıyla değiştir"""
+    edits = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in RENAMED_NAMES:
+            start, end = source.span(node)
+            edits.append((start, end, RENAMED_NAMES[node.id]))
+        elif isinstance(node, ast.Attribute) and node.attr in RENAMED_METHODS:
+            _, end = source.span(node)
+            edits.append((end - len(node.attr), end, RENAMED_METHODS[node.attr]))
+    return edits
+
+
+@rule("solution_base", issue_rules=("solution_base",))
+def _fix_solution_base(source, tree, issues, error):
+    """self.voiceover kullanan Solution'ı VoiceoverScene'den türet"""
+    solution = _solution_class(tree)
+    if solution is None:
+        return []
+    if solution.bases:
+        start, end = source.span(solution.bases[0])
+        return [(start, end, "VoiceoverScene")]
+    match = re.compile(r"class\s+Solution\s*(\(\s*\))?").search(source.code, source.index(solution.lineno, 0))
+    return [(match.start(), match.end(), "class Solution(VoiceoverScene)")] if match else []
+
+
+@rule("speech_service", issue_rules=("speech_service",))
+def _add_speech_service(source, tree, issues, error):
+    """construct başına seslendirme servisini ekle"""
+    solution = _solution_class(tree)
+    construct = next(
+        (node for node in (solution.body if solution else [])
+         if isinstance(node, ast.FunctionDef) and node.name == "construct"),
+        None
+    )
+    if construct is None or not construct.body:
+        return []
+    first = construct.body[0]
+    # Docstring varsa ondan sonra ekle
+    if isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant) and isinstance(first.value.value, str):
+        if len(construct.body) == 1:
+            return []
+        first = construct.body[1]
+    line = source.lines[first.lineno - 1]
+    indent = line[:len(line) - len(line.lstrip())]
+    position = source.index(first.lineno, 0)
+    return [(position, position, f"{indent}{SPEECH_SERVICE_LINE}\n")]
+
+
+# speech_service / solution_base düzeltmeleri yeni isimler kullanır, ardından import gerekebilir
+@rule("missing_imports",
+      error_patterns=(r"name '\w+' is not defined",),
+      issue_rules=("imports", "undefined_name", "speech_service", "solution_base"))
+def _add_missing_imports(source, tree, issues, error):
+    """Eksik manim / manim_voiceover importlarını ekle"""
+    star_imports = [
+        node.module for node in ast.walk(tree)
+        if isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names)
+    ]
+    bound = {
+        alias.asname or alias.name
+        for node in ast.walk(tree) if isinstance(node, ast.ImportFrom)
+        for alias in node.names
+    }
+    used = {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+
+    lines = []
+    if "manim" not in star_imports:
+        lines.append("from manim import *")
+    for name, import_line in KNOWN_IMPORTS.items():
+        if name in used and name not in bound:
+            lines.append(import_line)
+    if not lines:
+        return []
+
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    position = source.index(imports[-1].end_lineno + 1, 0) if imports else 0
+    if imports and imports[-1].end_lineno >= len(source.lines) and not source.code.endswith("\n"):
+        return [(len(source.code), len(source.code), "\n" + "\n".join(lines) + "\n")]
+    return [(position, position, "\n".join(lines) + "\n")]
+
+
+@rule("latex_raw_string", issue_rules=("latex_raw_string",))
+def _make_latex_raw(source, tree, issues, error):
+    """MathTex("\\frac..") gibi raw olmayan LaTeX metinlerini r"" yap"""
+    edits = []
+    for issue in _issues_for(issues, "latex_raw_string"):
+        start, end = source.span(issue)
+        segment = source.code[start:end]
+        # Önekli veya birleştirilmiş ("a" "b") literaller atlanır
+        if segment[:1] not in ("'", '"') or len(_string_tokens(segment)) != 1:
+            continue
+        try:
+            value = ast.literal_eval("r" + segment)
+        except (SyntaxError, ValueError):
+            continue
+        # Tek bir literal olmalı ve raw hali kontrol karakteri içermemeli
+        if not isinstance(value, str) or any(ch in LATEX_ESCAPES for ch in value):
+            continue
+        edits.append((start, start, "r"))
+    return edits
+
+
+@rule("play_mobject",
+      error_patterns=(r"Unexpected argument .* passed to Scene\.play",),
+      issue_rules=("play_mobject",))
+def _wrap_play_arguments(source, tree, issues, error):
+    """self.play(mobject) -> self.play(Create(mobject)) / Write(text)"""
+    edits = []
+    for issue in _issues_for(issues, "play_mobject"):
+        match = re.search(r"Mobject \((\w+)\)", issue["message"])
+        wrapper = "Write" if match and match.group(1) in TEXT_MOBJECTS else "Create"
+        start, end = source.span(issue)
+        edits.append((start, end, f"{wrapper}({source.code[start:end]})"))
+    return edits
+
+
+@rule("font_size",
+      error_patterns=(r"name '(%s)' is not defined" % "|".join(FONT_SIZES),),
+      issue_rules=("font_size",))
+def _fix_font_size(source, tree, issues, error):
+    """font_size="large" / font_size=large -> sayı"""
+    edits = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.keyword) or node.arg != "font_size":
+            continue
+        value = node.value
+        if isinstance(value, ast.Constant) and isinstance(value.value, str):
+            size = FONT_SIZES.get(value.value.strip().lower(), 36)
+        elif isinstance(value, ast.Name) and value.id in FONT_SIZES:
+            size = FONT_SIZES[value.id]
+        else:
+            continue
+        start, end = source.span(value)
+        edits.append((start, end, str(size)))
+    return edits
+
+
+class ManimAutoFixer:
+    """
+    Render/preflight hatalarını LLM'e gitmeden kurallarla düzeltir.
+
+    Her kural için tetiklenme, uygulanma ve sonrasında render'ın başarılı
+    olma sayıları tutulur.
+    """
+
+    def __init__(self, rules: Optional[List[AutoFixRule]] = None, max_passes: int = 3):
+        self.logger = get_logger("ManimAutoFixer")
+        self.rules = rules if rules is not None else RULES
+        self.max_passes = max_passes
+        self._lock = threading.Lock()
+        self._stats = {r.name: {"triggered": 0, "applied": 0, "resolved": 0, "unresolved": 0} for r in self.rules}
+        self._llm_fallbacks = 0
+
+    def fix(self,
+            code: str,
+            error: str,
+            issues: Optional[List[Dict[str, Any]]] = None) -> Optional[Tuple[str, List[str]]]:
+        """
+        Eşleşen kuralları sırayla uygular.
+
+        Returns:
+            (düzeltilmiş kod, uygulanan kurallar) veya hiçbir kural uygulanamadıysa None
+        """
+        applied: List[str] = []
+        # Bir kez görülen sorun türü sonraki geçişlerde de tetikleyici sayılır
+        seen_rules: Set[str] = set()
+        triggered: Set[str] = set()
+        for _ in range(self.max_passes):
+            try:
+                tree = ast.parse(code)
+            except SyntaxError:
+                break
+            # Konum bilgisi için sorunlar her geçişte güncel koddan yeniden üretilir
+            current_issues = preflight(code) if applied or issues is None else issues
+            seen_rules.update(issue["rule"] for issue in current_issues)
+            changed = False
+
+            for autofix_rule in self.rules:
+                if autofix_rule.name in applied or not autofix_rule.matches(error, seen_rules):
+                    continue
+                if autofix_rule.name not in triggered:
+                    triggered.add(autofix_rule.name)
+                    self._count(autofix_rule.name, "triggered")
+                source = _Source(code)
+                edits = autofix_rule.func(source, tree, current_issues, error)
+                if not edits:
+                    continue
+                new_code = source.apply(edits)
+                try:
+                    tree = ast.parse(new_code)
+                except SyntaxError:
+                    self.logger.warning(f"Autofix rule {autofix_rule.name} produced invalid code, skipped")
+                    continue
+                code = new_code
+                applied.append(autofix_rule.name)
+                self._count(autofix_rule.name, "applied")
+                current_issues = preflight(code)
+                seen_rules.update(issue["rule"] for issue in current_issues)
+                changed = True
+
+            if not changed:
+                break
+
+        if not applied:
+            return None
+        self.logger.info(f"Autofix applied rules: {', '.join(applied)}")
+        return code, applied
+
+    def record_outcome(self, rules: List[str], success: bool):
+        """Uygulanan kuralların ardından render'ın sonucunu kaydeder"""
+        for name in set(rules):
+            self._count(name, "resolved" if success else "unresolved")
+
+    def record_llm_fallback(self):
+        with self._lock:
+            self._llm_fallbacks += 1
+
+    def _count(self, name: str, field: str):
+        with self._lock:
+            self._stats[name][field] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rules = {name: dict(counts) for name, counts in self._stats.items()}
+            llm_fallbacks = self._llm_fallbacks
+        for counts in rules.values():
+            counts["hit_rate"] = round(counts["applied"] / counts["triggered"], 3) if counts["triggered"] else 0.0
+        return {"rules": rules, "llm_fallbacks": llm_fallbacks}
+
+# Global instance
+_autofixer = None
+
+def get_autofixer() -> ManimAutoFixer:
+    """Singleton Manim autofixer instance"""
+    global _autofixer
+    if _autofixer is None:
+        _autofixer = ManimAutoFixer()
+    return _autofixer
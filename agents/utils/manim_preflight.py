@@ -0,0 +1,403 @@
+import ast
+import sys
+import json
+import builtins
+import subprocess
+import threading
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from services.logger import get_logger
+
+logger = get_logger("ManimPreflight")
+
+# Export tabloları okunan modüller (render ortamındaki gerçek paketler)
+EXPORT_MODULES = ("manim", "manim_voiceover", "manim_voiceover.services.gtts")
+
+# Eski Manim sürümlerinden kalan ve LLM'in sık ürettiği isimler
+DEPRECATED_NAMES = {
+    "ShowCreation": "Create",
+    "ShowCreationThenDestruction": "ShowPassingFlash",
+    "ShowCreationThenFadeOut": "ShowPassingFlash",
+    "TextMobject": "Text",
+    "TexMobject": "MathTex",
+    "TexText": "Tex",
+    "OldTex": "MathTex",
+    "GraphScene": "Axes ile Scene",
+    "FadeInFrom": "FadeIn(shift=...)",
+    "FadeOutAndShift": "FadeOut(shift=...)",
+}
+DEPRECATED_METHODS = {
+    "get_graph": "plot",
+}
+
+# LaTeX alan sınıfları; r"" olmadan yazılan \frac, \theta vb. kontrol karakterine dönüşür
+LATEX_CLASSES = {"MathTex", "Tex", "SingleStringMathTex", "MathTable"}
+LATEX_ESCAPES = {"\a": r"\a", "\b": r"\b", "\f": r"\f", "\t": r"\t", "\n": r"\n", "\r": r"\r", "\v": r"\v"}
+
+# Manim içe aktarılamazsa kullanılan asgari bilgi
+FALLBACK_SCENES = {"Scene", "VoiceoverScene", "MovingCameraScene", "ThreeDScene", "ZoomedScene"}
+
+_EXPORTS_SCRIPT = """
+import json, importlib, inspect
+result = {"modules": {}, "mobjects": [], "animations": [], "scenes": []}
+for name in %r:
+    module = importlib.import_module(name)
+    exports = getattr(module, "__all__", None) or [n for n in dir(module) if not n.startswith("_")]
+    result["modules"][name] = sorted(exports)
+from manim import Mobject, Animation, Scene
+from manim_voiceover import VoiceoverScene
+for name in result["modules"]["manim"] + ["VoiceoverScene"]:
+    obj = VoiceoverScene if name == "VoiceoverScene" else getattr(importlib.import_module("manim"), name, None)
+    if inspect.isclass(obj):
+        if issubclass(obj, Scene):
+            result["scenes"].append(name)
+        elif issubclass(obj, Animation):
+            result["animations"].append(name)
+        elif issubclass(obj, Mobject):
+            result["mobjects"].append(name)
+print(json.dumps(result))
+""" % (EXPORT_MODULES,)
+
+_export_tables: Optional[Dict[str, Any]] = None
+_export_lock = threading.Lock()
+_export_loaded = False
+
+
+def get_export_tables() -> Optional[Dict[str, Any]]:
+    """
+    manim/manim_voiceover export tablolarını bir kez, ayrı bir süreçte okur.
+
+    API süreci manim'i import etmez; paketler kurulu değilse None döner ve
+    isim çözümlemesi atlanır.
+    """
+    global _export_tables, _export_loaded
+    with _export_lock:
+        if not _export_loaded:
+            _export_loaded = True
+            try:
+                output = subprocess.run(
+                    [sys.executable, "-c", _EXPORTS_SCRIPT],
+                    capture_output=True, text=True, timeout=120, check=True
+                ).stdout
+                tables = json.loads(output)
+                _export_tables = {
+                    "modules": {name: set(names) for name, names in tables["modules"].items()},
+                    "mobjects": set(tables["mobjects"]),
+                    "animations": set(tables["animations"]),
+                    "scenes": set(tables["scenes"]),
+                }
+            except subprocess.CalledProcessError as e:
+                reason = (e.stderr or "").strip().splitlines()[-1:] or [f"exit status {e.returncode}"]
+                logger.warning(f"Manim export tables unavailable, name resolution disabled: {reason[0]}")
+            except Exception as e:
+                logger.warning(f"Manim export tables unavailable, name resolution disabled: {e}")
+        return _export_tables
+
+
+class PreflightError(ValueError):
+    """Render öncesi statik analizde bulunan (severity=error) sorunlar"""
+
+    def __init__(self, issues: List[Dict[str, Any]]):
+        self.issues = issues
+        super().__init__(format_issues(issues))
+
+
+def format_issues(issues: List[Dict[str, Any]]) -> str:
+    """Sorunları düzeltme prompt'una uygun, satır numaralı metne çevirir"""
+    return "\n".join(
+        f"Line {issue['line']}: [{issue['rule']}] {issue['message']}" if issue.get("line")
+        else f"[{issue['rule']}] {issue['message']}"
+        for issue in issues
+    )
+
+
+def _issue(rule: str, message: str, node: Optional[ast.AST] = None, severity: str = "error") -> Dict[str, Any]:
+    """Sorun kaydı; konum alanları otomatik düzeltme kurallarının kaynak üzerinde yama yapması içindir"""
+    return {
+        "rule": rule,
+        "message": message,
+        "line": getattr(node, "lineno", None),
+        "col": getattr(node, "col_offset", None),
+        "end_line": getattr(node, "end_lineno", None),
+        "end_col": getattr(node, "end_col_offset", None),
+        "severity": severity,
+    }
+
+
+def _call_name(node: ast.AST) -> Optional[str]:
+    """Çağrılan fonksiyonun/sınıfın basit adı (Text(...) -> Text)"""
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _is_self_call(node: ast.Call, method: str) -> bool:
+    return (
+        isinstance(node.func, ast.Attribute)
+        and node.func.attr == method
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "self"
+    )
+
+
+class _BindingCollector(ast.NodeVisitor):
+    """Modülde herhangi bir yerde tanımlanan isimler (akıştan bağımsız)"""
+
+    def __init__(self):
+        self.bound: Set[str] = set()
+        self.star_imports: List[str] = []
+        self.imported: Dict[str, str] = {}
+        self.assignments: Dict[str, List[Tuple[int, Optional[str]]]] = {}
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.bound.add((alias.asname or alias.name).split(".")[0])
+
+    def visit_ImportFrom(self, node):
+        for alias in node.names:
+            if alias.name == "*":
+                self.star_imports.append(node.module)
+            else:
+                self.bound.add(alias.asname or alias.name)
+                self.imported[alias.name] = node.module
+
+    def visit_Name(self, node):
+        if isinstance(node.ctx, (ast.Store, ast.Del)):
+            self.bound.add(node.id)
+
+    def visit_Assign(self, node):
+        # self.play(x) kontrolü için x = Text(...) atamalarını satırıyla hatırla
+        callee = _call_name(node.value) if isinstance(node.value, ast.Call) else None
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self.assignments.setdefault(target.id, []).append((node.lineno, callee))
+        self.generic_visit(node)
+
+    def callee_before(self, name: str, lineno: int) -> Optional[str]:
+        """İsmin verilen satırdan önceki son atamasındaki çağrı adı"""
+        previous = [callee for line, callee in self.assignments.get(name, []) if line < lineno]
+        return previous[-1] if previous else None
+
+    def _visit_function(self, node):
+        self.bound.add(node.name)
+        args = node.args
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None:
+                self.bound.add(arg.arg)
+        self.generic_visit(node)
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_Lambda(self, node):
+        args = node.args
+        for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+            if arg is not None:
+                self.bound.add(arg.arg)
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node):
+        self.bound.add(node.name)
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node):
+        if node.name:
+            self.bound.add(node.name)
+        self.generic_visit(node)
+
+    def visit_MatchAs(self, node):
+        if node.name:
+            self.bound.add(node.name)
+        self.generic_visit(node)
+
+    visit_MatchStar = visit_MatchAs
+
+    def visit_Global(self, node):
+        self.bound.update(node.names)
+
+    visit_Nonlocal = visit_Global
+
+
+def preflight(code: str) -> List[Dict[str, Any]]:
+    """
+    Üretilen Manim kodunu render etmeden statik olarak denetler.
+
+    Returns:
+        Sorun listesi ({"rule", "message", "line", "severity", ...}); severity
+        "error" olan sorun yoksa kod render edilebilir
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        issue = _issue("syntax", f"SyntaxError: {e.msg}")
+        issue["line"] = e.lineno
+        return [issue]
+
+    issues: List[Dict[str, Any]] = []
+    bindings = _BindingCollector()
+    bindings.visit(tree)
+    tables = get_export_tables()
+
+    # İsim çözümleme: builtins + tanımlı isimler + yıldızlı importların gerçek export'ları
+    known = set(dir(builtins)) | bindings.bound | {"__name__", "__file__"}
+    resolvable = tables is not None
+    for module in bindings.star_imports:
+        if tables and module in tables["modules"]:
+            known |= tables["modules"][module]
+        else:
+            resolvable = False
+
+    if not any(module == "manim" for module in bindings.star_imports) and "manim" not in bindings.bound:
+        issues.append(_issue("imports", "'from manim import *' eksik"))
+
+    if tables:
+        for name, module in bindings.imported.items():
+            if module in tables["modules"] and name not in tables["modules"][module]:
+                issues.append(_issue("imports", f"ImportError: cannot import name '{name}' from '{module}'"))
+
+    reported: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            if node.id in DEPRECATED_NAMES and node.id not in bindings.bound and node.id not in reported:
+                reported.add(node.id)
+                issues.append(_issue(
+                    "deprecated_api",
+                    f"'{node.id}' güncel Manim'de yok, yerine {DEPRECATED_NAMES[node.id]} kullanılmalı",
+                    node
+                ))
+            elif resolvable and node.id not in known and node.id not in reported:
+                reported.add(node.id)
+                issues.append(_issue("undefined_name", f"NameError: name '{node.id}' is not defined", node))
+
+        elif isinstance(node, ast.Attribute) and node.attr in DEPRECATED_METHODS and isinstance(node.ctx, ast.Load):
+            issues.append(_issue(
+                "deprecated_api",
+                f"'.{node.attr}()' güncel Manim'de yok, yerine '{DEPRECATED_METHODS[node.attr]}' kullanılmalı",
+                node
+            ))
+
+        elif isinstance(node, ast.Call):
+            issues.extend(_check_call(node, bindings, tables))
+
+    issues.extend(_check_solution_class(tree, bindings, tables))
+    issues.sort(key=lambda issue: issue["line"] or 0)
+    return issues
+
+
+def _check_call(node: ast.Call, bindings: _BindingCollector, tables: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Bilinen hatalı API kullanımları (bkz. prompts/error_prompt.py)"""
+    issues = []
+    name = _call_name(node)
+
+    if _is_self_call(node, "play"):
+        mobjects = tables["mobjects"] if tables else set()
+        for arg in node.args:
+            if isinstance(arg, ast.Starred):
+                continue
+            callee = _call_name(arg) if isinstance(arg, ast.Call) else None
+            if isinstance(arg, ast.Name):
+                callee = bindings.callee_before(arg.id, arg.lineno)
+            if callee and callee in mobjects:
+                issues.append(_issue(
+                    "play_mobject",
+                    f"self.play() Animation bekler, Mobject ({callee}) verilmiş; "
+                    f"Create/Write/FadeIn ile sarmalanmalı",
+                    arg
+                ))
+
+    elif _is_self_call(node, "voiceover") and node.args:
+        issues.append(_issue(
+            "voiceover_args",
+            "self.voiceover() metni keyword olarak almalı: self.voiceover(text=...)",
+            node,
+            severity="warning"
+        ))
+
+    elif name in LATEX_CLASSES:
+        for arg in node.args:
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                escapes = sorted({LATEX_ESCAPES[ch] for ch in arg.value if ch in LATEX_ESCAPES})
+                if escapes:
+                    issues.append(_issue(
+                        "latex_raw_string",
+                        f"{name} metni raw string değil ({', '.join(escapes)} kontrol karakterine dönüştü); r\"...\" kullanılmalı",
+                        arg
+                    ))
+
+    for keyword in node.keywords:
+        if keyword.arg == "font_size" and isinstance(keyword.value, ast.Constant) \
+                and not isinstance(keyword.value.value, (int, float)):
+            issues.append(_issue("font_size", "font_size sayı olmalı (ör. font_size=48)", keyword.value))
+
+    return issues
+
+
+def _check_solution_class(tree: ast.Module, bindings: _BindingCollector, tables: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Solution sınıfı, taban sınıfı ve construct imzası"""
+    solution = next(
+        (node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == "Solution"),
+        None
+    )
+    if solution is None:
+        return [_issue("solution_class", "Modül seviyesinde 'Solution' sınıfı tanımlı değil")]
+
+    issues = []
+    scenes = tables["scenes"] if tables else FALLBACK_SCENES
+    base_names = [_call_name(base) for base in solution.bases]
+    if not any(base in scenes for base in base_names):
+        issues.append(_issue(
+            "solution_base",
+            f"Solution bir Scene alt sınıfından türemeli (VoiceoverScene), bulunan: {base_names or 'yok'}",
+            solution
+        ))
+
+    construct = next(
+        (node for node in solution.body
+         if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "construct"),
+        None
+    )
+    if construct is None:
+        issues.append(_issue("construct", "Solution.construct(self) metodu tanımlı değil", solution))
+        return issues
+
+    args = construct.args
+    if isinstance(construct, ast.AsyncFunctionDef):
+        issues.append(_issue("construct", "construct async olmamalı", construct))
+    if len(args.posonlyargs + args.args) != 1 or args.vararg or args.kwonlyargs or args.kwarg:
+        issues.append(_issue("construct", "construct imzası 'def construct(self)' olmalı", construct))
+
+    # VoiceoverScene'de seslendirme servisi voiceover çağrılarından önce ayarlanmalı
+    uses_voiceover = any(
+        isinstance(node, ast.Call) and _is_self_call(node, "voiceover") for node in ast.walk(construct)
+    )
+    sets_service = any(
+        isinstance(node, ast.Call) and _is_self_call(node, "set_speech_service") for node in ast.walk(solution)
+    )
+    if uses_voiceover and not sets_service:
+        issues.append(_issue(
+            "speech_service",
+            "self.voiceover kullanılıyor ama self.set_speech_service(GTTSService(...)) çağrılmamış",
+            construct
+        ))
+    if uses_voiceover and "VoiceoverScene" not in base_names:
+        issues.append(_issue("solution_base", "self.voiceover için Solution VoiceoverScene'den türemeli", solution))
+
+    return issues
+
+
+def ensure_renderable(code: str) -> List[Dict[str, Any]]:
+    """
+    Hata seviyesindeki sorunlarda ``PreflightError`` fırlatır.
+
+    Returns:
+        Uyarılar (render'ı engellemez)
+    """
+    issues = preflight(code)
+    errors = [issue for issue in issues if issue["severity"] == "error"]
+    if errors:
+        raise PreflightError(errors)
+    return [issue for issue in issues if issue["severity"] != "error"]
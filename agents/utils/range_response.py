@@ -0,0 +1,204 @@
+import os
+import re
+import asyncio
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import List, Optional, Tuple, Mapping
+
+from starlette.responses import Response
+
+_RANGE_SPEC = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+
+
+def parse_range_header(header: str, file_size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    ``Range: bytes=...`` başlığını kapsayıcı (start, end) aralıklarına çevirir.
+
+    Returns:
+        None: başlık geçersiz (tüm dosya gönderilmeli)
+        []: hiçbir aralık karşılanamıyor (416)
+        Aksi halde sıralanmış ve birleştirilmiş aralıklar
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+
+    ranges = []
+    for spec in specs.split(","):
+        match = _RANGE_SPEC.match(spec)
+        if not match or match.groups() == ("", ""):
+            return None
+        first, last = match.groups()
+
+        if first == "":
+            # Son N bayt
+            length = int(last)
+            if length == 0:
+                continue
+            start, end = max(file_size - length, 0), file_size - 1
+        else:
+            start = int(first)
+            end = min(int(last), file_size - 1) if last else file_size - 1
+            if last and int(last) < start:
+                return None
+            if start >= file_size:
+                continue
+        ranges.append((start, end))
+
+    # Çakışan/bitişik aralıkları birleştir
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RangeFileResponse(Response):
+    """
+    HTTP Range destekli dosya yanıtı.
+
+    Tek ve çoklu aralık (multipart/byteranges), If-Range, 206 ve 416
+    yanıtlarını destekler. Sunucu ASGI ``http.response.zerocopysend`` veya
+    ``http.response.pathsend`` uzantılarını sunuyorsa dosya çekirdek
+    üzerinden gönderilir; aksi halde ``os.pread`` ile parça parça okunur.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(self,
+                 path: Path,
+                 request_headers: Mapping[str, str],
+                 media_type: str = "video/mp4",
+                 filename: Optional[str] = None,
+                 headers: Optional[Mapping[str, str]] = None):
+        self.path = Path(path)
+        self.background = None
+
+        stat = os.stat(self.path)
+        self.file_size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        response_headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "last-modified": last_modified,
+        }
+        if filename:
+            response_headers["content-disposition"] = f'attachment; filename="{filename}"'
+        response_headers.update(headers or {})
+
+        self.ranges: Optional[List[Tuple[int, int]]] = None
+        self.boundary: Optional[str] = None
+        self.part_media_type = media_type
+
+        range_header = request_headers.get("range")
+        if range_header and self._if_range_matches(request_headers.get("if-range"), etag, stat.st_mtime):
+            self.ranges = parse_range_header(range_header, self.file_size)
+
+        if self.ranges is None:
+            self.status_code = 200
+            response_headers["content-length"] = str(self.file_size)
+        elif not self.ranges:
+            self.status_code = 416
+            response_headers["content-range"] = f"bytes */{self.file_size}"
+            response_headers["content-length"] = "0"
+        elif len(self.ranges) == 1:
+            start, end = self.ranges[0]
+            self.status_code = 206
+            response_headers["content-range"] = f"bytes {start}-{end}/{self.file_size}"
+            response_headers["content-length"] = str(end - start + 1)
+        else:
+            self.status_code = 206
+            self.boundary = secrets.token_hex(16)
+            media_type = f"multipart/byteranges; boundary={self.boundary}"
+            response_headers["content-length"] = str(self._multipart_length())
+
+        self.media_type = media_type
+        self.init_headers(response_headers)
+
+    @staticmethod
+    def _if_range_matches(if_range: Optional[str], etag: str, mtime: float) -> bool:
+        """If-Range yoksa veya dosya değişmediyse aralık isteği geçerlidir"""
+        if not if_range:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith(('"', 'W/')):
+            return if_range == etag
+        try:
+            return int(parsedate_to_datetime(if_range).timestamp()) >= int(mtime)
+        except (TypeError, ValueError):
+            return False
+
+    def _part_header(self, start: int, end: int) -> bytes:
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {self.part_media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{self.file_size}\r\n\r\n"
+        ).encode("latin-1")
+
+    def _multipart_trailer(self) -> bytes:
+        return f"--{self.boundary}--\r\n".encode("latin-1")
+
+    def _multipart_length(self) -> int:
+        length = len(self._multipart_trailer())
+        for start, end in self.ranges:
+            # Her parçadan sonra CRLF gelir
+            length += len(self._part_header(start, end)) + (end - start + 1) + 2
+        return length
+
+    async def __call__(self, scope, receive, send):
+        extensions = scope.get("extensions") or {}
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+
+        if self.status_code == 416 or scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if self.ranges is None and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return
+
+        zerocopy = "http.response.zerocopysend" in extensions
+        with open(self.path, "rb") as file:
+            if self.ranges is None:
+                await self._send_range(send, file, 0, self.file_size, zerocopy)
+            elif self.boundary is None:
+                start, end = self.ranges[0]
+                await self._send_range(send, file, start, end - start + 1, zerocopy)
+            else:
+                for start, end in self.ranges:
+                    await send({"type": "http.response.body", "body": self._part_header(start, end), "more_body": True})
+                    await self._send_range(send, file, start, end - start + 1, zerocopy)
+                    await send({"type": "http.response.body", "body": b"\r\n", "more_body": True})
+                await send({"type": "http.response.body", "body": self._multipart_trailer(), "more_body": True})
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _send_range(self, send, file, offset: int, count: int, zerocopy: bool):
+        """Dosyanın [offset, offset + count) bölümünü gönder"""
+        if zerocopy:
+            await send({
+                "type": "http.response.zerocopysend",
+                "file": file,
+                "offset": offset,
+                "count": count,
+                "more_body": True,
+            })
+            return
+
+        fd = file.fileno()
+        while count > 0:
+            chunk = await asyncio.to_thread(os.pread, fd, min(self.chunk_size, count), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            count -= len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
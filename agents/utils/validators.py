@@ -15,7 +15,7 @@ def validate_file_type(filename: str) -> bool:
     return file_ext in allowed_extensions
 
 def validate_manim_code(code: str) -> bool:
-    """Manim kodunun geçerli olup olmadığını kontrol eder - Geliştirilmiş versiyon"""
+    """Manim kodunun geçerli olup olmadığını kontrol eder (tüm kontroller zorunlu)"""
     if not code or not code.strip():
         return False
     
@@ -57,12 +57,8 @@ def validate_manim_code(code: str) -> bool:
         # İlk 500 karakteri göster
         print(f"Code preview: {code[:500]}...")
     
-    # En az 4/5 kontrolden geçmeli (syntax hariç)
-    essential_checks = ["imports", "class_definition", "construct_method", "min_length"]
-    passed_essential = sum(1 for check, result in validation_results 
-                          if check in essential_checks and result)
-    
-    return passed_essential >= 3  # 4'ten en az 3'ü geçmeli
+    # Tüm kontrollerden geçmeli; eksik kod render'a ulaşmadan yeniden üretilir
+    return not failed_checks
 
 def check_python_syntax(code: str) -> bool:
     """Python syntax kontrolü - import hatalarını yok say"""
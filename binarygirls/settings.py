@@ -58,11 +58,44 @@ TEMPLATES = [
 WSGI_APPLICATION = 'binarygirls.wsgi.application'
 
 # Database
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Veritabanı profili: DB_ENGINE=sqlite (varsayılan) veya postgres (DOCKER_SETUP.md)
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('POSTGRES_DB', default='binarygirls'),
+            'USER': config('POSTGRES_USER', default='binarygirls'),
+            'PASSWORD': config('POSTGRES_PASSWORD', default=''),
+            'HOST': config('POSTGRES_HOST', default='localhost'),
+            'PORT': config('POSTGRES_PORT', default='5432'),
+            # Kalıcı bağlantılar: her istekte yeniden bağlanılmaz, kopan bağlantı kullanılmadan önce yoklanır
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': config('POSTGRES_CONNECT_TIMEOUT', default=5, cast=int),
+            },
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('SQLITE_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': {
+                # Kilitli veritabanında hata vermeden önce beklenecek süre (saniye)
+                'timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),
+            },
+        }
+    }
+
+# Her SQLite bağlantısında uygulanan PRAGMA'lar (core/signals.py): WAL ile okuyucular
+# yazanı beklemez, synchronous=NORMAL WAL modunda her commit'te fsync yapmaz
+SQLITE_PRAGMAS = {
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='WAL'),
+    'synchronous': config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+    'temp_store': 'MEMORY',
 }
 
 # Password validation
@@ -99,6 +132,10 @@ LOGOUT_REDIRECT_URL = '/member/login/'
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 GEMINI_API_KEY = config('GEMINI_API_KEY', default='')
+# Model sağlık kontrolü (saniye) ve devre kesici ayarları
+GEMINI_HEALTH_REFRESH_INTERVAL = config('GEMINI_HEALTH_REFRESH_INTERVAL', default=300, cast=int)
+GEMINI_BREAKER_THRESHOLD = config('GEMINI_BREAKER_THRESHOLD', default=2, cast=int)
+GEMINI_BREAKER_RESET_TIMEOUT = config('GEMINI_BREAKER_RESET_TIMEOUT', default=60, cast=int)
 
 LOG_DIR = BASE_DIR / 'logs'
 if not os.path.exists(LOG_DIR):
@@ -160,3 +197,22 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:8000",
 ]
 VIDEO_API_BASE_URL = config('VIDEO_API_BASE_URL', default='http://localhost:8001')
+# Video servisi istemcisi: zaman aşımları (saniye), bağlantı havuzu ve devre kesici
+VIDEO_API_CONNECT_TIMEOUT = config('VIDEO_API_CONNECT_TIMEOUT', default=3.05, cast=float)
+VIDEO_API_READ_TIMEOUT = config('VIDEO_API_READ_TIMEOUT', default=30, cast=float)
+VIDEO_API_MAX_RETRIES = config('VIDEO_API_MAX_RETRIES', default=2, cast=int)
+VIDEO_API_POOL_SIZE = config('VIDEO_API_POOL_SIZE', default=20, cast=int)
+VIDEO_API_BREAKER_THRESHOLD = config('VIDEO_API_BREAKER_THRESHOLD', default=5, cast=int)
+VIDEO_API_BREAKER_RESET_TIMEOUT = config('VIDEO_API_BREAKER_RESET_TIMEOUT', default=30, cast=int)
+# Video servisi durum geçişlerini bu adrese imzalı olarak POST eder
+VIDEO_WEBHOOK_URL = config('VIDEO_WEBHOOK_URL', default='http://localhost:8000/core/video/webhook/')
+VIDEO_WEBHOOK_SECRET = config('VIDEO_WEBHOOK_SECRET', default='')
+# Bu süreden uzun processing kalan videolar sync_chat_videos komutuyla uzlaştırılır
+VIDEO_STATUS_STALE_MINUTES = config('VIDEO_STATUS_STALE_MINUTES', default=10, cast=int)
+# Sohbet geçmişi dışa aktarımı: oturum grup boyutu, arka plan dosyalarının dizini ve saklama süresi (saat)
+CHAT_EXPORT_BATCH_SIZE = config('CHAT_EXPORT_BATCH_SIZE', default=100, cast=int)
+CHAT_EXPORT_DIR = BASE_DIR / 'exports'
+CHAT_EXPORT_TTL_HOURS = config('CHAT_EXPORT_TTL_HOURS', default=24, cast=int)
+# Görüntülenme/indirme sayaçları bellekte biriktirilip bu aralıkla (saniye) toplu yazılır; 0 = anında yaz
+COUNTER_FLUSH_INTERVAL = config('COUNTER_FLUSH_INTERVAL', default=5, cast=float)
+COUNTER_FLUSH_THRESHOLD = config('COUNTER_FLUSH_THRESHOLD', default=100, cast=int)
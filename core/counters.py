@@ -0,0 +1,149 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction, close_old_connections
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """
+    Görüntülenme/indirme gibi sayaç artışlarını bellekte biriktirir.
+
+    Artışlar (model, pk) başına toplanır ve periyodik olarak tek bir
+    transaction içinde ``F(alan) + n`` güncellemeleriyle yazılır. Böylece
+    oku-değiştir-yaz kaynaklı kayıp güncellemeler ve sık okunan satırlarda
+    her istekte yazma kilidi alınması önlenir. ``flush_interval`` 0 ise
+    artışlar beklemeden yazılır.
+    """
+
+    def __init__(self, flush_interval=5, flush_threshold=100):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._lock = threading.Lock()
+        self._deltas = defaultdict(lambda: defaultdict(int))
+        self._touches = {}
+        self._pending_total = 0
+        self._flush_event = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.flushed_rows = 0
+        self.flush_errors = 0
+
+    def start(self):
+        """Arka plan yazma thread'ini başlat (bir kez)"""
+        with self._thread_lock:
+            if self._thread is not None or self.flush_interval <= 0:
+                return
+            self._thread = threading.Thread(
+                target=self._flush_loop,
+                name='counter-flush',
+                daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Counter flush error: {e}")
+            finally:
+                close_old_connections()
+
+    def increment(self, instance, field, amount=1, **touch):
+        """
+        ``instance.field`` değerini ``amount`` kadar artırır.
+
+        Bellekteki örnek de güncellenir; ``touch`` ile verilen alanlar
+        (ör. last_accessed_at) bir sonraki yazmada son değerleriyle yazılır.
+        """
+        setattr(instance, field, (getattr(instance, field) or 0) + amount)
+        for name, value in touch.items():
+            setattr(instance, name, value)
+
+        if self.flush_interval <= 0:
+            self._write({(type(instance), instance.pk): {field: amount}}, {(type(instance), instance.pk): touch})
+            return
+
+        key = (type(instance), instance.pk)
+        with self._lock:
+            self._deltas[key][field] += amount
+            if touch:
+                self._touches.setdefault(key, {}).update(touch)
+            self._pending_total += 1
+            over_threshold = self._pending_total >= self.flush_threshold
+        if over_threshold:
+            self._flush_event.set()
+
+    def pending(self, instance, field):
+        """Henüz yazılmamış artış miktarı (anlık toplam için veritabanı değerine eklenir)"""
+        with self._lock:
+            deltas = self._deltas.get((type(instance), instance.pk))
+            return deltas.get(field, 0) if deltas else 0
+
+    def flush(self):
+        """Biriken artışları tek transaction'da yazar; hata olursa artışlar geri konur"""
+        with self._lock:
+            deltas, touches = self._deltas, self._touches
+            self._deltas = defaultdict(lambda: defaultdict(int))
+            self._touches = {}
+            self._pending_total = 0
+        if not deltas:
+            return 0
+
+        try:
+            self._write(deltas, touches)
+        except Exception:
+            with self._lock:
+                for key, fields in deltas.items():
+                    for field, amount in fields.items():
+                        self._deltas[key][field] += amount
+                for key, values in touches.items():
+                    self._touches.setdefault(key, values)
+                self._pending_total += len(deltas)
+            self.flush_errors += 1
+            raise
+
+        self.flushed_rows += len(deltas)
+        return len(deltas)
+
+    def _write(self, deltas, touches):
+        with transaction.atomic():
+            for (model, pk), fields in deltas.items():
+                updates = {field: F(field) + amount for field, amount in fields.items()}
+                updates.update(touches.get((model, pk), {}))
+                model.objects.filter(pk=pk).update(**updates)
+
+    def snapshot(self):
+        with self._lock:
+            pending_rows = len(self._deltas)
+        return {
+            'pending_rows': pending_rows,
+            'flushed_rows': self.flushed_rows,
+            'flush_errors': self.flush_errors,
+            'flush_interval': self.flush_interval,
+        }
+
+# Global instance
+_counter_buffer = None
+_counter_buffer_lock = threading.Lock()
+
+def get_counter_buffer():
+    """Singleton sayaç tamponu (ilk kullanımda yazma thread'i başlar)"""
+    global _counter_buffer
+    with _counter_buffer_lock:
+        if _counter_buffer is None:
+            _counter_buffer = CounterBuffer(
+                flush_interval=getattr(settings, 'COUNTER_FLUSH_INTERVAL', 5),
+                flush_threshold=getattr(settings, 'COUNTER_FLUSH_THRESHOLD', 100),
+            )
+            _counter_buffer.start()
+    return _counter_buffer
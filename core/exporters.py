@@ -0,0 +1,253 @@
+import os
+import re
+import json
+import time
+import uuid
+import zlib
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+
+from member.models import ChatMessage
+from .models import ChatSession, ChatVideo, Notification
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+_EXPORT_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+def _batch_size():
+    return getattr(settings, 'CHAT_EXPORT_BATCH_SIZE', 100)
+
+
+def export_dir():
+    """Arka plan dışa aktarımlarının yazıldığı dizin (MEDIA_ROOT dışında; dosyalar yalnızca sahibine sunulur)"""
+    return Path(getattr(settings, 'CHAT_EXPORT_DIR', settings.BASE_DIR / 'exports'))
+
+
+def export_filename(user, fmt, compress):
+    extension = EXPORT_FORMATS[fmt][1] + ('.gz' if compress else '')
+    return f'binarygirls_chat_history_{user.username}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+
+
+def content_type(fmt, compress):
+    return 'application/gzip' if compress else EXPORT_FORMATS[fmt][0]
+
+
+def _iter_session_batches(user, batch_size):
+    """
+    Oturumları ``batch_size``'lık gruplar halinde, mesaj ve videolarıyla birlikte döndürür.
+
+    Her grup için mesajlar ve videolar tek sorguyla alınır; bellekte en fazla
+    bir grubun verisi tutulur.
+    """
+    sessions = ChatSession.objects.filter(user=user).order_by('-created_at').iterator(chunk_size=batch_size)
+    batch = []
+    for session in sessions:
+        batch.append(session)
+        if len(batch) >= batch_size:
+            yield _load_batch(batch)
+            batch = []
+    if batch:
+        yield _load_batch(batch)
+
+
+def _load_batch(sessions):
+    ids = [session.id for session in sessions]
+    messages = {session_id: [] for session_id in ids}
+    videos = {session_id: [] for session_id in ids}
+
+    message_rows = ChatMessage.objects.filter(session_id__in=ids).order_by('created_at').values_list(
+        'session_id', 'id', 'message', 'is_bot_response', 'created_at'
+    )
+    for session_id, *row in message_rows.iterator(chunk_size=2000):
+        messages[session_id].append(row)
+
+    for video in ChatVideo.objects.filter(session_id__in=ids).order_by('created_at').iterator(chunk_size=500):
+        videos[video.session_id].append(video)
+
+    return [(session, messages[session.id], videos[session.id]) for session in sessions]
+
+
+def _session_data(session, messages, videos, sender):
+    return {
+        'session_id': str(session.id),
+        'title': session.title or f'Oturum {session.get_short_id()}',
+        'created_at': session.created_at.isoformat(),
+        'updated_at': session.updated_at.isoformat(),
+        'message_count': len(messages),
+        'video_count': len(videos),
+        'messages': [
+            {
+                'id': message_id,
+                'message': text,
+                'is_bot_response': is_bot_response,
+                'created_at': created_at.isoformat(),
+                'sender': 'AI Assistant' if is_bot_response else sender
+            }
+            for message_id, text, is_bot_response, created_at in messages
+        ],
+        'videos': [
+            {
+                'id': str(video.id),
+                'title': video.title,
+                'status': video.status,
+                'duration': video.get_duration_display(),
+                'file_size_mb': video.file_size_mb,
+                'created_at': video.created_at.isoformat()
+            }
+            for video in videos
+        ]
+    }
+
+
+def iter_chat_export(user, fmt='json', batch_size=None):
+    """
+    Kullanıcının sohbet geçmişini parça parça metin olarak üretir.
+
+    ``json`` eski export_chat_history çıktısıyla aynı belgeyi, ``ndjson`` ise
+    bir başlık satırı ve her oturum için bir satır üretir.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Unsupported export format: {fmt}')
+
+    header = {
+        'user': user.username,
+        'export_date': datetime.now().isoformat(),
+        'total_sessions': ChatSession.objects.filter(user=user).count(),
+    }
+    sender = user.get_full_name() or user.username
+
+    if fmt == 'json':
+        yield json.dumps(header)[:-1] + ', "sessions": ['
+    else:
+        yield json.dumps({'type': 'export', **header}) + '\n'
+
+    first = True
+    for batch in _iter_session_batches(user, batch_size or _batch_size()):
+        for session, messages, videos in batch:
+            data = _session_data(session, messages, videos, sender)
+            if fmt == 'json':
+                yield ('' if first else ', ') + json.dumps(data)
+            else:
+                yield json.dumps({'type': 'session', **data}) + '\n'
+            first = False
+
+    if fmt == 'json':
+        yield ']}'
+
+
+def encode_chunks(chunks, compress=False):
+    """Metin parçalarını bayta çevirir; ``compress`` ile akış halinde gzip uygular"""
+    if not compress:
+        for chunk in chunks:
+            yield chunk.encode('utf-8')
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_path(user, export_id):
+    """Geçerli ve kullanıcıya ait tamamlanmış dışa aktarım dosyası veya None"""
+    if not _EXPORT_ID.match(export_id or ''):
+        return None
+    user_dir = export_dir() / str(user.pk)
+    for path in user_dir.glob(f'{export_id}.*'):
+        if not path.name.endswith('.tmp'):
+            return path
+    return None
+
+
+def cleanup_exports(max_age_hours=None):
+    """Süresi dolan dışa aktarım dosyalarını siler"""
+    max_age = (max_age_hours or getattr(settings, 'CHAT_EXPORT_TTL_HOURS', 24)) * 3600
+    root = export_dir()
+    if not root.exists():
+        return 0
+
+    removed = 0
+    cutoff = time.time() - max_age
+    for path in root.glob('*/*'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def write_export(user, export_id, fmt='json', compress=False):
+    """Dışa aktarımı geçici dosyaya akıtır, bitince atomik olarak yerine taşır"""
+    user_dir = export_dir() / str(user.pk)
+    user_dir.mkdir(parents=True, exist_ok=True)
+    extension = EXPORT_FORMATS[fmt][1] + ('.gz' if compress else '')
+    path = user_dir / f'{export_id}.{extension}'
+    temp_path = path.with_name(path.name + '.tmp')
+
+    try:
+        with open(temp_path, 'wb') as handle:
+            for data in encode_chunks(iter_chat_export(user, fmt), compress):
+                handle.write(data)
+        os.replace(temp_path, path)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def start_background_export(user, fmt='json', compress=False, download_url=None):
+    """
+    Büyük geçmişler için dışa aktarımı arka planda hazırlar.
+
+    Bitince kullanıcıya bildirim gönderilir; ``download_url`` export_id
+    alıp indirme adresini döndüren fonksiyondur.
+
+    Returns:
+        export_id
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Unsupported export format: {fmt}')
+    export_id = uuid.uuid4().hex
+
+    def run():
+        started = time.time()
+        try:
+            cleanup_exports()
+            path = write_export(user, export_id, fmt, compress)
+            link = download_url(export_id) if download_url else ''
+            Notification.objects.create(
+                user=user,
+                title='Sohbet geçmişiniz hazır',
+                message=f'Dışa aktarım dosyanız indirilebilir. {link}'.strip(),
+                notification_type='system'
+            )
+            logger.info(f"Chat export {export_id} for user {user.pk} written to {path.name} in {time.time() - started:.1f}s")
+        except Exception as e:
+            logger.error(f"Chat export {export_id} for user {user.pk} failed: {e}")
+            Notification.objects.create(
+                user=user,
+                title='Sohbet geçmişi dışa aktarılamadı',
+                message='Dışa aktarım sırasında bir hata oluştu, lütfen tekrar deneyin.',
+                notification_type='system'
+            )
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return export_id
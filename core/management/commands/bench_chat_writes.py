@@ -0,0 +1,92 @@
+import time
+import threading
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, OperationalError
+from django.utils import timezone
+
+from member.models import ChatMessage
+from core.models import ChatSession
+
+BENCH_USERNAME = 'bench_chat_writes'
+
+
+class Command(BaseCommand):
+    help = "Eşzamanlı chat akışlarının veritabanı yazma hızını ölçer (DOCKER_SETUP.md)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--streams', type=int, default=8, help='Eşzamanlı sohbet akışı sayısı')
+        parser.add_argument('--turns', type=int, default=25, help='Akış başına soru-cevap turu')
+        parser.add_argument('--keep', action='store_true', help='Oluşturulan kayıtları silme')
+
+    def handle(self, *args, **options):
+        streams, turns = options['streams'], options['turns']
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME)
+        sessions = [ChatSession.objects.create(user=user) for _ in range(streams)]
+
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        def run_stream(session):
+            try:
+                for turn in range(turns):
+                    started = time.perf_counter()
+                    try:
+                        # chat_stream_response ile aynı yazma sırası: soru, boş bot mesajı, yanıt, oturum
+                        ChatMessage.objects.create(
+                            user=user, session=session,
+                            message=f'Matematik sorusu {turn}: türev nasıl alınır?', is_bot_response=False
+                        )
+                        bot_message = ChatMessage.objects.create(
+                            user=user, session=session, message='', is_bot_response=True
+                        )
+                        bot_message.message = 'Türev, fonksiyonun anlık değişim hızıdır. ' * 20
+                        bot_message.save()
+                        session.updated_at = timezone.now()
+                        session.save()
+                    except OperationalError as e:
+                        with lock:
+                            errors.append(str(e))
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run_stream, args=(session,)) for session in sessions]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self._report(streams, turns, elapsed, sorted(latencies), errors)
+
+        if not options['keep']:
+            User.objects.filter(username=BENCH_USERNAME).delete()
+
+    def _report(self, streams, turns, elapsed, latencies, errors):
+        database = connections['default']
+        profile = database.vendor
+        if profile == 'sqlite':
+            with database.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                profile += f" (journal_mode={cursor.fetchone()[0]})"
+        else:
+            profile += f" (CONN_MAX_AGE={database.settings_dict.get('CONN_MAX_AGE')})"
+
+        def percentile(value):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * value))] * 1000 if latencies else 0
+
+        self.stdout.write(f"Veritabanı: {profile}")
+        self.stdout.write(f"Akış: {streams} x {turns} tur, {elapsed:.2f} sn")
+        self.stdout.write(f"Tamamlanan tur: {len(latencies)}/{streams * turns} ({len(latencies) / elapsed:.1f} tur/sn, "
+                          f"{len(latencies) * 4 / elapsed:.1f} model yazması/sn)")
+        self.stdout.write(f"Tur gecikmesi: p50 {percentile(0.5):.1f} ms, p95 {percentile(0.95):.1f} ms, "
+                          f"max {percentile(1):.1f} ms")
+        if errors:
+            self.stdout.write(self.style.ERROR(f"{len(errors)} tur kilit hatasıyla başarısız: {errors[0]}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Kilit hatası yok"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = "Sohbet mesajı arama indeksini baştan oluşturur (sinyal tetiklemeyen toplu işlemlerden sonra)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = search.rebuild_index(batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(f"{count} mesaj indekslendi"))
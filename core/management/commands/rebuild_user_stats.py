@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from core import stats
+
+
+class Command(BaseCommand):
+    help = "Kullanıcı istatistiklerini kaynak tablolardan yeniden hesaplar ve etkinlik akışını budar"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Yalnızca bu kullanıcı(lar) (id); verilmezse tüm kullanıcılar')
+        parser.add_argument('--prune-only', action='store_true',
+                            help='Yeniden hesaplama yapmadan sadece eski etkinlikleri sil')
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids'] or User.objects.values_list('id', flat=True).iterator()
+
+        rebuilt = pruned = 0
+        for user_id in user_ids:
+            if not options['prune_only']:
+                stats.rebuild_user_stats(user_id)
+                rebuilt += 1
+            pruned += stats.prune_activities(user_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{rebuilt} kullanıcı yeniden hesaplandı, {pruned} eski etkinlik silindi"
+        ))
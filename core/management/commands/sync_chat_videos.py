@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import ChatVideo
+
+
+class Command(BaseCommand):
+    help = "Webhook'u kaçırılmış processing videoların durumunu video servisinden uzlaştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=getattr(settings, 'VIDEO_STATUS_STALE_MINUTES', 10),
+            help='Bu süreden uzun güncellenmemiş kayıtlar kontrol edilir',
+        )
+        parser.add_argument('--limit', type=int, default=200)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['stale_minutes'])
+        videos = ChatVideo.objects.filter(
+            status='processing',
+            last_status_check__lt=cutoff,
+        ).order_by('last_status_check')[:options['limit']]
+
+        checked = updated = 0
+        for video in videos:
+            video.check_fastapi_status()
+            checked += 1
+            if video.status != 'processing':
+                updated += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{checked} video kontrol edildi, {updated} video güncellendi"
+        ))
@@ -0,0 +1,81 @@
+import re
+
+from django.db import migrations
+
+SQLITE_TABLE = 'core_chatmessage_fts'
+POSTGRES_TABLE = 'core_chatmessage_search'
+
+# core.search.normalize_text'in bu migration anındaki kopyası; modül sonradan değişse de
+# migration aynı indeksi üretir
+_TURKISH_UPPER = str.maketrans({'I': 'ı', 'İ': 'i'})
+_ASCII_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_text(text):
+    text = (text or '').translate(_TURKISH_UPPER).lower().translate(_ASCII_FOLD)
+    return _NON_WORD.sub(' ', text).strip()
+
+
+def create_search_index(apps, schema_editor):
+    """Veritabanına göre FTS5 (SQLite) veya tsvector + GIN (PostgreSQL) indeksi ve ilk doldurma"""
+    connection = schema_editor.connection
+    ChatMessage = apps.get_model('member', 'ChatMessage')
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+                    f"owner, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                )
+            except Exception:
+                # SQLite FTS5 olmadan derlenmiş; arama icontains ile çalışmaya devam eder
+                return
+            insert = f'INSERT INTO {SQLITE_TABLE} (rowid, owner, body) VALUES (%s, %s, %s)'
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ('
+                f'message_id bigint PRIMARY KEY REFERENCES member_chatmessage (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+                f'user_id integer NOT NULL, '
+                f'document tsvector NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_document_gin ON {POSTGRES_TABLE} USING GIN (document)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_user_id ON {POSTGRES_TABLE} (user_id)'
+            )
+            insert = f"INSERT INTO {POSTGRES_TABLE} (message_id, user_id, document) VALUES (%s, %s, to_tsvector('simple', %s))"
+        else:
+            return
+
+        rows = []
+        for message in ChatMessage.objects.only('id', 'user_id', 'message').order_by('id').iterator(chunk_size=1000):
+            owner = f'u{message.user_id}' if connection.vendor == 'sqlite' else message.user_id
+            rows.append((message.id, owner, normalize_text(message.message)))
+            if len(rows) >= 1000:
+                cursor.executemany(insert, rows)
+                rows = []
+        if rows:
+            cursor.executemany(insert, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    table = SQLITE_TABLE if connection.vendor == 'sqlite' else POSTGRES_TABLE
+    if connection.vendor in ('sqlite', 'postgresql'):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('member', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
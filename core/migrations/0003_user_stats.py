@@ -0,0 +1,122 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_chat_message_search"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("total_messages", models.PositiveIntegerField(default=0, verbose_name="Toplam Mesaj")),
+                ("user_messages", models.PositiveIntegerField(default=0, verbose_name="Kullanıcı Mesajı")),
+                ("bot_messages", models.PositiveIntegerField(default=0, verbose_name="AI Mesajı")),
+                ("chat_sessions", models.PositiveIntegerField(default=0, verbose_name="Sohbet Oturumu")),
+                ("total_videos", models.PositiveIntegerField(default=0, verbose_name="Video")),
+                ("completed_videos", models.PositiveIntegerField(default=0, verbose_name="Tamamlanan Video")),
+                ("completed_solutions", models.PositiveIntegerField(default=0, verbose_name="Tamamlanan Çözüm")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Kullanıcı İstatistiği",
+                "verbose_name_plural": "Kullanıcı İstatistikleri",
+            },
+        ),
+        migrations.CreateModel(
+            name="UserSubjectStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("completed_solutions", models.PositiveIntegerField(default=0, verbose_name="Tamamlanan Çözüm")),
+                ("chat_messages", models.PositiveIntegerField(default=0, verbose_name="Sohbet Mesajı")),
+                (
+                    "subject",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="user_stats",
+                        to="core.subject",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="subject_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Kullanıcı Ders İstatistiği",
+                "verbose_name_plural": "Kullanıcı Ders İstatistikleri",
+                "unique_together": {("user", "subject")},
+            },
+        ),
+        migrations.CreateModel(
+            name="UserActivity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "activity_type",
+                    models.CharField(
+                        choices=[
+                            ("chat", "Sohbet"),
+                            ("completion", "Çözüm Tamamlama"),
+                            ("video", "Video"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("description", models.CharField(max_length=255)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activities",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Kullanıcı Etkinliği",
+                "verbose_name_plural": "Kullanıcı Etkinlikleri",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(fields=["user", "-created_at"], name="core_activity_user_recent"),
+                ],
+            },
+        ),
+    ]
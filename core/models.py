@@ -4,10 +4,12 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 import uuid
-import requests
 import json
 from django.conf import settings
 
+from .video_client import get_video_client
+from .counters import get_counter_buffer
+
 class Subject(models.Model):
     name = models.CharField(max_length=100, verbose_name='Ders Adı')
     icon = models.CharField(max_length=10, default='📚', verbose_name='İkon')
@@ -89,6 +91,9 @@ class Solution(models.Model):
     
     def get_tags_list(self):
         return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
+    
+    def increment_view_count(self):
+        get_counter_buffer().increment(self, 'view_count')
 
 
 class UserSolutionProgress(models.Model):
@@ -108,6 +113,13 @@ class UserSolutionProgress(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.solution.title}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # İstatistik sinyalleri tamamlanma geçişini ek sorgu olmadan algılar (bkz. core/stats.py)
+        instance._loaded_is_completed = instance.__dict__.get('is_completed')
+        return instance
 
 
 class Notification(models.Model):
@@ -233,6 +245,13 @@ class ChatVideo(models.Model):
     def __str__(self):
         return f"{self.title} - {self.session.user.username} ({self.status})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # İstatistik sinyalleri durum geçişini ek sorgu olmadan algılar (bkz. core/stats.py)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
     def get_short_id(self):
         return str(self.id)[:8]
     
@@ -244,15 +263,21 @@ class ChatVideo(models.Model):
         return "0:00"
     
     def increment_view_count(self):
-        self.view_count += 1
-        self.save(update_fields=['view_count'])
+        get_counter_buffer().increment(self, 'view_count')
     
     def increment_download_count(self):
-        self.download_count += 1
-        self.save(update_fields=['download_count'])
+        get_counter_buffer().increment(self, 'download_count')
+    
+    def live_count(self, field):
+        """Veritabanından yeni yüklenmiş sayaç değeri + tamponda bekleyen artışlar"""
+        return getattr(self, field) + get_counter_buffer().pending(self, field)
     
     def update_from_fastapi_status(self, fastapi_response):
         """FastAPI'den gelen durumu güncelle"""
+        # Sonuçlanmış kayıt, geç gelen veya tekrarlanan olaylarla geri alınmaz
+        if self.status in ('completed', 'failed'):
+            return
+        
         if fastapi_response.get('status') == 'completed':
             self.status = 'completed'
             self.generation_completed_at = timezone.now()
@@ -266,7 +291,11 @@ class ChatVideo(models.Model):
             self.status = 'failed'
             
         self.last_status_check = timezone.now()
-        self.save()
+        # Tam kayıt, tamponlanan sayaçların bellekteki değerlerini veritabanına geri yazardı
+        self.save(update_fields=[
+            'status', 'generation_completed_at', 'video_url', 'direct_video_url',
+            'static_video_url', 'last_status_check', 'updated_at'
+        ])
     
     @classmethod
     def create_video_request(cls, session, user, message_up_to_id, options=None):
@@ -292,26 +321,21 @@ class ChatVideo(models.Model):
         
         # FastAPI'ye istek gönder
         try:
-            # Video API URL'i settings'den al veya varsayılan kullan
-            api_base = getattr(settings, 'VIDEO_API_BASE_URL', 'http://localhost:8001')
-            
+            # FastAPI form data bekler, iç içe alanlar JSON olarak gönderilir
             payload = {
                 'text': f"Sohbet oturumu: {session.get_short_id()}",
                 'video_type': options.get('video_type', 'solution'),
-                'chat_data': messages,
-                'options': {
+                'chat_data': json.dumps(messages),
+                'options': json.dumps({
                     'style': options.get('style', 'animated'),
                     'duration': options.get('duration', 'medium'),
                     'speed': options.get('speed', 'normal'),
                     'background_music': options.get('background_music', True)
-                }
+                }),
+                'callback_url': getattr(settings, 'VIDEO_WEBHOOK_URL', None),
             }
             
-            response = requests.post(
-                f"{api_base}/api/create_video",
-                json=payload,
-                timeout=30
-            )
+            response = get_video_client().create_video(payload)
             
             if response.status_code == 200:
                 fastapi_data = response.json()
@@ -357,16 +381,17 @@ class ChatVideo(models.Model):
             return video, {'error': str(e)}
     
     def check_fastapi_status(self):
-        """FastAPI'den video durumunu kontrol et"""
+        """
+        FastAPI'den video durumunu kontrol et.
+        
+        Durum normalde webhook ile gelir; bu çağrı yalnızca sync_chat_videos
+        uzlaştırma komutu içindir, sayfa görünümlerinden çağrılmamalıdır.
+        """
         if self.status == 'completed' or self.status == 'failed':
             return
             
         try:
-            api_base = getattr(settings, 'VIDEO_API_BASE_URL', 'http://localhost:8001')
-            response = requests.get(
-                f"{api_base}/api/status/{self.fastapi_request_id}",
-                timeout=10
-            )
+            response = get_video_client().get_status(self.fastapi_request_id)
             
             if response.status_code == 200:
                 data = response.json()
@@ -411,6 +436,9 @@ class TopicContent(models.Model):
     
     def get_tags_list(self):
         return [tag.strip() for tag in self.tags.split(',') if tag.strip()]
+    
+    def increment_view_count(self):
+        get_counter_buffer().increment(self, 'view_count')
 
 
 class TopicMaterial(models.Model):
@@ -527,6 +555,66 @@ class EducationSession(models.Model):
         return "Bilinmiyor"
     
     def increment_view_count(self):
-        self.view_count += 1
-        self.last_accessed_at = timezone.now()
-        self.save(update_fields=['view_count', 'last_accessed_at'])
\ No newline at end of file
+        get_counter_buffer().increment(self, 'view_count', last_accessed_at=timezone.now())
+
+
+class UserStats(models.Model):
+    """Kullanıcı başına önceden hesaplanmış sayaçlar; sinyallerle F() ile güncellenir (core/stats.py)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_messages = models.PositiveIntegerField(default=0, verbose_name='Toplam Mesaj')
+    user_messages = models.PositiveIntegerField(default=0, verbose_name='Kullanıcı Mesajı')
+    bot_messages = models.PositiveIntegerField(default=0, verbose_name='AI Mesajı')
+    chat_sessions = models.PositiveIntegerField(default=0, verbose_name='Sohbet Oturumu')
+    total_videos = models.PositiveIntegerField(default=0, verbose_name='Video')
+    completed_videos = models.PositiveIntegerField(default=0, verbose_name='Tamamlanan Video')
+    completed_solutions = models.PositiveIntegerField(default=0, verbose_name='Tamamlanan Çözüm')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Kullanıcı İstatistiği'
+        verbose_name_plural = 'Kullanıcı İstatistikleri'
+    
+    def __str__(self):
+        return f"{self.user.username} istatistikleri"
+
+
+class UserSubjectStats(models.Model):
+    """Kullanıcının ders bazında ilerlemesi ve sohbet mesajı sayısı"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='subject_stats')
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='user_stats')
+    completed_solutions = models.PositiveIntegerField(default=0, verbose_name='Tamamlanan Çözüm')
+    chat_messages = models.PositiveIntegerField(default=0, verbose_name='Sohbet Mesajı')
+    
+    class Meta:
+        unique_together = ['user', 'subject']
+        verbose_name = 'Kullanıcı Ders İstatistiği'
+        verbose_name_plural = 'Kullanıcı Ders İstatistikleri'
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.subject.name}"
+
+
+class UserActivity(models.Model):
+    """Kullanıcının son etkinlik akışı (sohbet, çözüm tamamlama, video)"""
+    ACTIVITY_TYPES = [
+        ('chat', 'Sohbet'),
+        ('completion', 'Çözüm Tamamlama'),
+        ('video', 'Video'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activities')
+    activity_type = models.CharField(max_length=20, choices=ACTIVITY_TYPES)
+    description = models.CharField(max_length=255)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        verbose_name = 'Kullanıcı Etkinliği'
+        verbose_name_plural = 'Kullanıcı Etkinlikleri'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='core_activity_user_recent'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.description}"
+
@@ -0,0 +1,93 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Basit, thread-safe devre kesici.
+
+    closed: istekler geçer. Art arda ``failure_threshold`` hata alınırsa
+    open durumuna geçer ve ``reset_timeout`` saniye boyunca istekleri reddeder.
+    Süre dolunca half_open olur; tek bir deneme isteğine izin verilir,
+    başarılıysa devre kapanır, başarısızsa tekrar açılır.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self.last_error = None
+        self.last_success_at = None
+        self.last_failure_at = None
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self):
+        """İsteğin devreden geçip geçemeyeceğini döndürür"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+            self.last_error = None
+            self.last_success_at = time.time()
+
+    def release_trial(self):
+        """Devreyi etkilemeyen bir sonuçtan sonra deneme isteği hakkını geri verir"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            self.last_error = str(error) if error else None
+            self.last_failure_at = time.time()
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self):
+        """İzleme için devrenin anlık durumunu döndürür"""
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == self.OPEN:
+                retry_in = max(0, round(self.reset_timeout - (time.monotonic() - self._opened_at), 1))
+            return {
+                'name': self.name,
+                'state': state,
+                'failures': self._failures,
+                'retry_in': retry_in,
+                'last_error': self.last_error,
+                'last_success_at': self.last_success_at,
+                'last_failure_at': self.last_failure_at,
+            }
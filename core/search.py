@@ -0,0 +1,192 @@
+import re
+import logging
+
+from django.db import connection
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+# Ders ilişkili mesajları bulmak için anahtar kelimeler (önek olarak eşleşir)
+SUBJECT_KEYWORDS = {
+    'Matematik': ['matematik', 'mat', 'sayı', 'hesap', 'algebra', 'cebir', 'geometri'],
+    'Fizik': ['fizik', 'hareket', 'kuvvet', 'enerji'],
+    'Kimya': ['kimya', 'atom', 'molekül', 'element'],
+    'Biyoloji': ['biyoloji', 'bio', 'hücre', 'dna'],
+}
+
+SQLITE_TABLE = 'core_chatmessage_fts'
+POSTGRES_TABLE = 'core_chatmessage_search'
+
+# Türkçe büyük/küçük harf ve aksan katlama: "Işık", "ışık" ve "isik" aynı terime iner
+_TURKISH_UPPER = str.maketrans({'I': 'ı', 'İ': 'i'})
+_ASCII_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+_backend_cache = {}
+
+
+def normalize_text(text):
+    """İndekslenen metin ve sorgu terimleri için ortak Türkçe normalizasyon"""
+    text = (text or '').translate(_TURKISH_UPPER).lower().translate(_ASCII_FOLD)
+    return _NON_WORD.sub(' ', text).strip()
+
+
+def _terms(keywords):
+    terms = []
+    for keyword in keywords:
+        terms.extend(normalize_text(keyword).split())
+    return list(dict.fromkeys(terms))
+
+
+def _backend():
+    """Kullanılabilir indeks ('sqlite', 'postgresql') veya None (icontains'e düşülür)"""
+    vendor = connection.vendor
+    if vendor not in _backend_cache:
+        backend = None
+        with connection.cursor() as cursor:
+            if vendor == 'sqlite':
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [SQLITE_TABLE])
+                backend = 'sqlite' if cursor.fetchone() else None
+            elif vendor == 'postgresql':
+                cursor.execute('SELECT to_regclass(%s)', [POSTGRES_TABLE])
+                backend = 'postgresql' if cursor.fetchone()[0] else None
+        if backend is None:
+            logger.warning(f"Chat search index unavailable on {vendor}, falling back to icontains scans")
+        _backend_cache[vendor] = backend
+    return _backend_cache[vendor]
+
+
+def index_message(message):
+    """Mesajı indekse ekler veya günceller"""
+    backend = _backend()
+    if backend is None:
+        return
+    document = normalize_text(message.message)
+    with connection.cursor() as cursor:
+        if backend == 'sqlite':
+            cursor.execute(f'DELETE FROM {SQLITE_TABLE} WHERE rowid = %s', [message.pk])
+            cursor.execute(
+                f'INSERT INTO {SQLITE_TABLE} (rowid, owner, body) VALUES (%s, %s, %s)',
+                [message.pk, f'u{message.user_id}', document]
+            )
+        else:
+            cursor.execute(
+                f"INSERT INTO {POSTGRES_TABLE} (message_id, user_id, document) "
+                f"VALUES (%s, %s, to_tsvector('simple', %s)) "
+                f"ON CONFLICT (message_id) DO UPDATE SET user_id = EXCLUDED.user_id, document = EXCLUDED.document",
+                [message.pk, message.user_id, document]
+            )
+
+
+def remove_message(message_id):
+    backend = _backend()
+    if backend is None:
+        return
+    table, column = (SQLITE_TABLE, 'rowid') if backend == 'sqlite' else (POSTGRES_TABLE, 'message_id')
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {column} = %s', [message_id])
+
+
+def _match_query(user_id, terms):
+    """Terimlerden biriyle (önek) eşleşen kullanıcı mesajları için FROM/WHERE ve alaka sıralaması"""
+    if _backend() == 'sqlite':
+        query = 'owner : "u%d" AND body : (%s)' % (user_id, ' OR '.join(f'"{term}"*' for term in terms))
+        return f'{SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s', [query], 'rank, rowid DESC', 'rowid'
+    query = ' | '.join(f"'{term}':*" for term in terms)
+    return (
+        f"{POSTGRES_TABLE}, to_tsquery('simple', %s) query WHERE user_id = %s AND document @@ query",
+        [query, user_id],
+        'ts_rank(document, query) DESC, message_id DESC',
+        'message_id',
+    )
+
+
+def _match_ids(user_id, terms, limit):
+    source, params, order, column = _match_query(user_id, terms)
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {column} FROM {source} ORDER BY {order} LIMIT %s', params + [limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _match_count(user_id, terms):
+    source, params, _, _ = _match_query(user_id, terms)
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {source}', params)
+        return cursor.fetchone()[0]
+
+
+def _fallback_filter(keywords):
+    condition = Q()
+    for keyword in keywords:
+        condition |= Q(message__icontains=keyword)
+    return condition
+
+
+def search_messages(user, keywords, limit=5):
+    """
+    Kullanıcının anahtar kelimelerden biriyle eşleşen mesajları (en alakalı ilk ``limit``).
+
+    İndeks yoksa icontains sorgusuyla en yeni mesajlar döner.
+    """
+    from member.models import ChatMessage
+
+    terms = _terms(keywords)
+    if not terms:
+        return []
+    if _backend() is None:
+        return list(
+            ChatMessage.objects.filter(user=user).filter(_fallback_filter(keywords))
+            .order_by('-created_at')[:limit]
+        )
+
+    ids = _match_ids(user.pk, terms, limit)
+    messages = ChatMessage.objects.in_bulk(ids)
+    return [messages[message_id] for message_id in ids if message_id in messages]
+
+
+def count_messages(user, keywords):
+    """Kullanıcının anahtar kelimelerle eşleşen mesaj sayısı"""
+    from member.models import ChatMessage
+
+    terms = _terms(keywords)
+    if not terms:
+        return 0
+    if _backend() is None:
+        return ChatMessage.objects.filter(user=user).filter(_fallback_filter(keywords)).count()
+    return _match_count(user.pk, terms)
+
+
+def related_messages(user, subject_name, limit=5):
+    """Derse ait anahtar kelimelerle ilişkili sohbet mesajları"""
+    return search_messages(user, SUBJECT_KEYWORDS.get(subject_name, []), limit)
+
+
+def detect_subject(text):
+    """Metnin ilk eşleşen dersi veya None"""
+    words = normalize_text(text).split()
+    for subject, keywords in SUBJECT_KEYWORDS.items():
+        terms = _terms(keywords)
+        if any(word.startswith(term) for word in words for term in terms):
+            return subject
+    return None
+
+
+def rebuild_index(batch_size=1000):
+    """İndeksi baştan oluşturur (toplu içe aktarma / queryset.update sonrası)"""
+    from member.models import ChatMessage
+
+    backend = _backend()
+    if backend is None:
+        return 0
+    table = SQLITE_TABLE if backend == 'sqlite' else POSTGRES_TABLE
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+
+    count = 0
+    for message in ChatMessage.objects.only('id', 'user_id', 'message').order_by('id').iterator(chunk_size=batch_size):
+        index_message(message)
+        count += 1
+    if backend == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {SQLITE_TABLE} ({SQLITE_TABLE}) VALUES ('optimize')")
+    return count
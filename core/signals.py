@@ -1,13 +1,18 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Settings, Notification
+from member.models import ChatMessage
+from .models import Settings, Notification, ChatSession, ChatVideo, UserSolutionProgress
+from . import search, stats
 
 
 @receiver(post_save, sender=User)
 def create_user_settings(sender, instance, created, **kwargs):
     """Yeni kullanıcı için varsayılan ayarları oluştur"""
-    if created:
+    # loaddata (raw) ile aktarılan kullanıcıların ayarları fixture'dan gelir
+    if created and not kwargs.get('raw'):
         Settings.objects.create(user=instance)
         
         # Hoş geldin bildirimi oluştur
@@ -16,4 +21,65 @@ def create_user_settings(sender, instance, created, **kwargs):
             title='BinaryGirls\'e Hoş Geldiniz! 🎉',
             message='Hesabınız başarıyla oluşturuldu. AI asistanınızla sohbet etmeye başlayabilirsiniz!',
             notification_type='system'
-        )
\ No newline at end of file
+        )
+
+@receiver(post_save, sender=ChatMessage)
+def index_chat_message(sender, instance, **kwargs):
+    """Mesaj kaydedildikçe arama indeksini ve kullanıcı istatistiklerini güncelle"""
+    # loaddata sonrası indeks ve istatistikler rebuild komutlarıyla oluşturulur
+    if kwargs.get('raw'):
+        return
+    search.index_message(instance)
+    if kwargs.get('created'):
+        stats.message_created(instance)
+
+
+@receiver(post_delete, sender=ChatMessage)
+def unindex_chat_message(sender, instance, **kwargs):
+    search.remove_message(instance.pk)
+    stats.message_deleted(instance)
+
+
+@receiver(post_save, sender=ChatSession)
+def count_chat_session(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        stats.session_created(instance)
+
+
+@receiver(post_delete, sender=ChatSession)
+def uncount_chat_session(sender, instance, **kwargs):
+    stats.session_deleted(instance)
+
+
+@receiver(post_save, sender=ChatVideo)
+def count_chat_video(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    stats.video_saved(instance, created)
+
+
+@receiver(post_delete, sender=ChatVideo)
+def uncount_chat_video(sender, instance, **kwargs):
+    stats.video_deleted(instance)
+
+
+@receiver(post_save, sender=UserSolutionProgress)
+def count_solution_progress(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    stats.progress_saved(instance, created)
+
+
+@receiver(post_delete, sender=UserSolutionProgress)
+def uncount_solution_progress(sender, instance, **kwargs):
+    stats.progress_deleted(instance)
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """SQLite bağlantılarına SQLITE_PRAGMAS ayarlarını uygula"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
@@ -0,0 +1,221 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from member.models import ChatMessage
+from .models import (
+    Subject, Solution, ChatSession, ChatVideo, UserSolutionProgress,
+    UserStats, UserSubjectStats, UserActivity,
+)
+from .search import detect_subject
+
+# Yeniden hesaplamada kaynak başına etkinlik akışına alınan kayıt sayısı
+ACTIVITY_SEED_SIZE = 10
+# Kullanıcı başına tutulan etkinlik sayısı (fazlası prune_activities ile silinir)
+ACTIVITY_KEEP = 50
+# Akış ACTIVITY_KEEP'i bu kadar aşınca eklemeyle birlikte kırpılır (silme her eklemede değil, toplu yapılır)
+ACTIVITY_PRUNE_SLACK = 10
+
+
+def _subject_id(name):
+    if not name:
+        return None
+    return Subject.objects.filter(name=name).values_list('id', flat=True).first()
+
+
+def rebuild_user_stats(user_id):
+    """Kullanıcının istatistiklerini, ders ilerlemesini ve etkinlik akışını kaynak tablolardan hesaplar"""
+    messages = ChatMessage.objects.filter(user_id=user_id).aggregate(
+        total=Count('id'),
+        bot=Count('id', filter=Q(is_bot_response=True)),
+    )
+    videos = ChatVideo.objects.filter(user_id=user_id).aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+    )
+    completed_progress = UserSolutionProgress.objects.filter(user_id=user_id, is_completed=True)
+
+    # Ders bazında: tamamlanan çözümler ve (kullanıcı mesajlarından) sohbet konusu
+    subjects = {}
+    for row in completed_progress.values('solution__subject').annotate(count=Count('id')):
+        subjects.setdefault(row['solution__subject'], {})['completed_solutions'] = row['count']
+
+    chat_counts = {}
+    user_messages = ChatMessage.objects.filter(user_id=user_id, is_bot_response=False)
+    for text in user_messages.values_list('message', flat=True).iterator(chunk_size=1000):
+        name = detect_subject(text)
+        if name:
+            chat_counts[name] = chat_counts.get(name, 0) + 1
+    for subject_id, name in Subject.objects.filter(name__in=chat_counts).values_list('id', 'name'):
+        subjects.setdefault(subject_id, {})['chat_messages'] = chat_counts[name]
+
+    activities = [
+        UserActivity(user_id=user_id, activity_type='chat',
+                     description=f'Chat: {message.message[:50]}...', created_at=message.created_at)
+        for message in user_messages.order_by('-created_at')[:ACTIVITY_SEED_SIZE]
+    ] + [
+        UserActivity(user_id=user_id, activity_type='completion',
+                     description=f'Çözüm tamamlandı: {progress.solution.title}',
+                     created_at=progress.completed_at or progress.created_at)
+        for progress in completed_progress.select_related('solution').order_by('-completed_at')[:ACTIVITY_SEED_SIZE]
+    ] + [
+        UserActivity(user_id=user_id, activity_type='video',
+                     description=f'Video oluşturuldu: {video.title}', created_at=video.created_at)
+        for video in ChatVideo.objects.filter(user_id=user_id, status='completed').order_by('-created_at')[:ACTIVITY_SEED_SIZE]
+    ]
+
+    with transaction.atomic():
+        stats, _ = UserStats.objects.update_or_create(user_id=user_id, defaults={
+            'total_messages': messages['total'],
+            'user_messages': messages['total'] - messages['bot'],
+            'bot_messages': messages['bot'],
+            'chat_sessions': ChatSession.objects.filter(user_id=user_id).count(),
+            'total_videos': videos['total'],
+            'completed_videos': videos['completed'],
+            'completed_solutions': sum(values.get('completed_solutions', 0) for values in subjects.values()),
+        })
+        UserSubjectStats.objects.filter(user_id=user_id).delete()
+        UserSubjectStats.objects.bulk_create([
+            UserSubjectStats(user_id=user_id, subject_id=subject_id, **values)
+            for subject_id, values in subjects.items()
+        ])
+        UserActivity.objects.filter(user_id=user_id).delete()
+        UserActivity.objects.bulk_create(activities)
+
+    return stats
+
+
+def get_user_stats(user):
+    """Tek satırlık istatistik kaydı; ilk erişimde hesaplanır"""
+    stats = UserStats.objects.filter(user=user).first()
+    return stats or rebuild_user_stats(user.pk)
+
+
+def recent_activity(user, limit=5):
+    return [
+        {
+            'type': activity.activity_type,
+            'description': activity.description,
+            'timestamp': activity.created_at.isoformat(),
+        }
+        for activity in UserActivity.objects.filter(user=user)[:limit]
+    ]
+
+
+def prune_activities(user_id, keep=None):
+    """Akışta en yeni ``keep`` (varsayılan ACTIVITY_KEEP) kayıt dışındakileri siler"""
+    if keep is None:
+        keep = ACTIVITY_KEEP
+    stale = UserActivity.objects.filter(user_id=user_id).values_list('id', flat=True)[keep:]
+    return UserActivity.objects.filter(id__in=list(stale)).delete()[0]
+
+
+def _apply(user_id, rebuild=True, **deltas):
+    """
+    UserStats satırına F() ile artış/azalış uygular.
+
+    Satır yoksa (rebuild=True) kaynak tablolardan hesaplanır; hesaplama bu
+    değişikliği zaten içerdiği için False döner ve çağıran diğer
+    güncellemeleri atlar. Silmelerde satır yoksa hiçbir şey yapılmaz; aksi
+    halde silinmekte olan kullanıcı için kayıt yeniden oluşurdu.
+    """
+    updates = {field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()}
+    if UserStats.objects.filter(user_id=user_id).update(**updates):
+        return True
+    if rebuild:
+        rebuild_user_stats(user_id)
+    return False
+
+
+def _apply_subject(user_id, subject_id, **deltas):
+    if subject_id is None:
+        return
+    updates = {field: Greatest(F(field) + delta, 0) for field, delta in deltas.items()}
+    if UserSubjectStats.objects.filter(user_id=user_id, subject_id=subject_id).update(**updates):
+        return
+    if all(delta < 0 for delta in deltas.values()):
+        return
+    try:
+        with transaction.atomic():
+            UserSubjectStats.objects.create(
+                user_id=user_id, subject_id=subject_id,
+                **{field: max(delta, 0) for field, delta in deltas.items()}
+            )
+    except IntegrityError:
+        # Eşzamanlı istek satırı önce oluşturdu
+        UserSubjectStats.objects.filter(user_id=user_id, subject_id=subject_id).update(**updates)
+
+
+def _add_activity(user_id, activity_type, description):
+    UserActivity.objects.create(user_id=user_id, activity_type=activity_type, description=description[:255])
+    # Eşik kontrolü (user, -created_at) indeksinde en fazla ACTIVITY_KEEP + ACTIVITY_PRUNE_SLACK kayıt tarar
+    if UserActivity.objects.filter(user_id=user_id)[ACTIVITY_KEEP + ACTIVITY_PRUNE_SLACK:].exists():
+        prune_activities(user_id)
+
+
+def message_created(message):
+    bot = message.is_bot_response
+    if not _apply(message.user_id, total_messages=1, bot_messages=int(bot), user_messages=int(not bot)):
+        return
+    if not bot:
+        _apply_subject(message.user_id, _subject_id(detect_subject(message.message)), chat_messages=1)
+        _add_activity(message.user_id, 'chat', f'Chat: {message.message[:50]}...')
+
+
+def message_deleted(message):
+    bot = message.is_bot_response
+    if not _apply(message.user_id, rebuild=False, total_messages=-1, bot_messages=-int(bot), user_messages=-int(not bot)):
+        return
+    if not bot:
+        _apply_subject(message.user_id, _subject_id(detect_subject(message.message)), chat_messages=-1)
+
+
+def session_created(session):
+    _apply(session.user_id, chat_sessions=1)
+
+
+def session_deleted(session):
+    _apply(session.user_id, rebuild=False, chat_sessions=-1)
+
+
+def video_saved(video, created):
+    previous = getattr(video, '_loaded_status', None)
+    video._loaded_status = video.status
+    completed = video.status == 'completed' and previous != 'completed'
+
+    if created:
+        if not _apply(video.user_id, total_videos=1, completed_videos=int(completed)):
+            return
+    elif completed:
+        if not _apply(video.user_id, completed_videos=1):
+            return
+    if completed:
+        _add_activity(video.user_id, 'video', f'Video oluşturuldu: {video.title}')
+
+
+def video_deleted(video):
+    _apply(video.user_id, rebuild=False, total_videos=-1, completed_videos=-int(video.status == 'completed'))
+
+
+def progress_saved(progress, created):
+    previous = bool(getattr(progress, '_loaded_is_completed', False))
+    progress._loaded_is_completed = progress.is_completed
+    if progress.is_completed == previous:
+        return
+
+    delta = 1 if progress.is_completed else -1
+    if not _apply(progress.user_id, completed_solutions=delta):
+        return
+    solution = Solution.objects.filter(pk=progress.solution_id).values('subject_id', 'title').first()
+    if solution:
+        _apply_subject(progress.user_id, solution['subject_id'], completed_solutions=delta)
+        if progress.is_completed:
+            _add_activity(progress.user_id, 'completion', f"Çözüm tamamlandı: {solution['title']}")
+
+
+def progress_deleted(progress):
+    if not progress.is_completed:
+        return
+    if _apply(progress.user_id, rebuild=False, completed_solutions=-1):
+        subject_id = Solution.objects.filter(pk=progress.solution_id).values_list('subject_id', flat=True).first()
+        _apply_subject(progress.user_id, subject_id, completed_solutions=-1)
@@ -1,3 +1,498 @@
-from django.test import TestCase
+import io
+import gzip
+import json
+import tempfile
+import importlib
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import DatabaseError
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from member.models import ChatMessage
+from . import exporters, search, stats, utils
+from .counters import CounterBuffer
+from .models import ChatSession, ChatVideo, EducationSession, Subject, TopicContent, UserActivity
+from .resilience import CircuitBreaker
+
+
+class NormalizeTextTests(SimpleTestCase):
+    """Türkçe büyük/küçük harf ve aksan katlama"""
+
+    def test_turkish_dotted_and_dotless_i(self):
+        self.assertEqual(search.normalize_text('IŞIK'), 'isik')
+        self.assertEqual(search.normalize_text('Işık'), 'isik')
+        self.assertEqual(search.normalize_text('ışık'), 'isik')
+        self.assertEqual(search.normalize_text('İstanbul'), 'istanbul')
+        self.assertEqual(search.normalize_text('istanbul'), 'istanbul')
+
+    def test_diacritics_and_punctuation(self):
+        self.assertEqual(search.normalize_text('Türev, nasıl ALINIR?'), 'turev nasil alinir')
+        self.assertEqual(search.normalize_text('Çözüm: Şekil-Öğrenci (âîû)'), 'cozum sekil ogrenci aiu')
+        self.assertEqual(search.normalize_text('  x² + 3x  '), 'x 3x')
+
+    def test_empty_input(self):
+        self.assertEqual(search.normalize_text(None), '')
+        self.assertEqual(search.normalize_text('?!'), '')
+
+    def test_migration_copy_matches(self):
+        migration = importlib.import_module('core.migrations.0002_chat_message_search')
+        for text in ('IŞIK İstanbul ışık', 'Türev, nasıl ALINIR?', 'Çözüm: Şekil-Öğrenci (âîû)', None):
+            self.assertEqual(migration.normalize_text(text), search.normalize_text(text))
+
+
+class SearchMessagesTests(TestCase):
+
+    def setUp(self):
+        search._backend_cache.clear()
+        self.user = User.objects.create_user('ayse', password='x')
+        self.other = User.objects.create_user('zeynep', password='x')
+        self.derivative = ChatMessage.objects.create(user=self.user, message='Türev nasıl alınır?')
+        self.light = ChatMessage.objects.create(user=self.user, message='IŞIK hızı nedir')
+        self.chemistry = ChatMessage.objects.create(user=self.user, message='Kimya sorusu')
+        ChatMessage.objects.create(user=self.other, message='Türev sorusu')
+
+    def tearDown(self):
+        search._backend_cache.clear()
+
+    def _require_fts(self):
+        if search._backend() != 'sqlite':
+            self.skipTest('SQLite FTS5 indeksi kullanılamıyor')
+
+    def test_fts_matches_folded_prefixes_for_owner_only(self):
+        self._require_fts()
+        self.assertEqual(search.search_messages(self.user, ['türev']), [self.derivative])
+        self.assertEqual(search.search_messages(self.user, ['TÜR']), [self.derivative])
+        self.assertEqual(search.search_messages(self.user, ['ışık']), [self.light])
+        self.assertEqual(search.search_messages(self.user, ['isik']), [self.light])
+        self.assertEqual(search.count_messages(self.user, ['türev', 'kimya']), 2)
+        self.assertEqual(search.search_messages(self.user, ['fizik']), [])
+
+    def test_fts_index_follows_updates_and_deletes(self):
+        self._require_fts()
+        self.chemistry.message = 'Türevin geometrik anlamı'
+        self.chemistry.save()
+        self.assertEqual(search.count_messages(self.user, ['türev']), 2)
+
+        self.derivative.delete()
+        self.assertEqual(search.search_messages(self.user, ['türev']), [self.chemistry])
+
+    def test_fts_respects_limit(self):
+        self._require_fts()
+        self.assertEqual(len(search.search_messages(self.user, ['türev', 'ışık', 'kimya'], limit=2)), 2)
+
+    def test_icontains_fallback(self):
+        with mock.patch.object(search, '_backend', return_value=None):
+            self.assertEqual(search.search_messages(self.user, ['Türev']), [self.derivative])
+            self.assertCountEqual(
+                search.search_messages(self.user, ['Türev', 'Kimya']),
+                [self.chemistry, self.derivative]
+            )
+            self.assertEqual(len(search.search_messages(self.user, ['Türev', 'Kimya'], limit=1)), 1)
+            self.assertEqual(search.count_messages(self.user, ['sorusu']), 1)
+
+    def test_empty_keywords(self):
+        self.assertEqual(search.search_messages(self.user, ['?']), [])
+        self.assertEqual(search.count_messages(self.user, []), 0)
+
+
+class ActivityPruneTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('ayse', password='x')
+        # İlk mesaj istatistik satırını kaynak tablolardan oluşturur; akış bundan sonra eklemelerle büyür
+        ChatMessage.objects.create(user=self.user, message='Soru 0')
+
+    @mock.patch.object(stats, 'ACTIVITY_PRUNE_SLACK', 3)
+    @mock.patch.object(stats, 'ACTIVITY_KEEP', 5)
+    def test_activity_feed_is_trimmed_on_insert(self):
+        counts = []
+        for i in range(1, 20):
+            ChatMessage.objects.create(user=self.user, message=f'Soru {i}')
+            counts.append(UserActivity.objects.filter(user=self.user).count())
+
+        # Akış KEEP + SLACK'i aşınca KEEP'e kırpılır, arada silme yapılmaz
+        self.assertLessEqual(max(counts), 8)
+        self.assertEqual(counts[:7], [2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(counts[7], 5)
+
+        latest = UserActivity.objects.filter(user=self.user).first()
+        self.assertTrue(latest.description.startswith('Chat: Soru 19'))
+
+    def test_prune_activities_keeps_newest(self):
+        for i in range(1, 5):
+            ChatMessage.objects.create(user=self.user, message=f'Soru {i}')
+
+        self.assertEqual(stats.prune_activities(self.user.pk, keep=2), 3)
+        descriptions = list(UserActivity.objects.filter(user=self.user).values_list('description', flat=True))
+        self.assertEqual(len(descriptions), 2)
+        self.assertTrue(descriptions[0].startswith('Chat: Soru 4'))
+        self.assertTrue(descriptions[1].startswith('Chat: Soru 3'))
+
+
+class ChatExportTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('ayse', password='x', first_name='Ayşe', last_name='Yılmaz')
+        for index in range(3):
+            session = ChatSession.objects.create(user=self.user, title='' if index == 0 else f'Oturum {index}')
+            ChatMessage.objects.create(user=self.user, session=session, message=f'Soru {index}: "türev" nedir?')
+            ChatMessage.objects.create(user=self.user, session=session, message=f'Yanıt {index}', is_bot_response=True)
+            if index == 1:
+                ChatVideo.objects.create(
+                    fastapi_request_id=f'request-{index}', session=session, user=self.user,
+                    title='Video Çözüm', chat_messages_json='[]', message_up_to_id='1', status='completed'
+                )
+        # Başka kullanıcının verisi dışa aktarıma girmez
+        other = User.objects.create_user('zeynep', password='x')
+        ChatMessage.objects.create(
+            user=other, session=ChatSession.objects.create(user=other), message='Başka soru'
+        )
+
+    def _legacy_document(self):
+        """Eski export_chat_history görünümünün ürettiği belge"""
+        sender = self.user.get_full_name() or self.user.username
+        sessions = ChatSession.objects.filter(user=self.user).order_by('-created_at')
+        return {
+            'user': self.user.username,
+            'total_sessions': sessions.count(),
+            'sessions': [
+                {
+                    'session_id': str(session.id),
+                    'title': session.title or f'Oturum {session.get_short_id()}',
+                    'created_at': session.created_at.isoformat(),
+                    'updated_at': session.updated_at.isoformat(),
+                    'message_count': session.messages.count(),
+                    'video_count': session.videos.count(),
+                    'messages': [
+                        {
+                            'id': message.id,
+                            'message': message.message,
+                            'is_bot_response': message.is_bot_response,
+                            'created_at': message.created_at.isoformat(),
+                            'sender': 'AI Assistant' if message.is_bot_response else sender
+                        }
+                        for message in session.messages.order_by('created_at')
+                    ],
+                    'videos': [
+                        {
+                            'id': str(video.id),
+                            'title': video.title,
+                            'status': video.status,
+                            'duration': video.get_duration_display(),
+                            'file_size_mb': video.file_size_mb,
+                            'created_at': video.created_at.isoformat()
+                        }
+                        for video in session.videos.order_by('created_at')
+                    ]
+                }
+                for session in sessions
+            ]
+        }
+
+    def _export(self, fmt, **kwargs):
+        return ''.join(exporters.iter_chat_export(self.user, fmt, **kwargs))
+
+    def test_json_matches_legacy_document(self):
+        # batch_size=2 ile oturumlar iki gruba bölünür
+        for batch_size in (1, 2, 100):
+            document = json.loads(self._export('json', batch_size=batch_size))
+            self.assertIsNotNone(document.pop('export_date'))
+            self.assertEqual(document, self._legacy_document())
+
+    def test_json_without_sessions(self):
+        document = json.loads(''.join(exporters.iter_chat_export(User.objects.create_user('bos'), 'json')))
+        self.assertEqual(document['sessions'], [])
+        self.assertEqual(document['total_sessions'], 0)
+
+    def test_ndjson_lines_parse(self):
+        lines = self._export('ndjson', batch_size=2).splitlines()
+        records = [json.loads(line) for line in lines]
+
+        header, sessions = records[0], records[1:]
+        self.assertEqual(header['type'], 'export')
+        self.assertEqual(header['total_sessions'], 3)
+        self.assertEqual([record['type'] for record in sessions], ['session'] * 3)
+
+        legacy = self._legacy_document()['sessions']
+        self.assertEqual([{k: v for k, v in record.items() if k != 'type'} for record in sessions], legacy)
+
+    def test_gzip_stream_decompresses(self):
+        for fmt in exporters.EXPORT_FORMATS:
+            chunks = list(exporters.iter_chat_export(self.user, fmt, batch_size=1))
+            compressed = b''.join(exporters.encode_chunks(iter(chunks), compress=True))
+            self.assertEqual(gzip.decompress(compressed).decode('utf-8'), ''.join(chunks))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self._export('xml')
+
+    def test_export_view_streams_gzip_ndjson(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('core:export_chat_history'), {'format': 'ndjson', 'gzip': '1'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertTrue(response['Content-Disposition'].endswith('.ndjson.gz"'))
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)['type'] for line in lines], ['export'] + ['session'] * 3)
+
+        self.assertEqual(self.client.get(reverse('core:export_chat_history'), {'format': 'xml'}).status_code, 400)
+
+    def test_written_export_is_served_only_to_owner(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(CHAT_EXPORT_DIR=directory):
+            export_id = '0' * 32
+            path = exporters.write_export(self.user, export_id, 'json', compress=True)
+            self.assertEqual(exporters.export_path(self.user, export_id), path)
+            self.assertFalse(list(path.parent.glob('*.tmp')))
+
+            document = json.loads(gzip.decompress(path.read_bytes()))
+            document.pop('export_date')
+            self.assertEqual(document, self._legacy_document())
+
+            url = reverse('core:download_chat_export', args=[export_id])
+            self.client.force_login(User.objects.get(username='zeynep'))
+            self.assertEqual(self.client.get(url).status_code, 404)
+            self.client.force_login(self.user)
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), path.read_bytes())
+            response.close()
+
+
+class FakeAPIError(Exception):
+    def __init__(self, code):
+        super().__init__(f'{code} error')
+        self.code = code
+
+
+class FakeModels:
+    def __init__(self, errors):
+        self.errors = errors
+        self.calls = []
+
+    def _call(self, model):
+        self.calls.append(model)
+        error = self.errors.get(model)
+        if error:
+            raise error
+
+    def generate_content(self, model, contents, config):
+        self._call(model)
+        return mock.Mock(text=f'{model} yanıtı')
+
+    def generate_content_stream(self, model, contents, config):
+        self._call(model)
+        return iter([mock.Mock(text='parça')])
+
+
+class GeminiFailoverTests(SimpleTestCase):
+
+    def _service(self, errors):
+        registry = utils.ModelHealthRegistry(['birinci', 'ikinci'], failure_threshold=2)
+        with mock.patch.object(utils, 'initialize_gemini_client', return_value=mock.Mock(models=FakeModels(errors))), \
+                mock.patch.object(utils, 'get_model_health_registry', return_value=registry):
+            service = utils.GeminiChatService()
+        service._build_contents = mock.Mock(return_value=[])
+        service._build_config = mock.Mock(return_value=None)
+        return service, registry
+
+    def test_transient_error_classification(self):
+        for error in (FakeAPIError(500), FakeAPIError(503), FakeAPIError(429), TimeoutError(), ConnectionResetError()):
+            self.assertTrue(utils.is_transient_error(error), error)
+        for error in (FakeAPIError(400), FakeAPIError(403), FakeAPIError(404), ValueError('x')):
+            self.assertFalse(utils.is_transient_error(error), error)
+
+    def test_transient_error_fails_over_and_counts(self):
+        service, registry = self._service({'birinci': FakeAPIError(503)})
+
+        self.assertEqual(service.generate_response('merhaba'), 'ikinci yanıtı')
+        self.assertEqual(list(service.generate_response_stream('merhaba')), ['parça'])
+        self.assertEqual(registry.breakers['birinci'].state, CircuitBreaker.OPEN)
+        self.assertEqual(registry.breakers['ikinci'].state, CircuitBreaker.CLOSED)
+
+    def test_client_error_is_surfaced_without_failover(self):
+        service, registry = self._service({'birinci': FakeAPIError(400)})
+
+        for _ in range(3):
+            self.assertIn('400 error', service.generate_response('merhaba'))
+            self.assertIn('400 error', ''.join(service.generate_response_stream('merhaba')))
+        self.assertEqual(service.client.models.calls, ['birinci'] * 6)
+        self.assertEqual(registry.breakers['birinci'].state, CircuitBreaker.CLOSED)
+
+    def test_client_error_releases_half_open_trial(self):
+        service, registry = self._service({'birinci': FakeAPIError(400)})
+        breaker = registry.breakers['birinci']
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.reset_timeout = 0
+
+        service.generate_response('merhaba')
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+
+
+class FakeCounted:
+    def __init__(self, pk):
+        self.pk = pk
+        self.view_count = 0
+        self.download_count = 0
+        self.last_accessed_at = None
+
+
+class FakeOtherCounted(FakeCounted):
+    pass
+
+
+def _plain(deltas):
+    return {key: dict(fields) for key, fields in deltas.items()}
+
+
+class CounterBufferTests(SimpleTestCase):
+
+    def test_increments_are_batched_per_model_and_pk(self):
+        buffer = CounterBuffer(flush_interval=60, flush_threshold=1000)
+        first, second, other = FakeCounted(1), FakeCounted(2), FakeOtherCounted(1)
+        for _ in range(3):
+            buffer.increment(first, 'view_count')
+        buffer.increment(first, 'download_count')
+        buffer.increment(second, 'view_count')
+        buffer.increment(other, 'view_count', amount=5)
+
+        self.assertEqual(first.view_count, 3)
+        self.assertEqual(buffer.pending(first, 'view_count'), 3)
+        self.assertEqual(buffer.pending(other, 'download_count'), 0)
+
+        with mock.patch.object(buffer, '_write') as write:
+            self.assertEqual(buffer.flush(), 3)
+        deltas, touches = write.call_args[0]
+        self.assertEqual(_plain(deltas), {
+            (FakeCounted, 1): {'view_count': 3, 'download_count': 1},
+            (FakeCounted, 2): {'view_count': 1},
+            (FakeOtherCounted, 1): {'view_count': 5},
+        })
+        self.assertEqual(touches, {})
+        self.assertEqual(buffer.pending(first, 'view_count'), 0)
+        self.assertEqual(buffer.snapshot()['flushed_rows'], 3)
+
+        with mock.patch.object(buffer, '_write') as write:
+            self.assertEqual(buffer.flush(), 0)
+        write.assert_not_called()
+
+    def test_failed_write_puts_deltas_back(self):
+        buffer = CounterBuffer(flush_interval=60, flush_threshold=1000)
+        item = FakeCounted(1)
+        earlier, later = timezone.now(), timezone.now() + timedelta(seconds=1)
+        buffer.increment(item, 'view_count', last_accessed_at=earlier)
+
+        with mock.patch.object(buffer, '_write', side_effect=DatabaseError('locked')):
+            with self.assertRaises(DatabaseError):
+                buffer.flush()
+        self.assertEqual(buffer.pending(item, 'view_count'), 1)
+        self.assertEqual(buffer.snapshot()['flush_errors'], 1)
+
+        # Başarısız yazmadan sonra gelen dokunuşlar geri konan eski değeri ezer
+        buffer.increment(item, 'view_count', last_accessed_at=later)
+        with mock.patch.object(buffer, '_write') as write:
+            buffer.flush()
+        deltas, touches = write.call_args[0]
+        self.assertEqual(_plain(deltas), {(FakeCounted, 1): {'view_count': 2}})
+        self.assertEqual(touches, {(FakeCounted, 1): {'last_accessed_at': later}})
+        self.assertEqual(item.last_accessed_at, later)
+
+    def test_zero_interval_writes_immediately(self):
+        buffer = CounterBuffer(flush_interval=0)
+        item = FakeCounted(7)
+        now = timezone.now()
+        with mock.patch.object(buffer, '_write') as write:
+            buffer.increment(item, 'view_count', last_accessed_at=now)
+        write.assert_called_once_with(
+            {(FakeCounted, 7): {'view_count': 1}},
+            {(FakeCounted, 7): {'last_accessed_at': now}}
+        )
+        self.assertEqual(buffer.pending(item, 'view_count'), 0)
+
+        buffer.start()
+        self.assertIsNone(buffer._thread)
+
+    def test_threshold_wakes_flush_thread(self):
+        buffer = CounterBuffer(flush_interval=60, flush_threshold=2)
+        buffer.increment(FakeCounted(1), 'view_count')
+        self.assertFalse(buffer._flush_event.is_set())
+        buffer.increment(FakeCounted(2), 'view_count')
+        self.assertTrue(buffer._flush_event.is_set())
+
+
+class CounterBufferDatabaseTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('ayse', password='x')
+        self.video = ChatVideo.objects.create(
+            fastapi_request_id='request-1', session=ChatSession.objects.create(user=self.user), user=self.user,
+            title='Video Çözüm', chat_messages_json='[]', message_up_to_id='1', status='processing'
+        )
+        self.buffer = CounterBuffer(flush_interval=60, flush_threshold=1000)
+        patcher = mock.patch('core.models.get_counter_buffer', return_value=self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_concurrent_instances_do_not_lose_increments(self):
+        # Aynı satırı okuyan iki istek
+        first = ChatVideo.objects.get(pk=self.video.pk)
+        second = ChatVideo.objects.get(pk=self.video.pk)
+        first.increment_view_count()
+        second.increment_view_count()
+        second.increment_download_count()
+
+        self.buffer.flush()
+        self.video.refresh_from_db()
+        self.assertEqual((self.video.view_count, self.video.download_count), (2, 1))
+        self.assertEqual(ChatVideo.objects.get(pk=self.video.pk).live_count('view_count'), 2)
+
+    def test_flush_writes_every_model_and_touch_fields(self):
+        topic = TopicContent.objects.create(
+            subject=Subject.objects.create(name='Matematik'), title='Türev', description='-', content='-',
+            created_by=self.user
+        )
+        session = EducationSession.objects.create(user=self.user, topic=topic, title='Türev')
+        topic.increment_view_count()
+        session.increment_view_count()
+        session.increment_view_count()
+        self.video.increment_download_count()
+        touched_at = session.last_accessed_at
+
+        self.assertEqual(self.buffer.flush(), 3)
+        topic.refresh_from_db()
+        session.refresh_from_db()
+        self.video.refresh_from_db()
+        self.assertEqual(topic.view_count, 1)
+        self.assertEqual((session.view_count, session.last_accessed_at), (2, touched_at))
+        self.assertEqual(self.video.download_count, 1)
+
+    def test_status_update_keeps_flushed_counters(self):
+        stale = ChatVideo.objects.get(pk=self.video.pk)
+        self.video.increment_view_count()
+        self.buffer.flush()
+
+        stale.update_from_fastapi_status({'status': 'completed', 'video_urls': {'api': '/api/video/request-1'}})
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.status, 'completed')
+        self.assertEqual(self.video.video_url, '/api/video/request-1')
+        self.assertEqual(self.video.view_count, 1)
+
+
+class BenchChatWritesTests(TransactionTestCase):
+
+    def test_bench_runs_on_fresh_database_and_cleans_up(self):
+        # Test veritabanı paylaşımlı önbellekli bellek içi SQLite'tır (tablo kilitleri); eşzamanlılık
+        # ölçümü dosya veritabanında yapılır, burada komutun uçtan uca çalıştığı doğrulanır
+        output = io.StringIO()
+        call_command('bench_chat_writes', streams=1, turns=2, stdout=output)
+
+        self.assertIn('Tamamlanan tur: 2/2', output.getvalue())
+        self.assertFalse(User.objects.filter(username='bench_chat_writes').exists())
+        self.assertFalse(ChatMessage.objects.exists())
@@ -19,6 +19,7 @@ urlpatterns = [
     path('chat/session/<uuid:session_id>/continue/', views.continue_chat_session, name='continue_chat_session'),
     path('chat/history/', views.chat_history, name='chat_history'),
     path('chat/export/', views.export_chat_history, name='export_chat_history'),
+    path('chat/export/<str:export_id>/', views.download_chat_export, name='download_chat_export'),
     
     # Video URLs - YENİ
     path('chat/video/generate/', views.generate_chat_video, name='generate_chat_video'),
@@ -27,6 +28,7 @@ urlpatterns = [
     path('video/<uuid:video_id>/download/', views.download_chat_video, name='download_chat_video'),
     path('video/<uuid:video_id>/stream/', views.stream_chat_video, name='stream_chat_video'),
     path('video/<uuid:video_id>/delete/', views.delete_chat_video, name='delete_chat_video'),
+    path('video/webhook/', views.video_status_webhook, name='video_status_webhook'),
     path('session/<uuid:session_id>/videos/', views.get_session_videos, name='get_session_videos'),
     
     # Solution URLs
@@ -42,6 +44,9 @@ urlpatterns = [
     # API URLs
     path('api/user-stats/', views.get_user_stats, name='user_stats'),
     path('api/chat-sessions/', views.get_chat_sessions_api, name='chat_sessions_api'),
+    path('api/model-health/', views.model_health, name='model_health'),
+    path('api/video-service-health/', views.video_service_health, name='video_service_health'),
+    path('api/counter-health/', views.counter_health, name='counter_health'),
     
     # Topic URLs
     path('topics/', views.topic_tutorial, name='topic_tutorial'),
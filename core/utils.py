@@ -4,6 +4,10 @@ from django.conf import settings
 import base64
 from PIL import Image
 import io
+import threading
+import time
+
+from .resilience import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +25,37 @@ except ImportError as e:
     logger.error(f"Google GenAI library not available: {e}")
     logger.error("Please install: pip install google-genai")
 
+# Devre kesiciye sayılan, geçici kabul edilen hatalar (httpx, google-genai bağımlılığıdır)
+TRANSIENT_EXCEPTIONS = (TimeoutError, ConnectionError)
+try:
+    import httpx
+    TRANSIENT_EXCEPTIONS += (httpx.TransportError,)
+except ImportError:
+    pass
+
+def is_transient_error(error):
+    """
+    Hatanın modelin/servisin geçici sorunu olup olmadığını döndür.
+
+    Sadece 5xx, 429, zaman aşımı ve bağlantı hataları geçicidir; 4xx gibi
+    istemci hataları başka modelde de tekrarlanacağı için devre kesiciye
+    sayılmaz ve yedek modele geçilmez.
+    """
+    code = getattr(error, 'code', None)
+    if not isinstance(code, int):
+        code = getattr(error, 'status_code', None)
+    if isinstance(code, int):
+        return code >= 500 or code == 429
+    return isinstance(error, TRANSIENT_EXCEPTIONS)
+
+# Öncelik sırasına göre denenen modeller
+GEMINI_MODELS = [
+    'gemini-2.5-flash',
+    'gemini-2.5-pro',
+    'gemini-1.5-flash',
+    'gemini-1.5-pro'
+]
+
 def initialize_gemini_client():
     """Gemini client'ını başlat"""
     global GEMINI_CLIENT
@@ -52,47 +87,137 @@ def initialize_gemini_client():
         logger.error(f"Failed to initialize Gemini client: {e}")
         return None
 
-class GeminiChatService:
-    def __init__(self):
-        self.client = initialize_gemini_client()
-        # Güncel modelleri dene
-        self.models = [
-            'gemini-2.5-flash',
-            'gemini-2.5-pro',
-            'gemini-1.5-flash',
-            'gemini-1.5-pro'
-        ]
-        self.current_model = self.models[0]  # Varsayılan model
-    
-    def _get_working_model(self):
-        """Çalışan bir model bul"""
-        if not self.client:
-            return None
-            
+class ModelHealthRegistry:
+    """
+    Süreç genelinde Gemini modellerinin sağlık durumunu tutar.
+
+    Her model için bir devre kesici bulunur; istekler sağlıklı modeller
+    arasında öncelik sırasıyla denenir. Arka plandaki thread, ücretsiz bir
+    metadata çağrısıyla (models.get) modelleri periyodik olarak ya da bir
+    hata sonrasında hemen yeniden kontrol eder.
+    """
+
+    def __init__(self, models, refresh_interval=300, failure_threshold=2, reset_timeout=60):
+        self.models = list(models)
+        self.refresh_interval = refresh_interval
+        self.breakers = {
+            model: CircuitBreaker(model, failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+            for model in self.models
+        }
+        self.last_refresh_at = None
+        self._refresh_event = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def start(self):
+        """Arka plan yenileme thread'ini başlat (bir kez)"""
+        with self._thread_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._refresh_loop,
+                name='gemini-model-health',
+                daemon=True
+            )
+            self._thread.start()
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Model health refresh error: {e}")
+            self._refresh_event.wait(self.refresh_interval)
+            self._refresh_event.clear()
+
+    def request_refresh(self):
+        """Bir sonraki yenilemeyi beklemeden kontrol iste"""
+        self._refresh_event.set()
+
+    def refresh(self):
+        """
+        Modellerin erişilebilirliğini üretim yapmadan kontrol et.
+
+        Geçici hatayla başarısız kontrol normal hata gibi sayılır (devre eşik
+        aşılınca açılır); istemci hataları (4xx) devreyi etkilemez.
+        Açık devrenin bekleme süresi dolduysa kontrol, kullanıcı isteği yerine
+        deneme isteği olur ve başarılıysa devreyi kapatır; kapalı devrede
+        başarılı kontrol, gerçek üretim hatalarının sayacını sıfırlamaz.
+        """
+        client = initialize_gemini_client()
+        if not client:
+            return
+
         for model in self.models:
+            breaker = self.breakers[model]
+            trial = breaker.state != CircuitBreaker.CLOSED
+            if trial and not breaker.allow_request():
+                continue
             try:
-                # Basit bir test yap
-                test_contents = [
-                    types.Content(
-                        role="user",
-                        parts=[types.Part.from_text(text="test")]
-                    )
-                ]
-                
-                response = self.client.models.generate_content(
-                    model=model,
-                    contents=test_contents
-                )
-                
-                if response.text:
-                    logger.info(f"Working model found: {model}")
-                    self.current_model = model
-                    return model
+                client.models.get(model=model)
             except Exception as e:
-                logger.warning(f"Model {model} not working: {e}")
+                logger.warning(f"Model {model} health check failed: {e}")
+                if is_transient_error(e):
+                    breaker.record_failure(e)
+                else:
+                    breaker.release_trial()
                 continue
-        
-        return None
+            if trial:
+                breaker.record_success()
+        self.last_refresh_at = time.time()
+
+    def candidates(self):
+        """İstek kabul eden modelleri öncelik sırasıyla (tembel) döndür"""
+        for model in self.models:
+            if self.breakers[model].allow_request():
+                yield model
+
+    def record_success(self, model):
+        self.breakers[model].record_success()
+
+    def record_failure(self, model, error=None):
+        logger.warning(f"Model {model} failed: {error}")
+        self.breakers[model].record_failure(error)
+        self.request_refresh()
+
+    def record_client_error(self, model, error=None):
+        """Devreye sayılmayan (geçici olmayan) hatayı kaydet"""
+        logger.warning(f"Model {model} rejected request: {error}")
+        self.breakers[model].release_trial()
+
+    def snapshot(self):
+        """İzleme için tüm modellerin durumunu döndür"""
+        models = [self.breakers[model].snapshot() for model in self.models]
+        preferred = next((m['name'] for m in models if m['state'] == CircuitBreaker.CLOSED), None)
+        return {
+            'preferred_model': preferred,
+            'models': models,
+            'last_refresh_at': self.last_refresh_at,
+            'refresh_interval': self.refresh_interval,
+        }
+
+# Global instance
+_model_health_registry = None
+_model_health_lock = threading.Lock()
+
+def get_model_health_registry():
+    """Singleton model sağlık kaydı (ilk kullanımda yenileme thread'i başlar)"""
+    global _model_health_registry
+    with _model_health_lock:
+        if _model_health_registry is None:
+            _model_health_registry = ModelHealthRegistry(
+                getattr(settings, 'GEMINI_MODELS', GEMINI_MODELS),
+                refresh_interval=getattr(settings, 'GEMINI_HEALTH_REFRESH_INTERVAL', 300),
+                failure_threshold=getattr(settings, 'GEMINI_BREAKER_THRESHOLD', 2),
+                reset_timeout=getattr(settings, 'GEMINI_BREAKER_RESET_TIMEOUT', 60),
+            )
+            _model_health_registry.start()
+    return _model_health_registry
+
+class GeminiChatService:
+    def __init__(self):
+        self.client = initialize_gemini_client()
+        self.registry = get_model_health_registry()
     
     def _format_chat_history(self, chat_history):
         """Chat geçmişini Gemini formatına dönüştür"""
@@ -181,67 +306,84 @@ Kullanıcı bilgileri:
             parts=[types.Part.from_text(text=f"Sistem: {base_instruction}")]
         )
     
+    def _build_contents(self, message, user_context=None, chat_history=None, image_file=None):
+        """İstek içeriğini oluştur (tüm model denemelerinde ortak)"""
+        contents = []
+        
+        # Sistem mesajını ekle
+        system_message = self._create_system_message(user_context)
+        contents.append(system_message)
+        
+        # Chat geçmişini ekle
+        if chat_history:
+            formatted_history = self._format_chat_history(chat_history)
+            contents.extend(formatted_history)
+        
+        # Mevcut mesajı hazırla
+        message_parts = [types.Part.from_text(text=message)]
+        
+        # Görsel varsa ekle
+        if image_file:
+            image_part = self._prepare_image_content(image_file)
+            if image_part:
+                message_parts.append(image_part)
+        
+        contents.append(types.Content(
+            role="user",
+            parts=message_parts
+        ))
+        return contents
+    
+    def _build_config(self, model):
+        """Modele göre konfigürasyon oluştur"""
+        return types.GenerateContentConfig(
+            temperature=0.7,
+            max_output_tokens=1000,
+            top_p=0.8,
+            top_k=40,
+            thinking_config=types.ThinkingConfig(thinking_budget=-1) if model.startswith('gemini-2.5') else None
+        )
+    
     def generate_response(self, message, user_context=None, chat_history=None, image_file=None):
         """Tek seferlik yanıt oluştur"""
         if not self.client:
             return "❌ AI servisi şu anda kullanılamıyor. API anahtarını kontrol edin."
         
         try:
-            # Çalışan model bul
-            working_model = self._get_working_model()
-            if not working_model:
-                return "❌ Kullanılabilir AI modeli bulunamadı."
-            
-            # İçerik listesini oluştur
-            contents = []
-            
-            # Sistem mesajını ekle
-            system_message = self._create_system_message(user_context)
-            contents.append(system_message)
-            
-            # Chat geçmişini ekle
-            if chat_history:
-                formatted_history = self._format_chat_history(chat_history)
-                contents.extend(formatted_history)
-            
-            # Mevcut mesajı hazırla
-            message_parts = [types.Part.from_text(text=message)]
-            
-            # Görsel varsa ekle
-            if image_file:
-                image_part = self._prepare_image_content(image_file)
-                if image_part:
-                    message_parts.append(image_part)
-            
-            contents.append(types.Content(
-                role="user",
-                parts=message_parts
-            ))
-            
-            # Konfigürasyon
-            config = types.GenerateContentConfig(
-                temperature=0.7,
-                max_output_tokens=1000,
-                top_p=0.8,
-                top_k=40,
-                thinking_config=types.ThinkingConfig(thinking_budget=-1) if working_model.startswith('gemini-2.5') else None
-            )
-            
-            response = self.client.models.generate_content(
-                model=working_model,
-                contents=contents,
-                config=config
-            )
-            
-            if response.text:
-                logger.info(f"Generated response with model: {working_model}")
-                return response.text
-            else:
-                return "🤔 AI'dan yanıt alınamadı. Lütfen tekrar deneyin."
-            
+            contents = self._build_contents(message, user_context, chat_history, image_file)
         except Exception as e:
             logger.error(f"Gemini API error: {e}")
             return f"⚠️ Hata oluştu: {str(e)}"
+        
+        last_error = None
+        # Sağlıklı modelleri sırayla dene, geçici hata alınırsa bir sonrakine geç
+        for model in self.registry.candidates():
+            try:
+                response = self.client.models.generate_content(
+                    model=model,
+                    contents=contents,
+                    config=self._build_config(model)
+                )
+            except Exception as e:
+                if not is_transient_error(e):
+                    # İstemci hatası diğer modellerde de tekrarlanır
+                    self.registry.record_client_error(model, e)
+                    logger.error(f"Gemini API error: {e}")
+                    return f"⚠️ Hata oluştu: {str(e)}"
+                self.registry.record_failure(model, e)
+                last_error = e
+                continue
+            
+            self.registry.record_success(model)
+            if response.text:
+                logger.info(f"Generated response with model: {model}")
+                return response.text
+            return "🤔 AI'dan yanıt alınamadı. Lütfen tekrar deneyin."
+        
+        if last_error:
+            logger.error(f"Gemini API error: {last_error}")
+            return f"⚠️ Hata oluştu: {str(last_error)}"
+        return "❌ Kullanılabilir AI modeli bulunamadı."
     
     def generate_response_stream(self, message, user_context=None, chat_history=None, image_file=None):
         """Stream yanıt oluştur"""
@@ -250,72 +392,75 @@ Kullanıcı bilgileri:
             return
         
         try:
-            # Çalışan model bul
-            working_model = self._get_working_model()
-            if not working_model:
-                yield "❌ Kullanılabilir AI modeli bulunamadı."
-                return
-            
-            logger.info(f"Starting stream with model: {working_model}")
-            
-            # İçerik listesini oluştur
-            contents = []
-            
-            # Sistem mesajını ekle
-            system_message = self._create_system_message(user_context)
-            contents.append(system_message)
-            
-            # Chat geçmişini ekle
-            if chat_history:
-                formatted_history = self._format_chat_history(chat_history)
-                contents.extend(formatted_history)
-            
-            # Mevcut mesajı hazırla
-            message_parts = [types.Part.from_text(text=message)]
-            
-            # Görsel varsa ekle
-            if image_file:
-                image_part = self._prepare_image_content(image_file)
-                if image_part:
-                    message_parts.append(image_part)
-            
-            contents.append(types.Content(
-                role="user",
-                parts=message_parts
-            ))
+            contents = self._build_contents(message, user_context, chat_history, image_file)
+        except Exception as e:
+            logger.error(f"Gemini API streaming error: {e}")
+            yield f"⚠️ Stream hatası: {str(e)}"
+            return
+        
+        last_error = None
+        for model in self.registry.candidates():
+            # İlk parça gelene kadar geçici hata alınırsa sıradaki modele geçilebilir
+            try:
+                stream = iter(self.client.models.generate_content_stream(
+                    model=model,
+                    contents=contents,
+                    config=self._build_config(model)
+                ))
+                first_chunk = next(stream, None)
+            except Exception as e:
+                if not is_transient_error(e):
+                    self.registry.record_client_error(model, e)
+                    logger.error(f"Gemini API streaming error: {e}")
+                    yield f"⚠️ Stream hatası: {str(e)}"
+                    return
+                self.registry.record_failure(model, e)
+                last_error = e
+                continue
             
-            # Konfigürasyon
-            config = types.GenerateContentConfig(
-                temperature=0.7,
-                max_output_tokens=1000,
-                top_p=0.8,
-                top_k=40,
-                thinking_config=types.ThinkingConfig(thinking_budget=-1) if working_model.startswith('gemini-2.5') else None
-            )
+            self.registry.record_success(model)
+            logger.info(f"Starting stream with model: {model}")
             
             chunk_count = 0
-            stream = self.client.models.generate_content_stream(
-                model=working_model,
-                contents=contents,
-                config=config
-            )
-            
-            for chunk in stream:
-                if chunk.text:
-                    chunk_count += 1
-                    logger.debug(f"Stream chunk {chunk_count}: {chunk.text[:20]}...")
-                    yield chunk.text
+            try:
+                chunk = first_chunk
+                while chunk is not None:
+                    if chunk.text:
+                        chunk_count += 1
+                        logger.debug(f"Stream chunk {chunk_count}: {chunk.text[:20]}...")
+                        yield chunk.text
+                    chunk = next(stream, None)
+            except Exception as e:
+                # Yanıtın bir kısmı gönderildi, başka modele geçilemez
+                if is_transient_error(e):
+                    self.registry.record_failure(model, e)
+                logger.error(f"Gemini API streaming error: {e}")
+                yield f"⚠️ Stream hatası: {str(e)}"
+                return
             
             logger.info(f"Stream completed. Total chunks: {chunk_count}")
-            
-        except Exception as e:
-            logger.error(f"Gemini API streaming error: {e}")
-            yield f"⚠️ Stream hatası: {str(e)}"
+            return
+        
+        if last_error:
+            logger.error(f"Gemini API streaming error: {last_error}")
+            yield f"⚠️ Stream hatası: {str(last_error)}"
+        else:
+            yield "❌ Kullanılabilir AI modeli bulunamadı."
+
+# Global instance
+_gemini_chat_service = None
+
+def get_gemini_chat_service():
+    """Süreç genelinde tek GeminiChatService örneği"""
+    global _gemini_chat_service
+    if _gemini_chat_service is None or _gemini_chat_service.client is None:
+        _gemini_chat_service = GeminiChatService()
+    return _gemini_chat_service
 
 def get_gemini_response(message, user=None, chat_history=None, image_file=None):
     """Non-streaming response - Ana fonksiyon"""
     try:
-        service = GeminiChatService()
+        service = get_gemini_chat_service()
         
         user_context = None
         if user and user.is_authenticated:
@@ -332,7 +477,7 @@ def get_gemini_response(message, user=None, chat_history=None, image_file=None):
 def get_gemini_response_stream(message, user=None, chat_history=None, image_file=None):
     """Streaming response - Ana fonksiyon"""
     try:
-        service = GeminiChatService()
+        service = get_gemini_chat_service()
         
         user_context = None
         if user and user.is_authenticated:
@@ -356,7 +501,8 @@ def test_gemini_api():
             'success': True,
             'response': response,
             'client_available': GEMINI_CLIENT is not None,
-            'library_available': GEMINI_AVAILABLE
+            'library_available': GEMINI_AVAILABLE,
+            'model_health': get_model_health_registry().snapshot()
         }
     except Exception as e:
         return {
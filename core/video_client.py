@@ -0,0 +1,188 @@
+import random
+import threading
+import time
+import logging
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from .resilience import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Sunucu tarafında geçici olduğu varsayılan durum kodları
+RETRYABLE_STATUS = {502, 503, 504}
+# Tekrar denenmesi yan etki oluşturmayan metotlar
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'DELETE'}
+
+
+class VideoServiceUnavailable(requests.exceptions.ConnectionError):
+    """Devre açıkken istek gönderilmeden fırlatılır"""
+
+
+class _OperationMetrics:
+    """Tek bir işlem için sayaçlar ve son gecikme örnekleri"""
+
+    def __init__(self, window=500):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=window)
+
+    def snapshot(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 1)
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'error_rate': round(self.errors / self.requests, 3) if self.requests else 0.0,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+        }
+
+
+class VideoServiceClient:
+    """
+    Video servisi (FastAPI) için paylaşılan HTTP istemcisi.
+
+    Tek bir ``requests.Session`` üzerinden bağlantı havuzu ve keep-alive
+    kullanır. Her çağrının bağlantı/okuma zaman aşımı vardır; idempotent
+    istekler ağ hatası veya 502/503/504 yanıtında jitter'lı geri çekilmeyle
+    tekrar denenir. Art arda hatalarda devre açılır ve istekler servise
+    gitmeden ``VideoServiceUnavailable`` ile reddedilir.
+    """
+
+    def __init__(self, base_url, timeout=(3.05, 30), max_retries=2, backoff=0.5,
+                 pool_size=20, failure_threshold=5, reset_timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker('video-service', failure_threshold, reset_timeout)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+
+    def request(self, method, path, operation=None, timeout=None, **kwargs):
+        """
+        Servise istek gönderir.
+
+        4xx yanıtlar servisin ayakta olduğunu gösterir ve çağırana döner;
+        yalnızca ağ hataları ve 5xx yanıtlar devre kesiciye hata yazar.
+        """
+        method = method.upper()
+        operation = operation or f"{method} {path}"
+        attempts = 1 + (self.max_retries if method in IDEMPOTENT_METHODS else 0)
+
+        for attempt in range(attempts):
+            if not self.breaker.allow_request():
+                self._record(operation, None, error=True)
+                raise VideoServiceUnavailable(f"Video servisi devresi açık ({operation})")
+
+            started = time.monotonic()
+            try:
+                response = self.session.request(
+                    method,
+                    f"{self.base_url}{path}",
+                    timeout=timeout or self.timeout,
+                    **kwargs
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.breaker.record_failure(e)
+                self._record(operation, time.monotonic() - started, error=True)
+                if attempt + 1 >= attempts:
+                    raise
+                self._sleep_before_retry(operation, attempt, e)
+                continue
+
+            elapsed = time.monotonic() - started
+            if response.status_code >= 500:
+                self.breaker.record_failure(f"HTTP {response.status_code}")
+                self._record(operation, elapsed, error=True)
+                if response.status_code in RETRYABLE_STATUS and attempt + 1 < attempts:
+                    response.close()
+                    self._sleep_before_retry(operation, attempt, f"HTTP {response.status_code}")
+                    continue
+            else:
+                self.breaker.record_success()
+                self._record(operation, elapsed)
+            return response
+
+    def _sleep_before_retry(self, operation, attempt, error):
+        # Full jitter: eşzamanlı istemciler aynı anda tekrar denemesin
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        logger.warning(f"Video service {operation} failed ({error}), retrying in {delay:.2f}s")
+        with self._metrics_lock:
+            self._metrics[operation].retries += 1
+        time.sleep(delay)
+
+    def _record(self, operation, elapsed, error=False):
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(operation, _OperationMetrics())
+            metrics.requests += 1
+            if error:
+                metrics.errors += 1
+            if elapsed is not None:
+                metrics.latencies.append(elapsed)
+
+    def create_video(self, form_data):
+        # Yeni render işi başlatır; çift iş oluşmaması için tekrar denenmez
+        return self.request('POST', '/api/create_video', operation='create_video', data=form_data)
+
+    def get_status(self, request_id):
+        return self.request('GET', f'/api/status/{request_id}', operation='status', timeout=(3.05, 10))
+
+    def open_stream(self, request_id, headers=None):
+        """Video akışını açar; okuma zaman aşımı parça başınadır, çağıran kapatmalıdır"""
+        return self.request(
+            'GET', f'/api/stream/{request_id}', operation='stream',
+            headers=headers, stream=True
+        )
+
+    def delete_video(self, request_id):
+        return self.request('DELETE', f'/api/video/{request_id}', operation='delete', timeout=(3.05, 10))
+
+    def snapshot(self):
+        """İzleme için devre durumu ve işlem bazında metrikler"""
+        with self._metrics_lock:
+            operations = {name: metrics.snapshot() for name, metrics in self._metrics.items()}
+        return {
+            'base_url': self.base_url,
+            'breaker': self.breaker.snapshot(),
+            'operations': operations,
+        }
+
+# Global instance
+_video_client = None
+_video_client_lock = threading.Lock()
+
+def get_video_client():
+    """Singleton video servisi istemcisi"""
+    global _video_client
+    with _video_client_lock:
+        if _video_client is None:
+            _video_client = VideoServiceClient(
+                getattr(settings, 'VIDEO_API_BASE_URL', 'http://localhost:8001'),
+                timeout=(
+                    getattr(settings, 'VIDEO_API_CONNECT_TIMEOUT', 3.05),
+                    getattr(settings, 'VIDEO_API_READ_TIMEOUT', 30),
+                ),
+                max_retries=getattr(settings, 'VIDEO_API_MAX_RETRIES', 2),
+                pool_size=getattr(settings, 'VIDEO_API_POOL_SIZE', 20),
+                failure_threshold=getattr(settings, 'VIDEO_API_BREAKER_THRESHOLD', 5),
+                reset_timeout=getattr(settings, 'VIDEO_API_BREAKER_RESET_TIMEOUT', 30),
+            )
+    return _video_client
@@ -1,8 +1,10 @@
 # Path: core/views.py
 
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse, HttpResponse, Http404, StreamingHttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse, HttpResponse, Http404, StreamingHttpResponse, FileResponse
 from django.contrib import messages
 from django.db.models import Q, Count
 from django.core.paginator import Paginator
@@ -11,6 +13,8 @@ from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 import json
+import hmac
+import hashlib
 import uuid
 import logging
 import time
@@ -19,7 +23,12 @@ from datetime import datetime, timedelta
 
 from .models import Subject, Solution, UserSolutionProgress, Notification, Settings, ChatSession, ChatVideo, TopicContent, EducationSession
 from member.models import ChatMessage
-from .utils import get_gemini_response, get_gemini_response_stream
+from .utils import get_gemini_response, get_gemini_response_stream, get_model_health_registry
+from .video_client import get_video_client
+from .counters import get_counter_buffer
+from .search import related_messages, detect_subject
+from . import stats as user_stats
+from . import exporters
 
 logger = logging.getLogger(__name__)
 
@@ -196,9 +205,7 @@ def chat_view(request):
         session=active_session
     ).order_by('-created_at')
     
-    # Pending videoları kontrol et
-    for video in session_videos.filter(status='processing'):
-        video.check_fastapi_status()
+    # Durumlar video servisinin webhook'u ile güncellenir, burada HTTP çağrısı yapılmaz
     
     if request.method == 'POST' and request.headers.get('Content-Type') == 'application/json':
         try:
@@ -368,48 +375,52 @@ def generate_chat_video(request):
                     'error': 'Sohbet içeriği bulunamadı'
                 })
             
-            # FastAPI'ye gönderilecek form data hazırla
-            api_base = getattr(settings, 'VIDEO_API_BASE_URL', 'http://localhost:8001')
+            # Webhook olayları ilk andan itibaren kaydı bulabilsin diye iş kimliği
+            # burada üretilir ve kayıt FastAPI'ye gönderilmeden önce oluşturulur
+            request_id = str(uuid.uuid4())
+            video = ChatVideo.objects.create(
+                fastapi_request_id=request_id,
+                session=session,
+                user=request.user,
+                title=f"Video Çözüm - {session.title or session.get_short_id()}",
+                description=f"Sohbet {session.get_short_id()} için AI destekli video çözümü",
+                video_style=video_options.get('style', 'animated'),
+                duration_preference=video_options.get('duration', 'medium'),
+                speech_speed=video_options.get('speed', 'normal'),
+                has_background_music=video_options.get('background_music', True),
+                chat_messages_json=json.dumps(chat_text_parts),
+                message_up_to_id=str(message_id),
+                status='processing'
+            )
             
-            # Form data oluştur
+            # FastAPI'ye gönderilecek form data oluştur
             form_data = {
                 'text': combined_text,
-                'video_type': video_options.get('video_type', 'solution')
+                'video_type': video_options.get('video_type', 'solution'),
+                'callback_url': getattr(settings, 'VIDEO_WEBHOOK_URL', None),
+                'request_id': request_id,
             }
             
-            logger.info(f"Sending to FastAPI - URL: {api_base}/api/create_video")
+            logger.info("Sending to FastAPI - create_video")
             logger.info(f"Form data keys: {list(form_data.keys())}")
             logger.info(f"Text length: {len(combined_text)} characters")
             
             # FastAPI'ye form data gönder
+            started = False
             try:
-                response = requests.post(
-                    f"{api_base}/api/create_video",
-                    data=form_data,  # JSON değil, form data
-                    timeout=30
-                )
+                response = get_video_client().create_video(form_data)  # JSON değil, form data
                 
                 logger.info(f"FastAPI response status: {response.status_code}")
                 logger.info(f"FastAPI response: {response.text}")
                 
                 if response.status_code == 200:
                     fastapi_data = response.json()
+                    started = True
                     
-                    # Django modelini oluştur
-                    video = ChatVideo.objects.create(
-                        fastapi_request_id=fastapi_data.get('request_id'),
-                        session=session,
-                        user=request.user,
-                        title=f"Video Çözüm - {session.title or session.get_short_id()}",
-                        description=f"Sohbet {session.get_short_id()} için AI destekli video çözümü",
-                        video_style=video_options.get('style', 'animated'),
-                        duration_preference=video_options.get('duration', 'medium'),
-                        speech_speed=video_options.get('speed', 'normal'),
-                        has_background_music=video_options.get('background_music', True),
-                        chat_messages_json=json.dumps(chat_text_parts),
-                        message_up_to_id=str(message_id),
-                        status='processing'
-                    )
+                    # request_id alanını tanımayan eski servis kendi kimliğini üretir
+                    if fastapi_data.get('request_id') and fastapi_data['request_id'] != request_id:
+                        video.fastapi_request_id = fastapi_data['request_id']
+                        video.save(update_fields=['fastapi_request_id'])
                     
                     # Bildirim oluştur
                     Notification.objects.create(
@@ -460,6 +471,10 @@ def generate_chat_video(request):
                     'success': False,
                     'error': f'Video servisi hatası: {str(e)}'
                 })
+            finally:
+                # İş başlatılamadıysa önceden oluşturulan kayıt geri alınır
+                if not started:
+                    video.delete()
                 
         except Exception as e:
             logger.error(f"Video generation error: {str(e)}")
@@ -477,9 +492,6 @@ def chat_video_status(request, video_id):
     try:
         video = get_object_or_404(ChatVideo, id=video_id, user=request.user)
         
-        # FastAPI'den son durumu kontrol et
-        video.check_fastapi_status()
-        
         response_data = {
             'success': True,
             'video': {
@@ -488,8 +500,8 @@ def chat_video_status(request, video_id):
                 'status': video.status,
                 'duration': video.get_duration_display(),
                 'file_size_mb': video.file_size_mb,
-                'view_count': video.view_count,
-                'download_count': video.download_count,
+                'view_count': video.live_count('view_count'),
+                'download_count': video.live_count('download_count'),
                 'created_at': video.created_at.isoformat(),
                 'updated_at': video.updated_at.isoformat(),
                 'urls': {
@@ -500,24 +512,6 @@ def chat_video_status(request, video_id):
             }
         }
         
-        # Tamamlandıysa ve daha önce bildirim gönderilmediyse bildirim gönder
-        if video.status == 'completed':
-            # Daha önce bu video için "tamamlandı" bildirimi gönderilip gönderilmediğini kontrol et
-            notification_exists = video.user.notifications.filter(
-                notification_type='video',
-                message__contains=video.title
-            ).filter(
-                message__contains='tamamlandı'
-            ).exists()
-
-            if not notification_exists:
-                Notification.objects.create(
-                    user=request.user,
-                    title='🎉 Video Hazır!',
-                    message=f'"{video.title}" adlı videonuz hazır. İzleyebilir ve indirebilirsiniz.',
-                    notification_type='video'
-                )
-        
         return JsonResponse(response_data)
         
     except Exception as e:
@@ -528,11 +522,55 @@ def chat_video_status(request, video_id):
         })
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def video_status_webhook(request):
+    """Video servisinden gelen imzalı durum olaylarını işle"""
+    secret = getattr(settings, 'VIDEO_WEBHOOK_SECRET', '')
+    if not secret:
+        logger.error("Video webhook received but VIDEO_WEBHOOK_SECRET is not configured")
+        return JsonResponse({'success': False, 'error': 'Webhook yapılandırılmamış'}, status=503)
+    
+    expected = 'sha256=' + hmac.new(secret.encode(), request.body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, request.headers.get('X-Video-Signature', '')):
+        return JsonResponse({'success': False, 'error': 'Geçersiz imza'}, status=403)
+    
+    try:
+        event = json.loads(request.body)
+        request_id = event['request_id']
+    except (ValueError, KeyError):
+        return JsonResponse({'success': False, 'error': 'Geçersiz olay'}, status=400)
+    
+    video = ChatVideo.objects.filter(fastapi_request_id=request_id).first()
+    if not video:
+        # Kayıt iş gönderilmeden önce oluşturulur; bulunamıyorsa iş başlatılamamış
+        # ve kayıt silinmiş ya da iş Django dışından oluşturulmuştur
+        logger.warning(f"Video webhook for unknown request {request_id} ({event.get('status')}) ignored")
+        return JsonResponse({'success': True, 'ignored': True})
+    
+    previous_status = video.status
+    video.update_from_fastapi_status(event)
+    
+    if video.status == 'completed' and previous_status != 'completed':
+        Notification.objects.create(
+            user=video.user,
+            title='🎉 Video Hazır!',
+            message=f'"{video.title}" adlı videonuz hazır. İzleyebilir ve indirebilirsiniz.',
+            notification_type='video'
+        )
+    
+    logger.info(f"Video webhook processed - {request_id}: {event.get('status')}")
+    return JsonResponse({'success': True, 'status': video.status})
+
+
 @login_required 
 def chat_video_detail(request, video_id):
     """Video detayları ve oynatma"""
     try:
         video = get_object_or_404(ChatVideo, id=video_id, user=request.user)
+        # Bu görüntülenme dahil, henüz yazılmamış artışlarla birlikte
+        view_count = video.live_count('view_count') + 1
+        download_count = video.live_count('download_count')
         video.increment_view_count()
         
         return JsonResponse({
@@ -544,8 +582,8 @@ def chat_video_detail(request, video_id):
                 'status': video.status,
                 'duration': video.get_duration_display(),
                 'file_size_mb': video.file_size_mb,
-                'view_count': video.view_count,
-                'download_count': video.download_count,
+                'view_count': view_count,
+                'download_count': download_count,
                 'created_at': video.created_at.isoformat(),
                 'video_style': video.get_video_style_display(),
                 'urls': {
@@ -612,29 +650,48 @@ def stream_chat_video(request, video_id):
         if video.status != 'completed' or not video.video_url:
             raise Http404("Video bulunamadı")
         
+        # Oynatıcının Range/If-Range başlıklarını FastAPI'ye ilet
+        forward_headers = {}
+        range_header = request.META.get('HTTP_RANGE')
+        if range_header:
+            forward_headers['Range'] = range_header
+            if request.META.get('HTTP_IF_RANGE'):
+                forward_headers['If-Range'] = request.META['HTTP_IF_RANGE']
+        
         # FastAPI'den stream al
-        api_base = getattr(settings, 'VIDEO_API_BASE_URL', 'http://localhost:8001')
-        response = requests.get(
-            f"{api_base}/api/stream/{video.fastapi_request_id}",
-            stream=True
-        )
+        response = get_video_client().open_stream(video.fastapi_request_id, forward_headers)
+        
+        if response.status_code == 416:
+            response.close()
+            unsatisfiable = HttpResponse(status=416)
+            unsatisfiable['Content-Range'] = response.headers.get('Content-Range', '')
+            return unsatisfiable
         
-        if response.status_code != 200:
+        if response.status_code not in (200, 206):
+            response.close()
             raise Http404("Video stream bulunamadı")
         
         # Stream'i client'a aktar
         def generate():
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    yield chunk
+            try:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    if chunk:
+                        yield chunk
+            finally:
+                response.close()
         
-        video.increment_view_count()
+        # İleri sarma istekleri izlenme sayılmaz
+        if not range_header or range_header.replace(' ', '').startswith('bytes=0-'):
+            video.increment_view_count()
         
         streaming_response = StreamingHttpResponse(
             generate(),
-            content_type='video/mp4'
+            status=response.status_code,
+            content_type=response.headers.get('Content-Type', 'video/mp4')
         )
-        streaming_response['Content-Length'] = response.headers.get('Content-Length')
+        for header in ('Content-Length', 'Content-Range', 'ETag', 'Last-Modified'):
+            if response.headers.get(header):
+                streaming_response[header] = response.headers[header]
         streaming_response['Accept-Ranges'] = 'bytes'
         
         return streaming_response
@@ -653,10 +710,6 @@ def get_session_videos(request, session_id):
         
         videos_data = []
         for video in videos:
-            # Pending olan videoların durumunu kontrol et
-            if video.status == 'processing':
-                video.check_fastapi_status()
-            
             videos_data.append({
                 'id': str(video.id),
                 'title': video.title,
@@ -665,7 +718,7 @@ def get_session_videos(request, session_id):
                 'file_size_mb': video.file_size_mb,
                 'created_at': video.created_at.isoformat(),
                 'video_style': video.get_video_style_display(),
-                'view_count': video.view_count,
+                'view_count': video.live_count('view_count'),
                 'urls': {
                     'detail': f'/core/video/{video.id}/',
                     'status': f'/core/video/{video.id}/status/',
@@ -697,13 +750,10 @@ def delete_chat_video(request, video_id):
             
             # FastAPI'den de sil
             try:
-                api_base = getattr(settings, 'VIDEO_API_BASE_URL', 'http://localhost:8001')
-                requests.delete(
-                    f"{api_base}/api/video/{video.fastapi_request_id}",
-                    timeout=10
-                )
-            except:
-                pass  # FastAPI'de silme başarısız olsa da Django'dan sil
+                get_video_client().delete_video(video.fastapi_request_id)
+            except requests.exceptions.RequestException as e:
+                # FastAPI'de silme başarısız olsa da Django'dan sil
+                logger.warning(f"FastAPI video delete failed: {str(e)}")
             
             video.delete()
             
@@ -726,11 +776,9 @@ def delete_chat_video(request, video_id):
 @login_required
 def dashboard(request):
     total_solutions = Solution.objects.count()
-    user_completed = UserSolutionProgress.objects.filter(
-        user=request.user, 
-        is_completed=True
-    ).count()
-    user_messages = ChatMessage.objects.filter(user=request.user).count()
+    stats = user_stats.get_user_stats(request.user)
+    user_completed = stats.completed_solutions
+    user_messages = stats.total_messages
     unread_notifications = Notification.objects.filter(
         user=request.user, 
         is_read=False
@@ -742,7 +790,7 @@ def dashboard(request):
         user=request.user
     ).select_related('solution').order_by('-created_at')[:5]
     
-    total_chat_sessions = ChatSession.objects.filter(user=request.user).count()
+    total_chat_sessions = stats.chat_sessions
     
     context = {
         'total_solutions': total_solutions,
@@ -878,19 +926,15 @@ def chat_history(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    total_sessions = sessions.count()
-    total_messages = ChatMessage.objects.filter(user=request.user).count()
-    user_messages = ChatMessage.objects.filter(user=request.user, is_bot_response=False).count()
-    bot_messages = ChatMessage.objects.filter(user=request.user, is_bot_response=True).count()
-    total_videos = ChatVideo.objects.filter(user=request.user).count()
+    stats = user_stats.get_user_stats(request.user)
     
     context = {
         'sessions': page_obj,
-        'total_sessions': total_sessions,
-        'total_messages': total_messages,
-        'user_messages': user_messages,
-        'bot_messages': bot_messages,
-        'total_videos': total_videos,
+        'total_sessions': stats.chat_sessions,
+        'total_messages': stats.total_messages,
+        'user_messages': stats.user_messages,
+        'bot_messages': stats.bot_messages,
+        'total_videos': stats.total_videos,
         'title': 'Chat Geçmişi'
     }
     
@@ -899,57 +943,48 @@ def chat_history(request):
 
 @login_required
 def export_chat_history(request):
-    sessions = ChatSession.objects.filter(user=request.user).order_by('-created_at')
-    
-    export_data = {
-        'user': request.user.username,
-        'export_date': datetime.now().isoformat(),
-        'total_sessions': sessions.count(),
-        'sessions': []
-    }
-    
-    for session in sessions:
-        messages = ChatMessage.objects.filter(session=session).order_by('created_at')
-        videos = ChatVideo.objects.filter(session=session).order_by('created_at')
-        
-        session_data = {
-            'session_id': str(session.id),
-            'title': session.title or f'Oturum {session.get_short_id()}',
-            'created_at': session.created_at.isoformat(),
-            'updated_at': session.updated_at.isoformat(),
-            'message_count': messages.count(),
-            'video_count': videos.count(),
-            'messages': [],
-            'videos': []
-        }
-        
-        for message in messages:
-            session_data['messages'].append({
-                'id': message.id,
-                'message': message.message,
-                'is_bot_response': message.is_bot_response,
-                'created_at': message.created_at.isoformat(),
-                'sender': 'AI Assistant' if message.is_bot_response else f'{request.user.get_full_name() or request.user.username}'
-            })
-        
-        for video in videos:
-            session_data['videos'].append({
-                'id': str(video.id),
-                'title': video.title,
-                'status': video.status,
-                'duration': video.get_duration_display(),
-                'file_size_mb': video.file_size_mb,
-                'created_at': video.created_at.isoformat()
-            })
-        
-        export_data['sessions'].append(session_data)
+    fmt = request.GET.get('format', 'json')
+    if fmt not in exporters.EXPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': 'Geçersiz format'}, status=400)
+    compress = request.GET.get('gzip') in ('1', 'true')
+    
+    # Çok büyük geçmişler için dosya arka planda hazırlanır, bitince bildirim gelir
+    if request.GET.get('background') in ('1', 'true'):
+        export_id = exporters.start_background_export(
+            request.user, fmt, compress,
+            download_url=lambda export_id: reverse('core:download_chat_export', args=[export_id])
+        )
+        return JsonResponse({
+            'success': True,
+            'export_id': export_id,
+            'message': 'Dışa aktarım hazırlanıyor, hazır olduğunda bildirim alacaksınız.'
+        }, status=202)
     
-    response = JsonResponse(export_data)
-    response['Content-Disposition'] = f'attachment; filename="binarygirls_chat_history_{request.user.username}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json"'
+    response = StreamingHttpResponse(
+        exporters.encode_chunks(exporters.iter_chat_export(request.user, fmt), compress),
+        content_type=exporters.content_type(fmt, compress)
+    )
+    response['Content-Disposition'] = f'attachment; filename="{exporters.export_filename(request.user, fmt, compress)}"'
     
     return response
 
 
+@login_required
+def download_chat_export(request, export_id):
+    path = exporters.export_path(request.user, export_id)
+    if path is None:
+        raise Http404("Dışa aktarım bulunamadı")
+    
+    fmt = 'ndjson' if '.ndjson' in path.suffixes else 'json'
+    compress = path.suffix == '.gz'
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=exporters.export_filename(request.user, fmt, compress),
+        content_type=exporters.content_type(fmt, compress)
+    )
+
+
 @login_required
 def solutions_list(request, subject_id=None):
     solutions = Solution.objects.all().select_related('subject', 'created_by')
@@ -978,7 +1013,7 @@ def solutions_list(request, subject_id=None):
     page_obj = paginator.get_page(page_number)
     
     user_chat_stats = {
-        'total_messages': ChatMessage.objects.filter(user=request.user).count(),
+        'total_messages': user_stats.get_user_stats(request.user).total_messages,
         'recent_topics': get_recent_chat_topics(request.user)
     }
     
@@ -999,19 +1034,9 @@ def get_recent_chat_topics(user):
     recent_messages = ChatMessage.objects.filter(
         user=user, 
         is_bot_response=False
-    ).order_by('-created_at')[:10]
-    
-    topics = []
-    for message in recent_messages:
-        message_lower = message.message.lower()
-        if any(keyword in message_lower for keyword in ['matematik', 'mat', 'sayı']):
-            topics.append('Matematik')
-        elif any(keyword in message_lower for keyword in ['fizik', 'hareket', 'kuvvet']):
-            topics.append('Fizik')
-        elif any(keyword in message_lower for keyword in ['kimya', 'atom', 'molekül']):
-            topics.append('Kimya')
-        elif any(keyword in message_lower for keyword in ['biyoloji', 'bio', 'hücre']):
-            topics.append('Biyoloji')
+    ).order_by('-created_at').values_list('message', flat=True)[:10]
+    
+    topics = [subject for subject in map(detect_subject, recent_messages) if subject]
     
     from collections import Counter
     topic_counts = Counter(topics)
@@ -1022,8 +1047,7 @@ def get_recent_chat_topics(user):
 def solution_detail(request, solution_id):
     solution = get_object_or_404(Solution, id=solution_id)
     
-    solution.view_count += 1
-    solution.save(update_fields=['view_count'])
+    solution.increment_view_count()
     
     progress, created = UserSolutionProgress.objects.get_or_create(
         user=request.user,
@@ -1063,25 +1087,8 @@ def solution_detail(request, solution_id):
 
 
 def get_related_chat_messages(user, subject_name):
-    keywords = {
-        'Matematik': ['matematik', 'mat', 'sayı', 'hesap', 'algebra', 'geometri'],
-        'Fizik': ['fizik', 'hareket', 'kuvvet', 'enerji'],
-        'Kimya': ['kimya', 'atom', 'molekül', 'element'],
-        'Biyoloji': ['biyoloji', 'bio', 'hücre', 'dna']
-    }
-    
-    subject_keywords = keywords.get(subject_name, [])
-    if not subject_keywords:
-        return []
-    
-    messages = ChatMessage.objects.filter(user=user)
-    related_messages = []
-    
-    for message in messages:
-        if any(keyword in message.message.lower() for keyword in subject_keywords):
-            related_messages.append(message)
-    
-    return related_messages[:5]
+    # Arama indeksinde alaka sırasına göre ilk 5 (bkz. core/search.py)
+    return related_messages(user, subject_name, limit=5)
 
 
 @login_required
@@ -1145,87 +1152,61 @@ def mark_notification_read(request, notification_id):
 
 @login_required
 def get_user_stats(request):
+    row = user_stats.get_user_stats(request.user)
+    subjects = Subject.objects.filter(is_active=True).annotate(total=Count('solutions'))
+    subject_rows = {
+        subject_stats.subject_id: subject_stats
+        for subject_stats in request.user.subject_stats.all()
+    }
+    
     stats = {
         'total_solutions': Solution.objects.count(),
-        'completed_solutions': UserSolutionProgress.objects.filter(
-            user=request.user, 
-            is_completed=True
-        ).count(),
-        'total_messages': ChatMessage.objects.filter(user=request.user).count(),
-        'chat_sessions': get_chat_sessions_count(request.user),
-        'total_videos': ChatVideo.objects.filter(user=request.user).count(),
+        'completed_solutions': row.completed_solutions,
+        'total_messages': row.total_messages,
+        'chat_sessions': row.chat_sessions,
+        'total_videos': row.total_videos,
         'subjects_progress': {},
-        'recent_activity': get_recent_activity(request.user)
+        'recent_activity': user_stats.recent_activity(request.user)
     }
     
-    subjects = Subject.objects.filter(is_active=True)
     for subject in subjects:
-        total = Solution.objects.filter(subject=subject).count()
-        completed = UserSolutionProgress.objects.filter(
-            user=request.user,
-            solution__subject=subject,
-            is_completed=True
-        ).count()
+        subject_stats = subject_rows.get(subject.id)
+        completed = subject_stats.completed_solutions if subject_stats else 0
         
         stats['subjects_progress'][subject.name] = {
-            'total': total,
+            'total': subject.total,
             'completed': completed,
-            'percentage': (completed / total * 100) if total > 0 else 0,
-            'chat_messages': ChatMessage.objects.filter(
-                user=request.user,
-                message__icontains=subject.name.lower()
-            ).count()
+            'percentage': (completed / subject.total * 100) if subject.total > 0 else 0,
+            'chat_messages': subject_stats.chat_messages if subject_stats else 0
         }
     
     return JsonResponse(stats)
 
 
+@staff_member_required
+def model_health(request):
+    """Gemini model sağlık durumunu izleme için döndür"""
+    return JsonResponse(get_model_health_registry().snapshot())
+
+
+@staff_member_required
+def video_service_health(request):
+    """Video servisi istemcisinin devre durumu, gecikme ve hata oranları"""
+    return JsonResponse(get_video_client().snapshot())
+
+
+@staff_member_required
+def counter_health(request):
+    """Biriktirilen görüntülenme/indirme sayaçlarının yazma durumu"""
+    return JsonResponse(get_counter_buffer().snapshot())
+
+
 def get_chat_sessions_count(user):
-    return ChatSession.objects.filter(user=user).count()
+    return user_stats.get_user_stats(user).chat_sessions
 
 
 def get_recent_activity(user):
-    activities = []
-    
-    recent_chats = ChatMessage.objects.filter(
-        user=user, 
-        is_bot_response=False
-    ).order_by('-created_at')[:3]
-    
-    for chat in recent_chats:
-        activities.append({
-            'type': 'chat',
-            'description': f'Chat: {chat.message[:50]}...',
-            'timestamp': chat.created_at.isoformat()
-        })
-    
-    recent_completions = UserSolutionProgress.objects.filter(
-        user=user,
-        is_completed=True
-    ).order_by('-completed_at')[:3]
-    
-    for completion in recent_completions:
-        activities.append({
-            'type': 'completion',
-            'description': f'Çözüm tamamlandı: {completion.solution.title}',
-            'timestamp': completion.completed_at.isoformat() if completion.completed_at else completion.created_at.isoformat()
-        })
-    
-    recent_videos = ChatVideo.objects.filter(
-        user=user,
-        status='completed'
-    ).order_by('-created_at')[:2]
-    
-    for video in recent_videos:
-        activities.append({
-            'type': 'video',
-            'description': f'Video oluşturuldu: {video.title}',
-            'timestamp': video.created_at.isoformat()
-        })
-    
-    activities.sort(key=lambda x: x['timestamp'], reverse=True)
-    
-    return activities[:5]
+    return user_stats.recent_activity(user)
 
 
 def home(request):
@@ -1284,8 +1265,7 @@ def topic_detail(request, topic_id):
     topic = get_object_or_404(TopicContent, id=topic_id, is_active=True)
     
     # Görüntülenme sayısını artır
-    topic.view_count += 1
-    topic.save(update_fields=['view_count'])
+    topic.increment_view_count()
     
     materials = topic.materials.all().order_by('material_type', 'title')
     
@@ -1351,11 +1331,12 @@ def create_education(request):
                     session.content = content
                     session.status = 'completed'
                     session.generation_completed_at = timezone.now()
-                    session.save()
+                    # view_count tamponlandığı için yalnızca değişen alanlar yazılır
+                    session.save(update_fields=['content', 'status', 'generation_completed_at', 'updated_at'])
                     
                 except Exception as e:
                     session.status = 'failed'
-                    session.save()
+                    session.save(update_fields=['status', 'updated_at'])
             
             thread = threading.Thread(target=generate_education_content)
             thread.daemon = True
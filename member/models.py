@@ -2,8 +2,6 @@
 
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 from PIL import Image
 import os
 
@@ -61,20 +59,6 @@ class UserProfile(models.Model):
         return '/static/img/default-avatar.png'
 
 
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.create(user=instance)
-
-
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
-    else:
-        UserProfile.objects.create(user=instance)
-
-
 class ChatMessage(models.Model):
     MESSAGE_TYPES = [
         ('text', 'Metin'),
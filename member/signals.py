@@ -7,12 +7,16 @@ from .models import UserProfile
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     """Yeni kullanıcı oluşturulduğunda otomatik profil oluştur"""
-    if created:
+    if created and not kwargs.get('raw'):
         UserProfile.objects.create(user=instance)
 
 
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
-    """Kullanıcı kaydedildiğinde profili de kaydet"""
+    """Kullanıcı kaydedildiğinde profili de kaydet (profili olmayan eski kullanıcılar için oluştur)"""
+    if kwargs.get('raw'):
+        return
     if hasattr(instance, 'profile'):
         instance.profile.save()
+    else:
+        UserProfile.objects.create(user=instance)
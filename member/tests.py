@@ -1,3 +1,23 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from .models import UserProfile
+
+
+class UserProfileSignalTests(TestCase):
+
+    def test_create_user_creates_single_profile(self):
+        user = User.objects.create_user('ayse', password='x')
+        self.assertEqual(UserProfile.objects.filter(user=user).count(), 1)
+
+        user.first_name = 'Ayşe'
+        user.save()
+        self.assertEqual(UserProfile.objects.filter(user=user).count(), 1)
+
+    def test_profile_is_recreated_for_users_without_one(self):
+        user = User.objects.create_user('zeynep', password='x')
+        UserProfile.objects.filter(user=user).delete()
+
+        user = User.objects.get(pk=user.pk)
+        user.save()
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
@@ -15,7 +15,7 @@ from .forms import (
     UserUpdateForm, AIAvatarForm, RegisterStep1Form, RegisterStep2Form, RegisterStep3Form
 )
 from .models import UserProfile, AIAvatar, ChatMessage
-from core.models import UserSolutionProgress
+from core.stats import get_user_stats
 
 class CustomLoginView(LoginView):
     form_class = CustomAuthenticationForm
@@ -175,7 +175,7 @@ def profile_view(request):
             messages.success(request, 'Profiliniz başarıyla güncellendi!')
             return redirect('member:profile')
     
-    completed_solutions_count = UserSolutionProgress.objects.filter(user=request.user, is_completed=True).count()
+    completed_solutions_count = get_user_stats(request.user).completed_solutions
     
     context = {
         'user_form': user_form,
@@ -275,7 +275,7 @@ def avatar_chat(request):
 
 @login_required
 def dashboard(request):
-    total_messages = ChatMessage.objects.filter(user=request.user).count()
+    total_messages = get_user_stats(request.user).total_messages
     
     context = {
         'user': request.user,